@@ -11,6 +11,7 @@ sys.path.append(str(Path(__file__).parent.parent))
 
 from app.database import Base
 from app.models import user
+from app.services.partition_manager import PARTITION_NAME
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
@@ -31,6 +32,14 @@ target_metadata = Base.metadata
 # ... etc.
 
 
+def include_object(object, name, type_, reflected, compare_to):
+    """Leave the monthly deposit partitions, managed at runtime, out of autogenerate."""
+    table_name = object.table.name if type_ == "index" else name
+    if reflected and type_ in ("table", "index") and PARTITION_NAME.match(table_name or ""):
+        return False
+    return True
+
+
 def get_url():
     """Get database URL from environment variable or config."""
     return os.getenv("DATABASE_URL", config.get_main_option("sqlalchemy.url"))
@@ -78,7 +87,7 @@ def run_migrations_online() -> None:
 
     with connectable.connect() as connection:
         context.configure(
-            connection=connection, target_metadata=target_metadata
+            connection=connection, target_metadata=target_metadata, include_object=include_object
         )
 
         with context.begin_transaction():
@@ -0,0 +1,37 @@
+"""Add block_headers table for reorg detection
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Recent canonical headers per network, persisted so the monitor's
+    # header ring buffer survives restarts
+    op.create_table(
+        "block_headers",
+        sa.Column("blockchain_network_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("number", sa.BigInteger(), nullable=False),
+        sa.Column("hash", sa.String(), nullable=False),
+        sa.Column("parent_hash", sa.String(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+        sa.ForeignKeyConstraint(["blockchain_network_id"], ["blockchain_networks.id"]),
+        sa.PrimaryKeyConstraint("blockchain_network_id", "number"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("block_headers")
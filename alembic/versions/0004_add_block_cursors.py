@@ -0,0 +1,35 @@
+"""Add block_cursors table for monitor backfill
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Last fully processed block per network, used to backfill missed blocks
+    # after websocket reconnects and monitor restarts
+    op.create_table(
+        "block_cursors",
+        sa.Column("blockchain_network_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("last_block", sa.BigInteger(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+        sa.ForeignKeyConstraint(["blockchain_network_id"], ["blockchain_networks.id"]),
+        sa.PrimaryKeyConstraint("blockchain_network_id"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("block_cursors")
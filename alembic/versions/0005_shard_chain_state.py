@@ -0,0 +1,40 @@
+"""Key monitor chain state by work unit for sharded monitor workers
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Each (network, address-range shard) work unit keeps its own header
+    # chain and cursor. Existing rows belong to the single unsharded unit 0/1.
+    for table, key in (("block_headers", ["number"]), ("block_cursors", [])):
+        op.add_column(table, sa.Column("shard_index", sa.Integer(), server_default="0", nullable=False))
+        op.add_column(table, sa.Column("shard_count", sa.Integer(), server_default="1", nullable=False))
+        op.drop_constraint(f"{table}_pkey", table, type_="primary")
+        op.create_primary_key(
+            f"{table}_pkey",
+            table,
+            ["blockchain_network_id", "shard_index", "shard_count"] + key,
+        )
+
+
+def downgrade() -> None:
+    for table, key in (("block_headers", ["number"]), ("block_cursors", [])):
+        op.execute(f"DELETE FROM {table} WHERE shard_index <> 0 OR shard_count <> 1")
+        op.drop_constraint(f"{table}_pkey", table, type_="primary")
+        op.create_primary_key(f"{table}_pkey", table, ["blockchain_network_id"] + key)
+        op.drop_column(table, "shard_count")
+        op.drop_column(table, "shard_index")
@@ -0,0 +1,56 @@
+"""Add tokens table and key deposits by (network, tx_hash, log_index)
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = "0006"
+down_revision = "0005"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # ERC-20 contracts whose Transfer events are ingested as deposits
+    op.create_table(
+        "tokens",
+        sa.Column("id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("blockchain_network_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("address", sa.String(), nullable=False),
+        sa.Column("symbol", sa.String(), nullable=False),
+        sa.Column("decimals", sa.Integer(), nullable=False),
+        sa.Column("is_active", sa.Boolean(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+        sa.ForeignKeyConstraint(["blockchain_network_id"], ["blockchain_networks.id"]),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("blockchain_network_id", "address", name="uq_tokens_network_address"),
+    )
+
+    # Native deposits keep log_index -1; token deposits use the Transfer log's index
+    op.add_column("deposits", sa.Column("log_index", sa.Integer(), server_default="-1", nullable=False))
+    op.add_column("deposits", sa.Column("token_address", sa.String(), nullable=True))
+
+    # One transaction can carry several transfers, so tx_hash alone is no longer unique
+    op.drop_index("ix_deposits_tx_hash", table_name="deposits")
+    op.create_index("ix_deposits_tx_hash", "deposits", ["tx_hash"], unique=False)
+    op.create_unique_constraint(
+        "uq_deposits_network_tx_log", "deposits", ["blockchain_network_id", "tx_hash", "log_index"]
+    )
+
+
+def downgrade() -> None:
+    op.execute("DELETE FROM deposits WHERE log_index <> -1")
+    op.drop_constraint("uq_deposits_network_tx_log", "deposits", type_="unique")
+    op.drop_index("ix_deposits_tx_hash", table_name="deposits")
+    op.create_index("ix_deposits_tx_hash", "deposits", ["tx_hash"], unique=True)
+    op.drop_column("deposits", "token_address")
+    op.drop_column("deposits", "log_index")
+    op.drop_table("tokens")
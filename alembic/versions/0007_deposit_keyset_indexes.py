@@ -0,0 +1,52 @@
+"""Composite indexes for keyset pagination of deposits
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0007"
+down_revision = "0006"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Built concurrently so deposit ingestion is not blocked on large tables
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_deposits_created_at",
+            "deposits",
+            [sa.text("created_at DESC"), sa.text("id DESC")],
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            "ix_deposits_wallet_id_created_at",
+            "deposits",
+            ["wallet_id", sa.text("created_at DESC"), sa.text("id DESC")],
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            "ix_deposits_status_created_at",
+            "deposits",
+            ["status", sa.text("created_at DESC"), sa.text("id DESC")],
+            postgresql_concurrently=True,
+        )
+
+    # The composite indexes lead with the same columns
+    op.drop_index("ix_deposits_wallet_id", table_name="deposits")
+    op.drop_index("ix_deposits_status", table_name="deposits")
+
+
+def downgrade() -> None:
+    op.create_index("ix_deposits_status", "deposits", ["status"], unique=False)
+    op.create_index("ix_deposits_wallet_id", "deposits", ["wallet_id"], unique=False)
+    op.drop_index("ix_deposits_status_created_at", table_name="deposits")
+    op.drop_index("ix_deposits_wallet_id_created_at", table_name="deposits")
+    op.drop_index("ix_deposits_created_at", table_name="deposits")
@@ -0,0 +1,61 @@
+"""Add wallet_balances deposit totals ledger
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = "0008"
+down_revision = "0007"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "wallet_balances",
+        sa.Column("wallet_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("asset", sa.String(), nullable=False),
+        sa.Column("completed_total", sa.Numeric(precision=36, scale=18), server_default="0", nullable=False),
+        sa.Column("pending_total", sa.Numeric(precision=36, scale=18), server_default="0", nullable=False),
+        sa.Column("completed_count", sa.Integer(), server_default="0", nullable=False),
+        sa.Column("pending_count", sa.Integer(), server_default="0", nullable=False),
+        sa.Column("last_deposit_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+        sa.ForeignKeyConstraint(["wallet_id"], ["wallets.id"]),
+        sa.PrimaryKeyConstraint("wallet_id", "asset"),
+    )
+
+    # Backfill from existing deposits; the monitor keeps the totals current from here on.
+    # Deposits are locked so no transition commits between the backfill and the table going live.
+    op.execute("LOCK TABLE deposits IN SHARE MODE")
+    op.execute(
+        """
+        INSERT INTO wallet_balances (
+            wallet_id, asset, completed_total, pending_total,
+            completed_count, pending_count, last_deposit_at
+        )
+        SELECT
+            wallet_id,
+            COALESCE(token_address, 'native'),
+            COALESCE(SUM(amount) FILTER (WHERE status = 'completed'), 0),
+            COALESCE(SUM(amount) FILTER (WHERE status IN ('pending', 'confirming')), 0),
+            COUNT(*) FILTER (WHERE status = 'completed'),
+            COUNT(*) FILTER (WHERE status IN ('pending', 'confirming')),
+            MAX(created_at)
+        FROM deposits
+        WHERE status IN ('pending', 'confirming', 'completed')
+        GROUP BY wallet_id, COALESCE(token_address, 'native')
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("wallet_balances")
@@ -0,0 +1,169 @@
+"""Partition deposits by created_at month and key them in deposit_tx_keys
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+
+from datetime import datetime, timezone
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = "0009"
+down_revision = "0008"
+branch_labels = None
+depends_on = None
+
+# Partitions created beyond the current month; the monitor keeps this many ahead
+PREMAKE_MONTHS = 3
+
+DEPOSIT_COLUMNS = (
+    "id, wallet_id, tx_hash, log_index, token_address, amount, confirmations, status, "
+    "blockchain_network_id, block_number, block_hash, from_address, created_at, updated_at"
+)
+
+
+def deposit_columns():
+    return [
+        sa.Column("id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("wallet_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("tx_hash", sa.String(), nullable=False),
+        sa.Column("log_index", sa.Integer(), server_default="-1", nullable=False),
+        sa.Column("token_address", sa.String(), nullable=True),
+        sa.Column("amount", sa.Numeric(precision=36, scale=18), nullable=False),
+        sa.Column("confirmations", sa.Integer(), nullable=False),
+        sa.Column(
+            "status",
+            postgresql.ENUM(
+                "pending", "confirming", "completed", "failed", "orphaned",
+                name="depositstatus", create_type=False,
+            ),
+            nullable=False,
+        ),
+        sa.Column("blockchain_network_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("block_number", sa.BigInteger(), nullable=True),
+        sa.Column("block_hash", sa.String(), nullable=True),
+        sa.Column("from_address", sa.String(), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+        # Named explicitly, the table being replaced still holds the default names
+        sa.ForeignKeyConstraint(
+            ["blockchain_network_id"], ["blockchain_networks.id"], name="deposits_blockchain_network_id_fkey"
+        ),
+        sa.ForeignKeyConstraint(["wallet_id"], ["wallets.id"], name="deposits_wallet_id_fkey"),
+    ]
+
+
+def month_index(moment: datetime) -> int:
+    moment = moment.astimezone(timezone.utc)
+    return moment.year * 12 + moment.month - 1
+
+
+def month_from_index(index: int) -> datetime:
+    return datetime(index // 12, index % 12 + 1, 1, tzinfo=timezone.utc)
+
+
+def create_keyset_indexes():
+    op.create_index(
+        "ix_deposits_created_at",
+        "deposits",
+        [sa.text("created_at DESC"), sa.text("id DESC")],
+    )
+    op.create_index(
+        "ix_deposits_wallet_id_created_at",
+        "deposits",
+        ["wallet_id", sa.text("created_at DESC"), sa.text("id DESC")],
+    )
+    op.create_index(
+        "ix_deposits_status_created_at",
+        "deposits",
+        ["status", sa.text("created_at DESC"), sa.text("id DESC")],
+    )
+
+
+def upgrade() -> None:
+    # Deposits are copied under an exclusive lock; stop the monitors first on large tables
+    op.execute("ALTER TABLE deposits RENAME TO deposits_unpartitioned")
+    op.execute("ALTER INDEX deposits_pkey RENAME TO deposits_unpartitioned_pkey")
+    op.drop_constraint("uq_deposits_network_tx_log", "deposits_unpartitioned", type_="unique")
+    op.drop_index("ix_deposits_tx_hash", table_name="deposits_unpartitioned")
+    op.drop_index("ix_deposits_wallet_id_created_at", table_name="deposits_unpartitioned")
+    op.drop_index("ix_deposits_status_created_at", table_name="deposits_unpartitioned")
+    op.drop_index("ix_deposits_created_at", table_name="deposits_unpartitioned")
+
+    # Unique constraints of a partitioned table must include the partition key
+    op.create_table(
+        "deposits",
+        *deposit_columns(),
+        sa.PrimaryKeyConstraint("id", "created_at"),
+        postgresql_partition_by="RANGE (created_at)",
+    )
+
+    # One partition per month from the oldest deposit to PREMAKE_MONTHS ahead
+    bind = op.get_bind()
+    now = datetime.now(timezone.utc)
+    oldest, newest = bind.execute(
+        sa.text("SELECT min(created_at), max(created_at) FROM deposits_unpartitioned")
+    ).one()
+    first = month_index(oldest or now)
+    last = max(month_index(newest or now), month_index(now)) + PREMAKE_MONTHS
+    for index in range(first, last + 1):
+        month = month_from_index(index)
+        op.execute(
+            f"CREATE TABLE deposits_y{month.year:04d}m{month.month:02d} PARTITION OF deposits "
+            f"FOR VALUES FROM ('{month.isoformat()}') TO ('{month_from_index(index + 1).isoformat()}')"
+        )
+
+    op.execute(f"INSERT INTO deposits ({DEPOSIT_COLUMNS}) SELECT {DEPOSIT_COLUMNS} FROM deposits_unpartitioned")
+    op.drop_table("deposits_unpartitioned")
+
+    # Global (network, tx_hash, log_index) uniqueness, pointing at each deposit's partition
+    op.create_table(
+        "deposit_tx_keys",
+        sa.Column("blockchain_network_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("tx_hash", sa.String(), nullable=False),
+        sa.Column("log_index", sa.Integer(), nullable=False),
+        sa.Column("deposit_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+        sa.ForeignKeyConstraint(["blockchain_network_id"], ["blockchain_networks.id"]),
+        sa.PrimaryKeyConstraint("blockchain_network_id", "tx_hash", "log_index"),
+        sa.UniqueConstraint("deposit_id"),
+    )
+    op.execute(
+        "INSERT INTO deposit_tx_keys (blockchain_network_id, tx_hash, log_index, deposit_id, created_at) "
+        "SELECT blockchain_network_id, tx_hash, log_index, id, created_at FROM deposits"
+    )
+    op.create_index("ix_deposit_tx_keys_tx_hash", "deposit_tx_keys", ["tx_hash"], unique=False)
+
+    # Indexes on the parent are created on every partition, after the copy
+    create_keyset_indexes()
+    op.create_index("ix_deposits_block_hash", "deposits", ["block_hash"], unique=False)
+
+
+def downgrade() -> None:
+    # Partitions already moved to the archive schema are left where they are
+    op.execute("ALTER TABLE deposits RENAME TO deposits_partitioned")
+    op.execute("ALTER INDEX deposits_pkey RENAME TO deposits_partitioned_pkey")
+    op.drop_index("ix_deposits_block_hash", table_name="deposits_partitioned")
+    op.drop_index("ix_deposits_wallet_id_created_at", table_name="deposits_partitioned")
+    op.drop_index("ix_deposits_status_created_at", table_name="deposits_partitioned")
+    op.drop_index("ix_deposits_created_at", table_name="deposits_partitioned")
+
+    op.create_table(
+        "deposits",
+        *deposit_columns(),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("blockchain_network_id", "tx_hash", "log_index", name="uq_deposits_network_tx_log"),
+    )
+    op.execute(f"INSERT INTO deposits ({DEPOSIT_COLUMNS}) SELECT {DEPOSIT_COLUMNS} FROM deposits_partitioned")
+    # Dropping the parent drops its partitions
+    op.drop_table("deposits_partitioned")
+    op.drop_table("deposit_tx_keys")
+
+    op.create_index("ix_deposits_tx_hash", "deposits", ["tx_hash"], unique=False)
+    create_keyset_indexes()
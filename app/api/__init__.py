@@ -1,4 +1,4 @@
 # API routers
-from . import users, wallets, deposits, websocket, blockchain_networks
+from . import users, wallets, deposits, websocket, blockchain_networks, tokens
 
-__all__ = ["users", "wallets", "deposits", "websocket", "blockchain_networks"]
+__all__ = ["users", "wallets", "deposits", "websocket", "blockchain_networks", "tokens"]
@@ -1,25 +1,115 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
-from typing import List
+from sqlalchemy import Select, select, tuple_
+from datetime import datetime
+from typing import AsyncIterator, List, Optional
 from uuid import UUID
+import csv
+import io
+import logging
 
-from app.database import get_db
-from app.models.user import Deposit, Wallet
+import orjson
+
+from app.config import settings
+from app.database import AsyncSessionLocal, get_db
+from app.models.user import Deposit, DepositStatus, Wallet
 from app.schemas.deposit import DepositResponse
-from app.utils import validate_transaction_hash, normalize_transaction_hash
+from app.services.deposit_processor import deposit_by_id_query, deposits_by_tx_hash_query
+from app.services.response_cache import deposit_tx_key, get_response_cache
+from app.utils import validate_transaction_hash, normalize_transaction_hash, encode_cursor, decode_cursor
 
 router = APIRouter()
+logger = logging.getLogger(__name__)
+
+# Response header carrying the cursor of the next page, absent on the last page
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+# Columns of a deposit export, in CSV column order
+EXPORT_COLUMNS = (
+    Deposit.id,
+    Deposit.wallet_id,
+    Wallet.address.label("wallet_address"),
+    Deposit.blockchain_network_id,
+    Deposit.tx_hash,
+    Deposit.log_index,
+    Deposit.token_address,
+    Deposit.amount,
+    Deposit.confirmations,
+    Deposit.status,
+    Deposit.block_number,
+    Deposit.block_hash,
+    Deposit.from_address,
+    Deposit.created_at,
+    Deposit.updated_at,
+)
+EXPORT_FIELDS = [column.key for column in EXPORT_COLUMNS]
+
+EXPORT_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+
+async def _paginate(
+    db: AsyncSession,
+    query: Select,
+    response: Response,
+    cursor: Optional[str],
+    skip: int,
+    limit: int
+) -> List[Deposit]:
+    """Run a deposit query newest first, one page at a time.
+    
+    With a cursor the page starts right after the (created_at, id) key it
+    encodes, so the composite indexes seek straight to it and every page
+    costs the same. ``skip`` is the legacy offset, only used without a
+    cursor.
+    """
+    query = query.order_by(Deposit.created_at.desc(), Deposit.id.desc())
+    
+    if cursor:
+        key = decode_cursor(cursor)
+        if key is None:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid cursor"
+            )
+        created_at, deposit_id = key
+        # The plain created_at bound lets the planner prune newer partitions
+        query = query.where(
+            Deposit.created_at <= created_at,
+            tuple_(Deposit.created_at, Deposit.id) < tuple_(created_at, deposit_id),
+        )
+    elif skip:
+        query = query.offset(skip)
+    
+    # One extra row tells whether there is a next page
+    result = await db.execute(query.limit(limit + 1))
+    deposits = result.scalars().all()
+    
+    if len(deposits) > limit:
+        deposits = deposits[:limit]
+        last = deposits[-1]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(last.created_at, last.id)
+    
+    return deposits
 
 
 @router.get("/wallet/{wallet_id}", response_model=List[DepositResponse])
 async def get_wallet_deposits(
     wallet_id: UUID,
-    skip: int = 0,
-    limit: int = 100,
+    response: Response,
+    cursor: Optional[str] = None,
+    skip: int = Query(0, ge=0, deprecated=True),
+    limit: int = Query(100, ge=1, le=1000),
     db: AsyncSession = Depends(get_db)
 ):
-    """Get deposits for a specific wallet."""
+    """Get deposits for a specific wallet, newest first.
+    
+    Pass the ``X-Next-Cursor`` response header as ``cursor`` to get the
+    next page.
+    """
     # Validate wallet exists
     result = await db.execute(select(Wallet).where(Wallet.id == wallet_id))
     wallet = result.scalar_one_or_none()
@@ -31,16 +121,100 @@ async def get_wallet_deposits(
         )
     
     # Get deposits
-    result = await db.execute(
-        select(Deposit)
-        .where(Deposit.wallet_id == wallet_id)
-        .order_by(Deposit.created_at.desc())
-        .offset(skip)
-        .limit(limit)
+    return await _paginate(
+        db, select(Deposit).where(Deposit.wallet_id == wallet_id), response, cursor, skip, limit
     )
-    deposits = result.scalars().all()
+
+
+def _export_record(row) -> dict:
+    record = dict(row._mapping)
+    # Amounts keep their full precision as strings
+    record["amount"] = str(record["amount"])
+    record["status"] = record["status"].value
+    return record
+
+
+def _encode_ndjson(rows) -> bytes:
+    return b"".join(orjson.dumps(_export_record(row)) + b"\n" for row in rows)
+
+
+def _encode_csv(rows) -> bytes:
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=EXPORT_FIELDS)
+    for row in rows:
+        record = _export_record(row)
+        record["created_at"] = record["created_at"].isoformat()
+        record["updated_at"] = record["updated_at"].isoformat()
+        writer.writerow(record)
+    return buffer.getvalue().encode()
+
+
+async def _stream_export(query: Select, export_format: str) -> AsyncIterator[bytes]:
+    """Stream query results through a server-side cursor, one encoded chunk per batch.
     
-    return deposits
+    The export opens its own session: it outlives the request handler and
+    holds one pooled connection until the last row is sent.
+    """
+    encode = _encode_csv if export_format == "csv" else _encode_ndjson
+    if export_format == "csv":
+        yield (",".join(EXPORT_FIELDS) + "\r\n").encode()
+    
+    exported = 0
+    async with AsyncSessionLocal() as db:
+        try:
+            result = await db.stream(query.execution_options(yield_per=settings.export_batch_size))
+            async for rows in result.partitions():
+                exported += len(rows)
+                yield encode(rows)
+        except Exception as e:
+            # Headers are already sent, so the client sees a truncated body
+            logger.error(f"Deposit export failed after {exported} rows: {e}")
+            raise
+    
+    logger.info(f"Exported {exported} deposits as {export_format}")
+
+
+@router.get("/export")
+async def export_deposits(
+    export_format: str = Query("ndjson", alias="format", pattern="^(ndjson|csv)$"),
+    blockchain_network_id: Optional[UUID] = None,
+    status_filter: Optional[DepositStatus] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    from_block: Optional[int] = None,
+    to_block: Optional[int] = None
+):
+    """Stream every matching deposit, oldest first, as NDJSON or CSV.
+    
+    Rows are read through a server-side cursor in batches of
+    ``EXPORT_BATCH_SIZE`` and written to the response as they arrive, so
+    memory stays flat however many rows match. ``created_to`` is
+    exclusive; ``from_block`` and ``to_block`` are inclusive.
+    """
+    query = (
+        select(*EXPORT_COLUMNS)
+        .join(Wallet, Wallet.id == Deposit.wallet_id)
+        .order_by(Deposit.created_at, Deposit.id)
+    )
+    
+    if blockchain_network_id:
+        query = query.where(Deposit.blockchain_network_id == blockchain_network_id)
+    if status_filter:
+        query = query.where(Deposit.status == status_filter)
+    if created_from:
+        query = query.where(Deposit.created_at >= created_from)
+    if created_to:
+        query = query.where(Deposit.created_at < created_to)
+    if from_block is not None:
+        query = query.where(Deposit.block_number >= from_block)
+    if to_block is not None:
+        query = query.where(Deposit.block_number <= to_block)
+    
+    return StreamingResponse(
+        _stream_export(query, export_format),
+        media_type=EXPORT_MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f'attachment; filename="deposits.{export_format}"'}
+    )
 
 
 @router.get("/{deposit_id}", response_model=DepositResponse)
@@ -49,7 +223,7 @@ async def get_deposit(
     db: AsyncSession = Depends(get_db)
 ):
     """Get deposit by ID."""
-    result = await db.execute(select(Deposit).where(Deposit.id == deposit_id))
+    result = await db.execute(deposit_by_id_query(deposit_id))
     deposit = result.scalar_one_or_none()
     
     if not deposit:
@@ -64,9 +238,22 @@ async def get_deposit(
 @router.get("/tx/{tx_hash}", response_model=DepositResponse)
 async def get_deposit_by_tx_hash(
     tx_hash: str,
+    log_index: Optional[int] = None,
     db: AsyncSession = Depends(get_db)
 ):
-    """Get deposit by transaction hash."""
+    """Get deposit by transaction hash.
+    
+    A transaction can carry several token deposits; pass ``log_index`` to
+    select one, otherwise the first (the native transfer, if any) is returned.
+    
+    Served from the response cache: all deposits of the transaction are
+    cached together and dropped when the monitor publishes a change to any
+    of them, so polling clients do not reach the database.
+    
+    Deposits in partitions retired by ``manage_partitions.py`` (older than
+    ``PARTITION_RETAIN_MONTHS``) return 404; archived ones remain readable
+    in the ``PARTITION_ARCHIVE_SCHEMA`` schema only.
+    """
     normalized_hash = normalize_transaction_hash(tx_hash)
     
     if not validate_transaction_hash(normalized_hash):
@@ -75,32 +262,43 @@ async def get_deposit_by_tx_hash(
             detail="Invalid transaction hash format"
         )
     
-    result = await db.execute(select(Deposit).where(Deposit.tx_hash == normalized_hash))
-    deposit = result.scalar_one_or_none()
+    async def load_deposits():
+        result = await db.execute(deposits_by_tx_hash_query(normalized_hash))
+        return [
+            DepositResponse.model_validate(deposit).model_dump(mode="json")
+            for deposit in result.scalars().all()
+        ]
     
-    if not deposit:
+    deposits = await get_response_cache().get_or_load(deposit_tx_key(normalized_hash), load_deposits)
+    if log_index is not None:
+        deposits = [deposit for deposit in deposits if deposit["log_index"] == log_index]
+    
+    if not deposits:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Deposit not found"
         )
     
-    return deposit
+    return deposits[0]
 
 
 @router.get("/", response_model=List[DepositResponse])
 async def list_deposits(
-    skip: int = 0,
-    limit: int = 100,
-    status_filter: str = None,
+    response: Response,
+    cursor: Optional[str] = None,
+    skip: int = Query(0, ge=0, deprecated=True),
+    limit: int = Query(100, ge=1, le=1000),
+    status_filter: Optional[DepositStatus] = None,
     db: AsyncSession = Depends(get_db)
 ):
-    """List all deposits with optional status filter."""
-    query = select(Deposit).order_by(Deposit.created_at.desc())
+    """List all deposits newest first, with optional status filter.
     
-    if status_filter:
-        query = query.where(Deposit.status == status_filter)
+    Pass the ``X-Next-Cursor`` response header as ``cursor`` to get the
+    next page.
+    """
+    query = select(Deposit)
     
-    result = await db.execute(query.offset(skip).limit(limit))
-    deposits = result.scalars().all()
+    if status_filter is not None:
+        query = query.where(Deposit.status == status_filter)
     
-    return deposits
+    return await _paginate(db, query, response, cursor, skip, limit)
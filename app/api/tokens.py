@@ -0,0 +1,130 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
+from typing import List, Optional
+from uuid import UUID
+
+from app.database import get_db
+from app.models.user import BlockchainNetwork, Token
+from app.schemas.token import TokenCreate, TokenResponse, TokenUpdate
+from app.utils import is_valid_ethereum_address, normalize_address
+
+router = APIRouter()
+
+
+@router.post("/", response_model=TokenResponse, status_code=status.HTTP_201_CREATED)
+async def create_token(token_data: TokenCreate, db: AsyncSession = Depends(get_db)):
+    """Register an ERC-20 token whose transfers are ingested as deposits."""
+    if not is_valid_ethereum_address(token_data.address):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid token contract address",
+        )
+
+    result = await db.execute(
+        select(BlockchainNetwork).where(BlockchainNetwork.id == token_data.blockchain_network_id)
+    )
+    if not result.scalar_one_or_none():
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Blockchain network not found"
+        )
+
+    address = normalize_address(token_data.address)
+
+    # Check if the token is already registered on the network
+    result = await db.execute(
+        select(Token).where(
+            Token.blockchain_network_id == token_data.blockchain_network_id,
+            Token.address == address,
+        )
+    )
+    if result.scalar_one_or_none():
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Token already registered on this network",
+        )
+
+    token = Token(
+        blockchain_network_id=token_data.blockchain_network_id,
+        address=address,
+        symbol=token_data.symbol,
+        decimals=token_data.decimals,
+        is_active=token_data.is_active,
+    )
+    db.add(token)
+    await db.commit()
+    await db.refresh(token)
+
+    return token
+
+
+@router.get("/", response_model=List[TokenResponse])
+async def list_tokens(
+    blockchain_network_id: Optional[UUID] = None,
+    skip: int = 0,
+    limit: int = 100,
+    db: AsyncSession = Depends(get_db),
+):
+    """List registered tokens, optionally for one blockchain network."""
+    query = select(Token).order_by(Token.created_at)
+
+    if blockchain_network_id:
+        query = query.where(Token.blockchain_network_id == blockchain_network_id)
+
+    result = await db.execute(query.offset(skip).limit(limit))
+    tokens = result.scalars().all()
+
+    return tokens
+
+
+@router.get("/{token_id}", response_model=TokenResponse)
+async def get_token(token_id: UUID, db: AsyncSession = Depends(get_db)):
+    """Get token by ID."""
+    result = await db.execute(select(Token).where(Token.id == token_id))
+    token = result.scalar_one_or_none()
+
+    if not token:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Token not found")
+
+    return token
+
+
+@router.put("/{token_id}", response_model=TokenResponse)
+async def update_token(
+    token_id: UUID, token_data: TokenUpdate, db: AsyncSession = Depends(get_db)
+):
+    """Update an existing token."""
+    result = await db.execute(select(Token).where(Token.id == token_id))
+    token = result.scalar_one_or_none()
+
+    if not token:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Token not found")
+
+    if token_data.symbol is not None:
+        token.symbol = token_data.symbol
+
+    if token_data.decimals is not None:
+        token.decimals = token_data.decimals
+
+    if token_data.is_active is not None:
+        token.is_active = token_data.is_active
+
+    await db.commit()
+    await db.refresh(token)
+
+    return token
+
+
+@router.delete("/{token_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_token(token_id: UUID, db: AsyncSession = Depends(get_db)):
+    """Delete a token."""
+    result = await db.execute(select(Token).where(Token.id == token_id))
+    token = result.scalar_one_or_none()
+
+    if not token:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Token not found")
+
+    await db.delete(token)
+    await db.commit()
+
+    return None
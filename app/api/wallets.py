@@ -1,15 +1,21 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, File, HTTPException, UploadFile, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from typing import List
 from uuid import UUID
+import io
+import logging
 
 from app.database import get_db
-from app.models.user import User, Wallet, BlockchainNetwork
-from app.schemas.wallet import WalletCreate, WalletResponse
+from app.models.user import User, Wallet, WalletBalance, BlockchainNetwork
+from app.schemas.wallet import WalletCreate, WalletImportResult, WalletResponse, WalletSummary
+from app.services.event_bus import get_event_bus, wallet_changed_event, wallets_imported_event
+from app.services.response_cache import get_response_cache, wallet_address_key
+from app.services.wallet_import import WalletImporter, read_csv_rows
 from app.utils import is_valid_ethereum_address, normalize_address
 
 router = APIRouter()
+logger = logging.getLogger(__name__)
 
 
 @router.post("/", response_model=WalletResponse, status_code=status.HTTP_201_CREATED)
@@ -69,9 +75,49 @@ async def create_wallet(
     await db.commit()
     await db.refresh(wallet)
     
+    # Let the blockchain monitor start watching the wallet right away
+    try:
+        await get_event_bus().publish([wallet_changed_event(wallet.address)])
+    except Exception as e:
+        logger.warning(f"Failed to publish wallet change for {wallet.address}: {e}")
+    
     return wallet
 
 
+@router.post("/import", response_model=WalletImportResult)
+async def import_wallets(
+    file: UploadFile = File(...),
+    db: AsyncSession = Depends(get_db)
+):
+    """Register many wallets from a CSV file in one transaction.
+    
+    The file needs a header row with ``user_id``, ``address``,
+    ``blockchain_network_id`` (or ``network``) and optionally ``label``.
+    Rows are loaded with Postgres COPY and merged in bulk; rows that are
+    invalid, duplicated or already registered to someone else are skipped
+    and reported with their line numbers. The blockchain monitor is
+    notified once, after the import is committed.
+    """
+    text_file = io.TextIOWrapper(file.file, encoding="utf-8-sig", newline="")
+    
+    try:
+        result = await WalletImporter(db).import_rows(read_csv_rows(text_file))
+    except ValueError as e:
+        # Raised before anything is committed: bad header or encoding
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    
+    if result.imported:
+        try:
+            await get_event_bus().publish([wallets_imported_event(result.imported)])
+        except Exception as e:
+            logger.warning(f"Failed to publish wallet import of {result.imported} wallets: {e}")
+    
+    return result
+
+
 @router.get("/{wallet_id}", response_model=WalletResponse)
 async def get_wallet(
     wallet_id: UUID,
@@ -90,6 +136,33 @@ async def get_wallet(
     return wallet
 
 
+@router.get("/{wallet_id}/summary", response_model=WalletSummary)
+async def get_wallet_summary(
+    wallet_id: UUID,
+    db: AsyncSession = Depends(get_db)
+):
+    """Get a wallet's completed and pending deposit totals per asset.
+    
+    Read from the wallet_balances ledger, which is kept current with every
+    deposit status change, so no deposits are scanned.
+    """
+    result = await db.execute(select(Wallet).where(Wallet.id == wallet_id))
+    wallet = result.scalar_one_or_none()
+    
+    if not wallet:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Wallet not found"
+        )
+    
+    result = await db.execute(
+        select(WalletBalance).where(WalletBalance.wallet_id == wallet_id).order_by(WalletBalance.asset)
+    )
+    balances = result.scalars().all()
+    
+    return WalletSummary(wallet_id=wallet.id, address=wallet.address, balances=balances)
+
+
 @router.get("/user/{user_id}", response_model=List[WalletResponse])
 async def get_user_wallets(
     user_id: UUID,
@@ -107,7 +180,11 @@ async def get_wallet_by_address(
     address: str,
     db: AsyncSession = Depends(get_db)
 ):
-    """Get wallet by address."""
+    """Get wallet by address.
+    
+    Served from the response cache, which drops the entry when the
+    wallet's ``wallet_changed`` event arrives.
+    """
     normalized_address = normalize_address(address)
     
     if not is_valid_ethereum_address(normalized_address):
@@ -116,8 +193,12 @@ async def get_wallet_by_address(
             detail="Invalid Ethereum address format"
         )
     
-    result = await db.execute(select(Wallet).where(Wallet.address == normalized_address))
-    wallet = result.scalar_one_or_none()
+    async def load_wallet():
+        result = await db.execute(select(Wallet).where(Wallet.address == normalized_address))
+        wallet = result.scalar_one_or_none()
+        return WalletResponse.model_validate(wallet).model_dump(mode="json") if wallet else None
+    
+    wallet = await get_response_cache().get_or_load(wallet_address_key(normalized_address), load_wallet)
     
     if not wallet:
         raise HTTPException(
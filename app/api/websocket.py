@@ -1,11 +1,12 @@
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect, Depends, HTTPException, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
-from typing import Dict, List
+from typing import Dict, List, Optional
 import json
 import logging
+import uuid
 
-from app.database import get_db
+from app.database import get_db, AsyncSessionLocal
 from app.models.user import Wallet
 from app.schemas.deposit import DepositEvent, ConfirmationUpdateEvent
 from app.utils import is_valid_ethereum_address, normalize_address
@@ -21,19 +22,29 @@ websocket_manager = WebSocketManager()
 @router.websocket("/")
 async def websocket_endpoint(
     websocket: WebSocket,
-    wallet_address: str = Query(..., description="Wallet address to monitor")
+    wallet_address: Optional[str] = Query(None, description="Wallet address to monitor"),
+    user_id: Optional[uuid.UUID] = Query(None, description="Monitor all wallets of this user")
 ):
     """
     WebSocket endpoint for real-time deposit updates.
     
     Connect with: ws://localhost:8000/ws/?wallet_address=0x...
-    """
-    # Validate wallet address
-    normalized_address = normalize_address(wallet_address)
     
-    if not is_valid_ethereum_address(normalized_address):
-        await websocket.close(code=4000, reason="Invalid wallet address format")
-        return
+    One connection can monitor many wallets. Send control messages to change
+    its subscriptions:
+        
+        {"action": "subscribe", "wallet_addresses": ["0x...", "0x..."]}
+        {"action": "subscribe", "user_id": "..."}
+        {"action": "unsubscribe", "wallet_addresses": ["0x..."]}
+    """
+    normalized_address = None
+    if wallet_address is not None:
+        # Validate wallet address
+        normalized_address = normalize_address(wallet_address)
+        
+        if not is_valid_ethereum_address(normalized_address):
+            await websocket.close(code=4000, reason="Invalid wallet address format")
+            return
     
     # Accept the connection
     await websocket.accept()
@@ -44,22 +55,34 @@ async def websocket_endpoint(
         logger.info(f"WebSocket connected for wallet: {normalized_address}")
         
         # Send welcome message
-        await websocket.send_text(json.dumps({
+        websocket_manager.send(websocket, json.dumps({
             "type": "connected",
-            "message": f"Connected to updates for wallet {normalized_address}",
-            "wallet_address": normalized_address
+            "message": "Connected to deposit updates",
+            "wallet_address": normalized_address,
+            "wallet_addresses": sorted(websocket_manager.connection_wallets.get(websocket, ()))
         }))
         
-        # Keep the connection alive
+        if user_id is not None:
+            await _handle_control_message(websocket, {"action": "subscribe", "user_id": str(user_id)})
+        
+        # Keep the connection alive and handle control messages
         while True:
             try:
-                # Wait for ping from client
                 data = await websocket.receive_text()
                 if data == "ping":
-                    await websocket.send_text("pong")
+                    websocket_manager.send(websocket, "pong")
+                    continue
+                
+                try:
+                    message = json.loads(data)
+                except ValueError:
+                    _send_error(websocket, "Invalid JSON message")
+                    continue
+                
+                await _handle_control_message(websocket, message)
             except WebSocketDisconnect:
                 break
-                
+    
     except WebSocketDisconnect:
         logger.info(f"WebSocket disconnected for wallet: {normalized_address}")
     except Exception as e:
@@ -69,10 +92,74 @@ async def websocket_endpoint(
         await websocket_manager.disconnect(websocket, normalized_address)
 
 
+async def _handle_control_message(websocket: WebSocket, message: dict):
+    """Apply a subscribe or unsubscribe request and acknowledge it."""
+    action = message.get("action") if isinstance(message, dict) else None
+    if action not in ("subscribe", "unsubscribe"):
+        _send_error(websocket, "Unknown action, expected 'subscribe' or 'unsubscribe'")
+        return
+    
+    if message.get("user_id") is not None:
+        try:
+            user_id = uuid.UUID(str(message["user_id"]))
+        except ValueError:
+            _send_error(websocket, "Invalid user_id")
+            return
+        addresses = await _get_user_wallet_addresses(user_id)
+        if not addresses:
+            _send_error(websocket, f"No wallets found for user {user_id}")
+            return
+    else:
+        addresses = message.get("wallet_addresses")
+        if not isinstance(addresses, list) or not addresses:
+            _send_error(websocket, "Expected a non-empty 'wallet_addresses' list or a 'user_id'")
+            return
+        
+        addresses = [normalize_address(address) for address in addresses if isinstance(address, str)]
+        invalid = [address for address in addresses if not is_valid_ethereum_address(address)]
+        if invalid or not addresses:
+            _send_error(websocket, f"Invalid wallet address format: {', '.join(invalid)}")
+            return
+    
+    if action == "subscribe":
+        try:
+            changed = websocket_manager.subscribe(websocket, addresses)
+        except ValueError as e:
+            _send_error(websocket, str(e))
+            return
+    else:
+        changed = websocket_manager.unsubscribe(websocket, addresses)
+    
+    websocket_manager.send(websocket, json.dumps({
+        "type": f"{action}d",
+        "wallet_addresses": changed,
+        "subscription_count": len(websocket_manager.connection_wallets.get(websocket, ()))
+    }))
+
+
+async def _get_user_wallet_addresses(user_id: uuid.UUID) -> List[str]:
+    """Resolve a user to the addresses of their active wallets."""
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(
+            select(Wallet.address).where(
+                Wallet.user_id == user_id,
+                Wallet.is_active == True
+            )
+        )
+        return list(result.scalars().all())
+
+
+def _send_error(websocket: WebSocket, message: str):
+    websocket_manager.send(websocket, json.dumps({"type": "error", "message": message}))
+
+
 @router.get("/connections")
 async def get_active_connections():
     """Get information about active WebSocket connections."""
     return {
         "active_connections": websocket_manager.get_connection_count(),
-        "monitored_wallets": list(websocket_manager.get_monitored_wallets())
+        "monitored_wallets": list(websocket_manager.get_monitored_wallets()),
+        "evicted_connections": websocket_manager.evicted_connections,
+        "coalesced_updates": websocket_manager.coalesced_updates,
+        "queue_depths": websocket_manager.get_queue_depths()
     }
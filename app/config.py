@@ -14,6 +14,39 @@ class Settings(BaseSettings):
     # Blockchain Configuration
     chain_id: int = 11155111  # Sepolia testnet
     confirmations_required: int = 12
+    header_buffer_size: int = 128  # Recent headers kept for reorg detection
+    backfill_concurrency: int = 8  # Concurrent block fetches while catching up
+    wallet_refresh_interval: float = 5.0  # Seconds between incremental wallet registry refreshes
+    network_refresh_interval: float = 30.0  # Seconds between checks for added or removed networks
+    
+    # Token Transfer Configuration
+    token_log_chunk_size: int = 500  # Blocks per ranged eth_getLogs call while backfilling
+    token_log_recipient_batch: int = 1000  # Recipients per topic filter; above this, matched client-side
+    
+    # Mempool Configuration
+    mempool_monitoring: bool = False  # Pre-detect deposits from newPendingTransactions
+    mempool_pending_ttl: float = 600.0  # Seconds a pending transfer is kept waiting to be mined
+    mempool_max_pending: int = 50000  # Pending transfers kept per network monitor
+    mempool_lookup_batch: int = 100  # Hashes resolved per eth_getTransactionByHash batch on hash-only providers
+    mempool_lookup_queue: int = 10000  # Hashes waiting to be resolved before new ones are dropped
+    
+    # Monitor Sharding Configuration
+    monitor_sharding: bool = False  # Lease work units to several monitor processes with advisory locks
+    monitor_shard_count: int = 4  # Wallet address ranges per network when sharding
+    shard_rebalance_interval: float = 10.0  # Seconds between work unit rebalances
+    
+    # JSON-RPC Client Configuration
+    rpc_timeout: float = 10.0
+    rpc_max_connections: int = 20
+    rpc_max_keepalive_connections: int = 10
+    rpc_use_block_receipts: bool = True
+    rpc_cache_size: int = 512  # Blocks, block receipts and block logs cached per network
+    rpc_hedge_percentile: float = 0.95  # Hedge to a second provider past this latency percentile; 0 disables
+    rpc_hedge_min_delay: float = 0.05  # Lower bound of the hedge budget, seconds
+    rpc_provider_rate_limit: float = 0.0  # Requests per second per provider; 0 is unlimited
+    rpc_provider_burst: int = 20  # Token bucket capacity per provider
+    rpc_failure_cooldown: float = 30.0  # Longest time a failing provider is skipped, seconds
+    ws_head_timeout: float = 60.0  # Seconds without a new head before switching WebSocket endpoint
     
     # Application Configuration
     secret_key: str = "dev_secret_key_change_in_production"
@@ -21,9 +54,34 @@ class Settings(BaseSettings):
     host: str = "0.0.0.0"
     port: int = 8000
     
+    # Event Bus Configuration
+    event_bus_backend: str = "postgres"  # "postgres" (LISTEN/NOTIFY) or "memory"
+    event_bus_channel: str = "deposit_events"
+    
+    # Response Cache Configuration
+    response_cache_backend: str = "memory"  # "memory" (per worker), "redis" (shared) or "none"
+    response_cache_url: str = "redis://localhost:6379/0"  # Only used by the redis backend
+    response_cache_ttl: float = 30.0  # Seconds an entry lives if no invalidation arrives
+    response_cache_negative_ttl: float = 2.0  # Seconds a not-found lookup is cached
+    response_cache_size: int = 10000  # Entries kept per worker by the memory backend
+    
+    # Bulk Export and Import Configuration
+    export_batch_size: int = 1000  # Rows fetched per server-side cursor round trip in deposit exports
+    wallet_import_batch_size: int = 5000  # CSV rows validated and copied to staging per batch in wallet imports
+    
+    # Deposit Partitioning Configuration
+    partition_premake_months: int = 3  # Monthly deposit partitions kept created ahead of the current month
+    partition_retain_months: int = 0  # Months of deposit partitions kept attached (older ones 404 in the API); 0 keeps every partition
+    partition_archive_schema: str = "archive"  # Schema that retired partitions are moved to unless dropped
+    partition_check_interval: int = 86400  # Seconds between the monitor's partition pre-creation runs
+    
     # WebSocket Configuration
     websocket_ping_interval: int = 20
     websocket_ping_timeout: int = 10
+    websocket_send_queue_size: int = 100  # Messages buffered per connection before eviction
+    websocket_send_timeout: float = 10.0  # Seconds a single send may take before eviction
+    websocket_max_subscriptions: int = 100  # Wallets a single connection may subscribe to
+    websocket_coalesce_interval: float = 0.25  # Seconds confirmation updates are coalesced; 0 disables
     
     class Config:
         env_file = ".env"
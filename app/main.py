@@ -1,7 +1,9 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.config import settings
-from app.api import users, wallets, deposits, websocket, blockchain_networks
+from app.api import users, wallets, deposits, websocket, blockchain_networks, tokens
+from app.services.event_bus import get_event_bus
+from app.services.response_cache import get_response_cache
 
 # Create FastAPI application
 app = FastAPI(
@@ -19,6 +21,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],  # Deposit list pagination
 )
 
 # Include routers
@@ -27,6 +30,23 @@ app.include_router(wallets.router, prefix="/wallets", tags=["wallets"])
 app.include_router(deposits.router, prefix="/deposits", tags=["deposits"])
 app.include_router(websocket.router, prefix="/ws", tags=["websocket"])
 app.include_router(blockchain_networks.router, prefix="/blockchain-networks", tags=["blockchain-networks"])
+app.include_router(tokens.router, prefix="/tokens", tags=["tokens"])
+
+
+@app.on_event("startup")
+async def start_event_bus():
+    """Deliver deposit events published by the blockchain monitor to WebSocket clients and the response cache."""
+    event_bus = get_event_bus()
+    event_bus.subscribe(websocket.websocket_manager.handle_event)
+    # Drop cached lookups as soon as the monitor reports a change
+    event_bus.subscribe(get_response_cache().handle_event)
+    await event_bus.start()
+
+
+@app.on_event("shutdown")
+async def stop_event_bus():
+    """Stop listening for deposit events."""
+    await get_event_bus().stop()
 
 
 @app.get("/")
@@ -44,3 +64,9 @@ async def root():
 async def health_check():
     """Health check endpoint."""
     return {"status": "healthy", "service": "crypto-deposit-monitor"}
+
+
+@app.get("/cache/stats")
+async def cache_stats():
+    """Hit ratio and counters of this worker's response cache."""
+    return get_response_cache().stats()
@@ -1,4 +1,4 @@
 # Import all models to ensure they are registered with SQLAlchemy
-from .user import User, BlockchainNetwork, Wallet, Deposit, DepositStatus
+from .user import User, BlockchainNetwork, Wallet, Deposit, DepositStatus, Token, BlockHeader, BlockCursor
 
-__all__ = ["User", "BlockchainNetwork", "Wallet", "Deposit", "DepositStatus"]
+__all__ = ["User", "BlockchainNetwork", "Wallet", "Deposit", "DepositStatus", "Token", "BlockHeader", "BlockCursor"]
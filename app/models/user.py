@@ -8,6 +8,8 @@ from sqlalchemy import (
     Numeric,
     ForeignKey,
     Enum,
+    Index,
+    UniqueConstraint,
 )
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
@@ -66,6 +68,7 @@ class BlockchainNetwork(Base):
     # Relationships
     wallets = relationship("Wallet", back_populates="blockchain_network")
     deposits = relationship("Deposit", back_populates="blockchain_network")
+    tokens = relationship("Token", back_populates="blockchain_network")
 
 
 class Wallet(Base):
@@ -103,28 +106,42 @@ class Wallet(Base):
 
 class Deposit(Base):
     __tablename__ = "deposits"
+    # Monthly range partitions, maintained by app.services.partition_manager.
+    # Unique constraints must include created_at, so the global uniqueness of
+    # (blockchain_network_id, tx_hash, log_index) lives in deposit_tx_keys.
+    __table_args__ = {"postgresql_partition_by": "RANGE (created_at)"}
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     wallet_id = Column(
-        UUID(as_uuid=True), ForeignKey("wallets.id"), nullable=False, index=True
+        UUID(as_uuid=True), ForeignKey("wallets.id"), nullable=False
     )
-    tx_hash = Column(String, unique=True, index=True, nullable=False)
+    tx_hash = Column(String, nullable=False)  # Looked up through deposit_tx_keys
+    log_index = Column(
+        Integer, nullable=False, default=-1, server_default="-1"
+    )  # -1 for native transfers, the Transfer log's index for tokens
+    token_address = Column(String, nullable=True)  # None for native transfers
     amount = Column(
         Numeric(precision=36, scale=18), nullable=False
     )  # High precision for crypto amounts
     confirmations = Column(Integer, nullable=False, default=0)
     status = Column(
-        Enum(DepositStatus), nullable=False, default=DepositStatus.PENDING, index=True
+        # Stored as the lowercase values of the depositstatus type, not the member names
+        Enum(DepositStatus, values_callable=lambda statuses: [status.value for status in statuses]),
+        nullable=False,
+        default=DepositStatus.PENDING,
     )
     blockchain_network_id = Column(
         UUID(as_uuid=True), ForeignKey("blockchain_networks.id"), nullable=False
     )
     block_number = Column(BigInteger, nullable=True)
-    block_hash = Column(String, nullable=True)  # For reorg detection
+    block_hash = Column(String, index=True, nullable=True)  # For reorg detection
     from_address = Column(String, nullable=True)
     created_at = Column(
-        DateTime(timezone=True), server_default=func.now(), nullable=False
-    )
+        DateTime(timezone=True),
+        primary_key=True,
+        server_default=func.now(),
+        nullable=False,
+    )  # Partition key
     updated_at = Column(
         DateTime(timezone=True),
         server_default=func.now(),
@@ -135,3 +152,136 @@ class Deposit(Base):
     # Relationships
     wallet = relationship("Wallet", back_populates="deposits")
     blockchain_network = relationship("BlockchainNetwork", back_populates="deposits")
+
+
+class DepositTxKey(Base):
+    """Globally unique (network, tx_hash, log_index) key of a deposit.
+
+    Points at the deposit's partition through created_at, so lookups by
+    transaction or id only scan the one partition holding the row.
+    """
+
+    __tablename__ = "deposit_tx_keys"
+
+    # A transaction can carry several token transfers, one deposit per log
+    blockchain_network_id = Column(
+        UUID(as_uuid=True), ForeignKey("blockchain_networks.id"), primary_key=True
+    )
+    tx_hash = Column(String, primary_key=True, index=True)
+    log_index = Column(Integer, primary_key=True)
+    deposit_id = Column(UUID(as_uuid=True), unique=True, nullable=False)
+    created_at = Column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
+
+
+# Keyset pagination seeks newest first on (created_at, id), overall or within
+# a wallet or status; the latter also serve plain lookups by wallet_id or status
+Index(
+    "ix_deposits_created_at",
+    Deposit.created_at.desc(),
+    Deposit.id.desc(),
+)
+Index(
+    "ix_deposits_wallet_id_created_at",
+    Deposit.wallet_id,
+    Deposit.created_at.desc(),
+    Deposit.id.desc(),
+)
+Index(
+    "ix_deposits_status_created_at",
+    Deposit.status,
+    Deposit.created_at.desc(),
+    Deposit.id.desc(),
+)
+
+
+# Asset key of native-currency deposits in wallet_balances; tokens use their contract address
+NATIVE_ASSET = "native"
+
+
+class WalletBalance(Base):
+    """Running deposit totals of a wallet per asset.
+
+    Maintained by DepositProcessor in the same transaction as every deposit
+    status transition, so it never has to be recomputed from deposits.
+    """
+
+    __tablename__ = "wallet_balances"
+
+    wallet_id = Column(
+        UUID(as_uuid=True), ForeignKey("wallets.id"), primary_key=True
+    )
+    asset = Column(String, primary_key=True)  # NATIVE_ASSET or a token contract address
+    completed_total = Column(
+        Numeric(precision=36, scale=18), nullable=False, default=0, server_default="0"
+    )
+    pending_total = Column(
+        Numeric(precision=36, scale=18), nullable=False, default=0, server_default="0"
+    )  # Pending and confirming deposits
+    completed_count = Column(Integer, nullable=False, default=0, server_default="0")
+    pending_count = Column(Integer, nullable=False, default=0, server_default="0")
+    last_deposit_at = Column(DateTime(timezone=True), nullable=True)
+    updated_at = Column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        onupdate=func.now(),
+        nullable=False,
+    )
+
+
+class Token(Base):
+    __tablename__ = "tokens"
+    __table_args__ = (
+        UniqueConstraint("blockchain_network_id", "address", name="uq_tokens_network_address"),
+    )
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    blockchain_network_id = Column(
+        UUID(as_uuid=True), ForeignKey("blockchain_networks.id"), nullable=False
+    )
+    address = Column(String, nullable=False)  # ERC-20 contract address, lowercase
+    symbol = Column(String, nullable=False)
+    decimals = Column(Integer, nullable=False, default=18)
+    is_active = Column(Boolean, nullable=False, default=True)
+    created_at = Column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
+
+    # Relationships
+    blockchain_network = relationship("BlockchainNetwork", back_populates="tokens")
+
+
+class BlockHeader(Base):
+    __tablename__ = "block_headers"
+
+    blockchain_network_id = Column(
+        UUID(as_uuid=True), ForeignKey("blockchain_networks.id"), primary_key=True
+    )
+    # Work unit (address-range shard) whose monitor stored the header
+    shard_index = Column(Integer, primary_key=True, default=0)
+    shard_count = Column(Integer, primary_key=True, default=1)
+    number = Column(BigInteger, primary_key=True)
+    hash = Column(String, nullable=False)
+    parent_hash = Column(String, nullable=False)
+    created_at = Column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
+
+
+class BlockCursor(Base):
+    __tablename__ = "block_cursors"
+
+    blockchain_network_id = Column(
+        UUID(as_uuid=True), ForeignKey("blockchain_networks.id"), primary_key=True
+    )
+    # Work unit (address-range shard) the cursor belongs to
+    shard_index = Column(Integer, primary_key=True, default=0)
+    shard_count = Column(Integer, primary_key=True, default=1)
+    last_block = Column(BigInteger, nullable=False)  # Last fully processed block
+    updated_at = Column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        onupdate=func.now(),
+        nullable=False,
+    )
@@ -1,7 +1,8 @@
 # Import all schemas to enable forward references
 from .user import UserBase, UserCreate, UserResponse, UserWithWallets
-from .wallet import WalletBase, WalletCreate, WalletResponse
+from .wallet import WalletBase, WalletCreate, WalletResponse, WalletImportIssue, WalletImportResult, WalletBalanceResponse, WalletSummary
 from .deposit import DepositBase, DepositCreate, DepositUpdate, DepositResponse, DepositEvent, ConfirmationUpdateEvent
+from .token import TokenBase, TokenCreate, TokenUpdate, TokenResponse
 
 # Update forward references
 from typing import TYPE_CHECKING
@@ -11,7 +12,9 @@ if TYPE_CHECKING:
 
 __all__ = [
     "UserBase", "UserCreate", "UserResponse", "UserWithWallets",
-    "WalletBase", "WalletCreate", "WalletResponse", 
+    "WalletBase", "WalletCreate", "WalletResponse", "WalletImportIssue", "WalletImportResult",
+    "WalletBalanceResponse", "WalletSummary",
     "DepositBase", "DepositCreate", "DepositUpdate", "DepositResponse",
-    "DepositEvent", "ConfirmationUpdateEvent"
+    "DepositEvent", "ConfirmationUpdateEvent",
+    "TokenBase", "TokenCreate", "TokenUpdate", "TokenResponse"
 ]
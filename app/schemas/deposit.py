@@ -17,6 +17,8 @@ class DepositBase(BaseModel):
     block_number: Optional[int] = None
     block_hash: Optional[str] = None
     from_address: Optional[str] = None
+    log_index: int = -1
+    token_address: Optional[str] = None
 
 
 class DepositCreate(DepositBase):
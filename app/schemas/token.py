@@ -0,0 +1,30 @@
+from pydantic import BaseModel
+from datetime import datetime
+from typing import Optional
+from uuid import UUID
+
+
+class TokenBase(BaseModel):
+    address: str
+    symbol: str
+    decimals: int = 18
+    is_active: bool = True
+
+
+class TokenCreate(TokenBase):
+    blockchain_network_id: UUID
+
+
+class TokenResponse(TokenBase):
+    id: UUID
+    blockchain_network_id: UUID
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+class TokenUpdate(BaseModel):
+    symbol: Optional[str] = None
+    decimals: Optional[int] = None
+    is_active: Optional[bool] = None
@@ -2,6 +2,7 @@ from pydantic import BaseModel, validator
 from datetime import datetime
 from typing import Optional, List, TYPE_CHECKING
 from uuid import UUID
+from decimal import Decimal
 
 if TYPE_CHECKING:
     from .deposit import DepositResponse
@@ -39,6 +40,40 @@ class WalletResponse(WalletBase):
         from_attributes = True
 
 
+class WalletBalanceResponse(BaseModel):
+    asset: str  # "native" or the token contract address
+    completed_total: Decimal
+    pending_total: Decimal  # Pending and confirming deposits
+    completed_count: int
+    pending_count: int
+    last_deposit_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+
+class WalletSummary(BaseModel):
+    wallet_id: UUID
+    address: str
+    balances: List[WalletBalanceResponse] = []
+
+
+class WalletImportIssue(BaseModel):
+    line: int  # Line of the CSV file, the header being line 1
+    address: Optional[str] = None
+    reason: str
+
+
+class WalletImportResult(BaseModel):
+    rows: int = 0
+    imported: int = 0
+    already_registered: int = 0  # Same address, user and network; left unchanged
+    conflicts: int = 0  # Duplicates in the file or addresses owned by another user or network
+    invalid: int = 0  # Malformed rows and unknown users or networks
+    issues: List[WalletImportIssue] = []
+    issues_truncated: bool = False
+
+
 # class WalletWithDeposits(WalletResponse):
 #     deposits: List["DepositResponse"] = []
 
@@ -1,4 +1,4 @@
 # Services
-from . import websocket_manager, deposit_processor, blockchain_monitor
+from . import websocket_manager, deposit_processor, blockchain_monitor, rpc_client, block_filter, confirmation_scheduler, header_chain, chain_state, event_bus, wallet_registry, network_monitor, shard_coordinator, token_transfers, mempool, rpc_cache, rpc_pool, response_cache, wallet_import, partition_manager
 
-__all__ = ["websocket_manager", "deposit_processor", "blockchain_monitor"]
+__all__ = ["websocket_manager", "deposit_processor", "blockchain_monitor", "rpc_client", "block_filter", "confirmation_scheduler", "header_chain", "chain_state", "event_bus", "wallet_registry", "network_monitor", "shard_coordinator", "token_transfers", "mempool", "rpc_cache", "rpc_pool", "response_cache", "wallet_import", "partition_manager"]
@@ -0,0 +1,37 @@
+from typing import Iterable, List, Set
+
+
+class BlockFilter:
+    """Selects the transactions of a block that pay into monitored wallets.
+
+    Runs as a single pass over the block's transactions against a precomputed
+    set of lowercase address keys, so irrelevant transactions never reach the
+    per-transaction processing path.
+    """
+
+    def __init__(self, addresses: Iterable[str] = ()):
+        self.address_keys: Set[str] = set()
+        self.update(addresses)
+
+    def update(self, addresses: Iterable[str]):
+        """Replace the set of watched addresses."""
+        self.address_keys = {address.lower() for address in addresses}
+
+    def add(self, addresses: Iterable[str]):
+        """Start watching addresses without rebuilding the set."""
+        self.address_keys.update(address.lower() for address in addresses)
+
+    def discard(self, addresses: Iterable[str]):
+        """Stop watching addresses without rebuilding the set."""
+        self.address_keys.difference_update(address.lower() for address in addresses)
+
+    def match(self, transactions: List[dict]) -> List[dict]:
+        """Return the transactions whose ``to`` address is watched."""
+        keys = self.address_keys
+        return [
+            tx for tx in transactions
+            if (to_address := tx.get("to")) and to_address.lower() in keys
+        ]
+
+    def __len__(self) -> int:
+        return len(self.address_keys)
@@ -1,100 +1,82 @@
 import asyncio
-import json
 import logging
-from typing import Dict, List, Optional
-from decimal import Decimal
-from web3 import Web3
-from web3.middleware import geth_poa_middleware
-import websockets
+import time
+from typing import Dict, List
+from uuid import UUID
 
 from app.config import settings
 from app.database import AsyncSessionLocal
-from app.models.user import Deposit, Wallet, BlockchainNetwork, DepositStatus
+from app.models.user import BlockchainNetwork
 from app.services.deposit_processor import DepositProcessor
-from app.services.websocket_manager import WebSocketManager
-from app.utils import normalize_address, normalize_transaction_hash
-from sqlalchemy import select
+from app.services.event_bus import get_event_bus
+from app.services.network_monitor import NetworkMonitor
+from app.services.partition_manager import PartitionManager
+from app.services.rpc_cache import RPCCache
+from app.services.shard_coordinator import ShardCoordinator, WorkUnit
 
 logger = logging.getLogger(__name__)
 
 
 class BlockchainMonitor:
-    """Monitors blockchain for new transactions and confirmations."""
+    """Monitors every active blockchain network for new transactions and confirmations.
+    
+    Runs one independent NetworkMonitor task per work unit. Without sharding
+    a work unit is a whole active BlockchainNetwork row. With
+    ``MONITOR_SHARDING`` each network is split into ``MONITOR_SHARD_COUNT``
+    wallet address ranges, and units are leased to the running monitor
+    processes with Postgres advisory locks, so several processes share the
+    load without double-processing and rebalance when one joins or dies.
+    
+    The network table is polled so networks added, deactivated or
+    re-pointed at another endpoint at runtime are picked up without a restart.
+    
+    Work units of the same network share one RPC cache, so a block is
+    downloaded once per process however many of its shards run here.
+    
+    Every ``PARTITION_CHECK_INTERVAL`` seconds the monitor also pre-creates
+    the monthly deposit partitions, so deposit inserts never find their
+    month missing even if the maintenance command is not scheduled.
+    """
     
     def __init__(self):
-        self.w3_http = None
-        self.ws_connection = None
-        self.websocket_manager = WebSocketManager()
+        self.event_bus = get_event_bus()
         self.running = False
-        self.monitored_wallets: Dict[str, Wallet] = {}
-        
-    async def initialize(self):
-        """Initialize Web3 connections."""
-        try:
-            # Initialize HTTP Web3 connection
-            self.w3_http = Web3(Web3.HTTPProvider(settings.alchemy_http_url))
-            
-            # Add PoA middleware for testnets
-            self.w3_http.middleware_onion.inject(geth_poa_middleware, layer=0)
-            
-            # Verify connection
-            if not self.w3_http.is_connected():
-                raise Exception("Failed to connect to Ethereum node via HTTP")
-            
-            logger.info("Initialized HTTP Web3 connection")
-            
-            # Initialize WebSocket connection
-            await self._initialize_websocket()
-            
-        except Exception as e:
-            logger.error(f"Failed to initialize blockchain monitor: {e}")
-            raise
-    
-    async def _initialize_websocket(self):
-        """Initialize WebSocket connection to Alchemy."""
-        try:
-            # Create WebSocket connection
-            self.ws_connection = await websockets.connect(settings.alchemy_ws_url)
-            
-            # Subscribe to new block headers
-            subscribe_message = {
-                "id": 1,
-                "method": "eth_subscribe",
-                "params": ["newHeads"]
-            }
-            
-            await self.ws_connection.send(json.dumps(subscribe_message))
-            response = await self.ws_connection.recv()
-            response_data = json.loads(response)
-            
-            if "error" in response_data:
-                raise Exception(f"WebSocket subscription failed: {response_data['error']}")
-            
-            logger.info("Initialized WebSocket connection and subscribed to new blocks")
-            
-        except Exception as e:
-            logger.error(f"Failed to initialize WebSocket: {e}")
-            raise
+        self.coordinator = ShardCoordinator(settings.database_url) if settings.monitor_sharding else None
+        self.monitors: Dict[WorkUnit, NetworkMonitor] = {}
+        self.tasks: Dict[WorkUnit, asyncio.Task] = {}
+        self.rpc_caches: Dict[UUID, RPCCache] = {}
+        self.last_partition_check = None
     
     async def start_monitoring(self):
         """Start the blockchain monitoring service."""
         logger.info("Starting blockchain monitor...")
         
+        if self.coordinator:
+            interval = settings.shard_rebalance_interval
+        else:
+            interval = settings.network_refresh_interval
+        
         try:
-            await self.initialize()
-            await self.load_monitored_wallets()
+            # Forward wallet changes from the API to every network's registry
+            self.event_bus.subscribe(self._handle_event)
+            await self.event_bus.start()
             
             self.running = True
             
-            # Start monitoring tasks
-            tasks = [
-                asyncio.create_task(self._monitor_new_blocks()),
-                asyncio.create_task(self._update_confirmations()),
-                asyncio.create_task(self._check_reorgs())
-            ]
-            
-            await asyncio.gather(*tasks)
-            
+            while self.running:
+                await self.ensure_partitions()
+                
+                try:
+                    await self.sync_networks()
+                except Exception as e:
+                    logger.error(f"Error syncing blockchain networks: {e}")
+                    if self.coordinator:
+                        # Leases may be lost with the lock connection, stop until it is re-established
+                        await self._stop_all()
+                        await self.coordinator.stop()
+                
+                await asyncio.sleep(interval)
+        
         except Exception as e:
             logger.error(f"Blockchain monitor error: {e}")
         finally:
@@ -105,222 +87,121 @@ class BlockchainMonitor:
         logger.info("Stopping blockchain monitor...")
         self.running = False
         
-        if self.ws_connection:
-            await self.ws_connection.close()
-    
-    async def load_monitored_wallets(self):
-        """Load all wallets that should be monitored."""
-        async with AsyncSessionLocal() as db:
-            processor = DepositProcessor(db)
-            wallets = await processor.get_monitored_wallets()
-            
-            self.monitored_wallets = {
-                wallet.address.lower(): wallet for wallet in wallets
-            }
-            
-            logger.info(f"Loaded {len(self.monitored_wallets)} monitored wallets")
-    
-    async def _monitor_new_blocks(self):
-        """Monitor for new blocks and process transactions."""
-        logger.info("Starting new block monitoring...")
+        await self._stop_all()
         
-        while self.running:
-            try:
-                if not self.ws_connection:
-                    await self._initialize_websocket()
-                
-                # Wait for new block notification
-                message = await self.ws_connection.recv()
-                data = json.loads(message)
-                
-                if data.get("method") == "eth_subscription":
-                    await self._process_new_block(data["params"]["result"])
-                
-            except websockets.exceptions.ConnectionClosed:
-                logger.warning("WebSocket connection closed, reconnecting...")
-                await asyncio.sleep(5)
-                await self._initialize_websocket()
-            except Exception as e:
-                logger.error(f"Error in block monitoring: {e}")
-                await asyncio.sleep(5)
+        if self.coordinator:
+            await self.coordinator.stop()
+        
+        await self.event_bus.stop()
     
-    async def _process_new_block(self, block_data: dict):
-        """Process a new block and check for relevant transactions."""
+    async def ensure_partitions(self):
+        """Pre-create upcoming deposit partitions if the last check is older than the interval."""
+        now = time.monotonic()
+        if self.last_partition_check is not None and now - self.last_partition_check < settings.partition_check_interval:
+            return
+        
         try:
-            block_number = int(block_data["number"], 16)
-            block_hash = block_data["hash"]
-            
-            logger.info(f"Processing new block {block_number}: {block_hash}")
-            
-            # Get block details with transactions
-            block = self.w3_http.eth.get_block(block_number, full_transactions=True)
-            
-            # Process each transaction
-            for tx in block.transactions:
-                await self._process_transaction(tx, block_number, block_hash)
-                
+            async with AsyncSessionLocal() as db:
+                await PartitionManager(db).ensure_partitions()
+            self.last_partition_check = now
         except Exception as e:
-            logger.error(f"Error processing block: {e}")
+            # Retried on the next loop iteration
+            logger.error(f"Error creating deposit partitions: {e}")
     
-    async def _process_transaction(self, tx, block_number: int, block_hash: str):
-        """Process a single transaction."""
-        try:
-            # Check if transaction is to a monitored wallet
-            to_address = tx.get("to")
-            if not to_address:
-                return
-            
-            normalized_to = normalize_address(to_address)
-            
-            if normalized_to not in self.monitored_wallets:
-                return
-            
-            wallet = self.monitored_wallets[normalized_to]
-            
-            # Get transaction receipt for status
-            try:
-                receipt = self.w3_http.eth.get_transaction_receipt(tx.hash.hex())
-                if receipt.status == 0:  # Failed transaction
-                    return
-            except Exception:
-                # Transaction might not be mined yet
-                pass
-            
-            # Calculate amount in ETH
-            amount_wei = tx.value
-            amount_eth = Decimal(amount_wei) / Decimal(10**18)
-            
-            # Create deposit record
-            async with AsyncSessionLocal() as db:
-                processor = DepositProcessor(db)
-                
-                deposit_data = {
-                    "wallet_id": str(wallet.id),
-                    "tx_hash": tx.hash.hex(),
-                    "amount": amount_eth,
-                    "confirmations": 0,
-                    "status": DepositStatus.PENDING,
-                    "blockchain_network_id": str(wallet.blockchain_network_id),
-                    "block_number": block_number,
-                    "block_hash": block_hash,
-                    "from_address": normalize_address(tx.get("from", ""))
-                }
-                
-                deposit = await processor.create_deposit(deposit_data)
-                
-                if deposit:
-                    # Send WebSocket notification
-                    await self.websocket_manager.broadcast_deposit_update(
-                        wallet.address,
-                        {
-                            "id": str(deposit.id),
-                            "tx_hash": deposit.tx_hash,
-                            "amount": str(deposit.amount),
-                            "confirmations": deposit.confirmations,
-                            "status": deposit.status.value,
-                            "block_number": deposit.block_number,
-                            "from_address": deposit.from_address
-                        }
-                    )
-                    
-                    logger.info(f"Detected deposit: {amount_eth} ETH to {wallet.address}")
+    async def sync_networks(self):
+        """Start monitors for the work units this process owns and stop the others."""
+        async with AsyncSessionLocal() as db:
+            processor = DepositProcessor(db)
+            networks = {network.id: network for network in await processor.get_active_networks()}
         
-        except Exception as e:
-            logger.error(f"Error processing transaction: {e}")
+        units = {
+            unit: network
+            for network in networks.values()
+            for unit in self._work_units(network)
+        }
+        
+        for unit in list(self.monitors):
+            if unit not in units:
+                await self._stop_unit(unit)
+            elif self._endpoint_changed(self.monitors[unit].network, units[unit]):
+                await self._stop_unit(unit)
+                # A new endpoint may serve another chain under the same network row
+                self.rpc_caches.pop(unit.network_id, None)
+        
+        if self.coordinator:
+            if not self.coordinator.connected:
+                await self._stop_all()
+                await self.coordinator.start()
+            await self.coordinator.rebalance(units, self._stop_unit)
+            owned = list(self.coordinator.owned)
+        else:
+            owned = list(units)
+        
+        # Drop the caches of networks this process no longer monitors
+        running_networks = {unit.network_id for unit in self.monitors} | {unit.network_id for unit in owned}
+        for network_id in list(self.rpc_caches):
+            if network_id not in running_networks:
+                logger.info(f"RPC cache for network {network_id}: {self.rpc_caches.pop(network_id).stats()}")
+        
+        for unit in owned:
+            task = self.tasks.get(unit)
+            if task is not None and task.done():
+                # The ingestion loop only exits on an unexpected error
+                if not task.cancelled() and task.exception():
+                    logger.error(f"Monitor for work unit {unit} crashed: {task.exception()}")
+                await self._stop_unit(unit)
+            
+            if unit not in self.monitors:
+                self._start_unit(units[unit], unit)
     
-    async def _update_confirmations(self):
-        """Periodically update confirmation counts for pending deposits."""
-        logger.info("Starting confirmation updates...")
+    def _work_units(self, network: BlockchainNetwork) -> List[WorkUnit]:
+        if not self.coordinator:
+            return [WorkUnit(network.id)]
         
-        while self.running:
-            try:
-                await asyncio.sleep(15)  # Update every 15 seconds
-                
-                async with AsyncSessionLocal() as db:
-                    processor = DepositProcessor(db)
-                    
-                    # Get pending deposits
-                    result = await db.execute(
-                        select(Deposit).where(
-                            Deposit.status.in_([DepositStatus.PENDING, DepositStatus.CONFIRMING])
-                        )
-                    )
-                    deposits = result.scalars().all()
-                    
-                    current_block = self.w3_http.eth.block_number
-                    
-                    for deposit in deposits:
-                        if deposit.block_number:
-                            confirmations = current_block - deposit.block_number
-                            
-                            if confirmations != deposit.confirmations:
-                                # Update confirmations
-                                updated_deposit = await processor.update_deposit_confirmations(
-                                    deposit.tx_hash,
-                                    confirmations,
-                                    deposit.block_hash
-                                )
-                                
-                                if updated_deposit:
-                                    # Send WebSocket notification
-                                    await self.websocket_manager.broadcast_confirmation_update(
-                                        deposit.wallet.address,
-                                        deposit.tx_hash,
-                                        confirmations,
-                                        updated_deposit.status.value
-                                    )
-                                    
-                                    logger.info(f"Updated confirmations for {deposit.tx_hash}: {confirmations}")
-            
-            except Exception as e:
-                logger.error(f"Error updating confirmations: {e}")
+        shard_count = settings.monitor_shard_count
+        return [WorkUnit(network.id, index, shard_count) for index in range(shard_count)]
     
-    async def _check_reorgs(self):
-        """Check for blockchain reorganizations."""
-        logger.info("Starting reorg detection...")
+    def _start_unit(self, network: BlockchainNetwork, unit: WorkUnit):
+        logger.info(f"Starting monitor for network {network.name} (chain ID {network.chain_id}), work unit {unit}")
         
-        while self.running:
+        rpc_cache = self.rpc_caches.get(network.id)
+        if rpc_cache is None:
+            rpc_cache = self.rpc_caches[network.id] = RPCCache(settings.rpc_cache_size)
+        
+        monitor = NetworkMonitor(network, self.event_bus, unit, rpc_cache)
+        self.monitors[unit] = monitor
+        self.tasks[unit] = asyncio.create_task(monitor.run())
+    
+    def get_cache_stats(self) -> Dict[str, Dict]:
+        """Get RPC cache hit/miss counters keyed by network ID."""
+        return {str(network_id): cache.stats() for network_id, cache in self.rpc_caches.items()}
+    
+    async def _stop_unit(self, unit: WorkUnit):
+        monitor = self.monitors.pop(unit, None)
+        task = self.tasks.pop(unit, None)
+        
+        if monitor:
+            await monitor.stop_monitoring()
+        
+        if task and not task.done():
+            task.cancel()
             try:
-                await asyncio.sleep(60)  # Check every minute
-                
-                async with AsyncSessionLocal() as db:
-                    processor = DepositProcessor(db)
-                    
-                    # Get recent deposits with block hashes
-                    result = await db.execute(
-                        select(Deposit).where(
-                            Deposit.block_hash.isnot(None),
-                            Deposit.status.in_([DepositStatus.PENDING, DepositStatus.CONFIRMING, DepositStatus.COMPLETED])
-                        ).limit(100)
-                    )
-                    deposits = result.scalars().all()
-                    
-                    for deposit in deposits:
-                        if deposit.block_number and deposit.block_hash:
-                            try:
-                                # Check if block still exists with same hash
-                                current_block = self.w3_http.eth.get_block(deposit.block_number)
-                                
-                                if current_block.hash.hex() != deposit.block_hash:
-                                    # Block hash changed - reorg detected
-                                    logger.warning(f"Reorg detected for deposit {deposit.tx_hash}")
-                                    
-                                    orphaned_deposit = await processor.mark_deposit_orphaned(deposit.tx_hash)
-                                    
-                                    if orphaned_deposit:
-                                        # Send WebSocket notification
-                                        await self.websocket_manager.broadcast_deposit_update(
-                                            deposit.wallet.address,
-                                            {
-                                                "id": str(deposit.id),
-                                                "tx_hash": deposit.tx_hash,
-                                                "status": DepositStatus.ORPHANED.value,
-                                                "message": "Transaction orphaned due to blockchain reorganization"
-                                            }
-                                        )
-                            
-                            except Exception as e:
-                                logger.error(f"Error checking reorg for deposit {deposit.tx_hash}: {e}")
-            
-            except Exception as e:
-                logger.error(f"Error in reorg detection: {e}")
+                await task
+            except (asyncio.CancelledError, Exception):
+                pass
+    
+    async def _stop_all(self):
+        for unit in list(self.monitors):
+            await self._stop_unit(unit)
+    
+    @staticmethod
+    def _endpoint_changed(current: BlockchainNetwork, latest: BlockchainNetwork) -> bool:
+        return (
+            current.rpc_url != latest.rpc_url
+            or current.ws_url != latest.ws_url
+            or current.confirmations_required != latest.confirmations_required
+        )
+    
+    async def _handle_event(self, event: dict):
+        for monitor in list(self.monitors.values()):
+            await monitor.wallet_registry.handle_event(event)
@@ -0,0 +1,114 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, delete, or_, func
+from sqlalchemy.dialects.postgresql import insert
+from typing import List, Optional
+import logging
+
+from app.models.user import BlockHeader, BlockCursor
+from app.services.header_chain import ChainHeader
+
+logger = logging.getLogger(__name__)
+
+
+class ChainStateStore:
+    """Persists the monitor's chain state for one work unit.
+
+    A work unit is a network, or one address-range shard of a network when
+    monitor workers are sharded; the default 0/1 is the whole network.
+    """
+
+    def __init__(self, db: AsyncSession, shard_index: int = 0, shard_count: int = 1):
+        self.db = db
+        self.shard_index = shard_index
+        self.shard_count = shard_count
+
+    def _unit(self, model):
+        return (
+            model.shard_index == self.shard_index,
+            model.shard_count == self.shard_count,
+        )
+
+    async def load_headers(self, network_id, limit: int) -> List[ChainHeader]:
+        """Load the most recent stored headers for a network, oldest first."""
+        result = await self.db.execute(
+            select(BlockHeader.number, BlockHeader.hash, BlockHeader.parent_hash)
+            .where(BlockHeader.blockchain_network_id == network_id, *self._unit(BlockHeader))
+            .order_by(BlockHeader.number.desc())
+            .limit(limit)
+        )
+        return [ChainHeader(*row) for row in reversed(result.all())]
+
+    async def save_headers(self, network_id, headers: List[ChainHeader], keep_from: int):
+        """Store newly appended headers.
+
+        Rows at or above the first new header are replaced, and rows below
+        ``keep_from`` are pruned so the table stays as small as the buffer.
+        """
+        if not headers:
+            return
+
+        await self.db.execute(
+            delete(BlockHeader).where(
+                BlockHeader.blockchain_network_id == network_id,
+                *self._unit(BlockHeader),
+                or_(
+                    BlockHeader.number >= headers[0].number,
+                    BlockHeader.number < keep_from,
+                ),
+            )
+        )
+        await self.db.execute(
+            insert(BlockHeader).values([
+                {
+                    "blockchain_network_id": network_id,
+                    "shard_index": self.shard_index,
+                    "shard_count": self.shard_count,
+                    "number": header.number,
+                    "hash": header.hash,
+                    "parent_hash": header.parent_hash,
+                }
+                for header in headers
+            ])
+        )
+        await self.db.commit()
+
+    async def get_cursor(self, network_id) -> Optional[int]:
+        """Get the last fully processed block of the work unit."""
+        result = await self.db.execute(
+            select(BlockCursor.last_block).where(
+                BlockCursor.blockchain_network_id == network_id,
+                *self._unit(BlockCursor),
+            )
+        )
+        return result.scalar_one_or_none()
+
+    async def get_network_cursor(self, network_id) -> Optional[int]:
+        """Get the lowest cursor of any work unit of a network.
+
+        Used as the starting point of a unit without its own cursor, such as
+        a new shard after the shard count changed, so no block is skipped.
+        """
+        result = await self.db.execute(
+            select(func.min(BlockCursor.last_block)).where(BlockCursor.blockchain_network_id == network_id)
+        )
+        return result.scalar_one_or_none()
+
+    async def set_cursor(self, network_id, block_number: int):
+        """Record the last fully processed block of the work unit."""
+        stmt = insert(BlockCursor).values(
+            blockchain_network_id=network_id,
+            shard_index=self.shard_index,
+            shard_count=self.shard_count,
+            last_block=block_number,
+        )
+        await self.db.execute(
+            stmt.on_conflict_do_update(
+                index_elements=[
+                    BlockCursor.blockchain_network_id,
+                    BlockCursor.shard_index,
+                    BlockCursor.shard_count,
+                ],
+                set_={"last_block": stmt.excluded.last_block, "updated_at": func.now()},
+            )
+        )
+        await self.db.commit()
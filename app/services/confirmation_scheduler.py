@@ -0,0 +1,76 @@
+import heapq
+from datetime import datetime
+from typing import Dict, List, NamedTuple, Optional, Tuple
+from uuid import UUID
+
+
+class ScheduledDeposit(NamedTuple):
+    deposit_id: UUID
+    block_number: int
+    confirmations_required: int
+    created_at: Optional[datetime] = None  # Partition key of the deposit row
+
+
+class ConfirmationScheduler:
+    """Min-heap of pending deposits keyed by the block height of their next status change.
+
+    A deposit mined in block N moves to CONFIRMING at head N + 1 and to
+    COMPLETED at head N + confirmations_required. Each new head only pops the
+    deposits whose transition is due, instead of re-checking every pending one.
+    """
+
+    def __init__(self):
+        self._heap: List[Tuple[int, UUID]] = []
+        # Latest due height per deposit; heap entries that disagree are stale
+        self._entries: Dict[UUID, Tuple[int, ScheduledDeposit]] = {}
+
+    @staticmethod
+    def next_status_change(block_number: int, confirmations: int, confirmations_required: int) -> int:
+        """Get the head height at which a deposit's status changes next."""
+        if confirmations < 1 and confirmations_required > 1:
+            return block_number + 1
+        return block_number + confirmations_required
+
+    def schedule(
+        self,
+        deposit_id: UUID,
+        block_number: int,
+        confirmations_required: int,
+        confirmations: int = 0,
+        created_at: Optional[datetime] = None,
+    ):
+        """Schedule a deposit for its next status change, replacing any earlier entry."""
+        due_height = self.next_status_change(block_number, confirmations, confirmations_required)
+        self.schedule_at(
+            ScheduledDeposit(deposit_id, block_number, confirmations_required, created_at),
+            due_height,
+        )
+
+    def schedule_at(self, deposit: ScheduledDeposit, due_height: int):
+        """Schedule a deposit to be popped once the head reaches ``due_height``."""
+        self._entries[deposit.deposit_id] = (due_height, deposit)
+        heapq.heappush(self._heap, (due_height, deposit.deposit_id))
+
+    def discard(self, deposit_id: UUID):
+        """Stop tracking a deposit. Its heap entry is dropped lazily."""
+        self._entries.pop(deposit_id, None)
+
+    def pop_due(self, head: int) -> List[ScheduledDeposit]:
+        """Pop every deposit whose status change is due at ``head``."""
+        due = []
+        while self._heap and self._heap[0][0] <= head:
+            due_height, deposit_id = heapq.heappop(self._heap)
+            entry = self._entries.get(deposit_id)
+            if entry is None or entry[0] != due_height:
+                continue
+            del self._entries[deposit_id]
+            due.append(entry[1])
+        return due
+
+    def clear(self):
+        """Drop all scheduled deposits."""
+        self._heap.clear()
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -1,15 +1,98 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
-from typing import Optional, List
+from sqlalchemy import Select, select, update, case, literal, func, values, column, String, Integer, BigInteger
+from sqlalchemy.dialects.postgresql import insert, UUID
+from typing import Optional, List, Dict, Iterable, NamedTuple, Sequence
+from datetime import datetime, timezone
 from decimal import Decimal
 import logging
+import uuid
 
-from app.models.user import Deposit, Wallet, BlockchainNetwork, DepositStatus
+from app.models.user import Deposit, DepositTxKey, Wallet, WalletBalance, BlockchainNetwork, DepositStatus, Token, NATIVE_ASSET
 from app.schemas.deposit import DepositCreate, DepositUpdate
 from app.utils import validate_transaction_hash, normalize_transaction_hash
 
 logger = logging.getLogger(__name__)
 
+# Which wallet_balances total a deposit in each status counts towards
+BALANCE_BUCKETS = {
+    DepositStatus.PENDING: "pending",
+    DepositStatus.CONFIRMING: "pending",
+    DepositStatus.COMPLETED: "completed",
+}
+
+
+class BalanceChange(NamedTuple):
+    """A deposit status transition; ``old_status`` is None for a new deposit."""
+    
+    wallet_id: uuid.UUID
+    token_address: Optional[str]
+    amount: Decimal
+    old_status: Optional[DepositStatus]
+    new_status: DepositStatus
+    created_at: Optional[datetime] = None
+
+
+def balance_deltas(changes: Iterable[BalanceChange]) -> List[dict]:
+    """Fold deposit transitions into one wallet_balances delta row per (wallet, asset)."""
+    deltas: Dict[tuple, dict] = {}
+    
+    for change in changes:
+        old_bucket = BALANCE_BUCKETS.get(change.old_status)
+        new_bucket = BALANCE_BUCKETS.get(change.new_status)
+        if old_bucket == new_bucket:
+            continue
+        
+        key = (change.wallet_id, change.token_address or NATIVE_ASSET)
+        delta = deltas.get(key)
+        if delta is None:
+            delta = deltas[key] = {
+                "wallet_id": key[0],
+                "asset": key[1],
+                "completed_total": Decimal(0),
+                "pending_total": Decimal(0),
+                "completed_count": 0,
+                "pending_count": 0,
+                "last_deposit_at": None,
+            }
+        
+        if old_bucket:
+            delta[f"{old_bucket}_total"] -= change.amount
+            delta[f"{old_bucket}_count"] -= 1
+        if new_bucket:
+            delta[f"{new_bucket}_total"] += change.amount
+            delta[f"{new_bucket}_count"] += 1
+            if old_bucket is None and change.created_at is not None:
+                if delta["last_deposit_at"] is None or change.created_at > delta["last_deposit_at"]:
+                    delta["last_deposit_at"] = change.created_at
+    
+    # A fixed row order keeps concurrent upserts from deadlocking
+    return [deltas[key] for key in sorted(deltas, key=lambda key: (str(key[0]), key[1]))]
+
+
+def deposit_by_id_query(deposit_id) -> Select:
+    """Select a deposit by id through its tx key, so only its partition is scanned."""
+    return (
+        select(Deposit)
+        .join(
+            DepositTxKey,
+            (DepositTxKey.deposit_id == Deposit.id) & (DepositTxKey.created_at == Deposit.created_at),
+        )
+        .where(DepositTxKey.deposit_id == deposit_id)
+    )
+
+
+def deposits_by_tx_hash_query(tx_hash: str) -> Select:
+    """Select the deposits of a transaction through their tx keys, ordered by log index."""
+    return (
+        select(Deposit)
+        .join(
+            DepositTxKey,
+            (DepositTxKey.deposit_id == Deposit.id) & (DepositTxKey.created_at == Deposit.created_at),
+        )
+        .where(DepositTxKey.tx_hash == tx_hash)
+        .order_by(DepositTxKey.log_index)
+    )
+
 
 class DepositProcessor:
     """Handles deposit processing logic and business rules."""
@@ -25,7 +108,7 @@ class DepositProcessor:
             raise ValueError("Invalid transaction hash format")
         
         # Check if deposit already exists
-        existing_deposit = await self.get_deposit_by_tx_hash(normalized_hash)
+        existing_deposit = await self.get_deposit_by_tx_hash(normalized_hash, deposit_data.log_index)
         if existing_deposit:
             logger.warning(f"Deposit with tx_hash {normalized_hash} already exists")
             return existing_deposit
@@ -40,8 +123,11 @@ class DepositProcessor:
         if not network:
             raise ValueError("Blockchain network not found")
         
-        # Create deposit
+        # Create deposit and claim its key; both carry the partition's created_at
+        created_at = datetime.now(timezone.utc)
         deposit = Deposit(
+            id=uuid.uuid4(),
+            created_at=created_at,
             wallet_id=deposit_data.wallet_id,
             tx_hash=normalized_hash,
             amount=deposit_data.amount,
@@ -50,24 +136,160 @@ class DepositProcessor:
             blockchain_network_id=deposit_data.blockchain_network_id,
             block_number=deposit_data.block_number,
             block_hash=deposit_data.block_hash,
-            from_address=deposit_data.from_address
+            from_address=deposit_data.from_address,
+            log_index=deposit_data.log_index,
+            token_address=deposit_data.token_address
         )
         
         self.db.add(deposit)
+        self.db.add(DepositTxKey(
+            blockchain_network_id=deposit.blockchain_network_id,
+            tx_hash=deposit.tx_hash,
+            log_index=deposit.log_index,
+            deposit_id=deposit.id,
+            created_at=created_at
+        ))
+        await self.apply_balance_changes([BalanceChange(
+            deposit.wallet_id,
+            deposit.token_address,
+            deposit.amount,
+            None,
+            deposit.status or DepositStatus.PENDING,
+            created_at
+        )])
         await self.db.commit()
         await self.db.refresh(deposit)
         
         logger.info(f"Created deposit {deposit.id} for tx_hash {normalized_hash}")
         return deposit
     
+    async def create_deposits_bulk(self, deposits_data: List[dict]) -> List[Deposit]:
+        """Insert a batch of deposits in one transaction.
+        
+        The (blockchain_network_id, tx_hash, log_index) keys are claimed with a
+        multi-row INSERT INTO deposit_tx_keys ... ON CONFLICT DO NOTHING
+        RETURNING, which also fixes each new deposit's created_at and so its
+        partition; only deposits whose key was claimed are inserted and
+        returned. Native transfers use log_index -1; token transfers the index
+        of their Transfer log, so one transaction can carry several deposits.
+        An existing deposit is only touched when it was orphaned by a reorg
+        and its transaction has been re-included, in which case it is moved
+        back to PENDING in the new block and returned as well. Wallet and
+        network ids are trusted to come from the monitored wallet registry.
+        Wallet balances are updated in the same transaction.
+        """
+        rows = {}
+        for deposit_data in deposits_data:
+            normalized_hash = normalize_transaction_hash(deposit_data["tx_hash"])
+            if not validate_transaction_hash(normalized_hash):
+                logger.warning(f"Skipping deposit with invalid tx_hash {deposit_data['tx_hash']}")
+                continue
+            
+            log_index = deposit_data.get("log_index", -1)
+            rows[(normalized_hash, log_index)] = {
+                **deposit_data,
+                "id": uuid.uuid4(),
+                "tx_hash": normalized_hash,
+                "log_index": log_index,
+            }
+        
+        if not rows:
+            return []
+        
+        result = await self.db.execute(
+            insert(DepositTxKey)
+            .values([
+                {
+                    "blockchain_network_id": row["blockchain_network_id"],
+                    "tx_hash": row["tx_hash"],
+                    "log_index": row["log_index"],
+                    "deposit_id": row["id"],
+                }
+                for row in rows.values()
+            ])
+            .on_conflict_do_nothing()
+            .returning(DepositTxKey.deposit_id, DepositTxKey.created_at)
+        )
+        claimed = dict(result.all())
+        
+        deposits = []
+        new_rows = [
+            {**row, "created_at": claimed[row["id"]]}
+            for row in rows.values() if row["id"] in claimed
+        ]
+        if new_rows:
+            result = await self.db.execute(insert(Deposit).values(new_rows).returning(Deposit))
+            deposits.extend(result.scalars().all())
+        
+        existing_rows = [row for row in rows.values() if row["id"] not in claimed]
+        if existing_rows:
+            deposits.extend(await self._reinclude_orphaned(existing_rows))
+        
+        # New and re-included deposits both start counting again
+        await self.apply_balance_changes(
+            BalanceChange(d.wallet_id, d.token_address, d.amount, None, d.status, d.created_at)
+            for d in deposits
+        )
+        await self.db.commit()
+        
+        logger.info(f"Inserted {len(deposits)} of {len(rows)} deposits")
+        return deposits
+    
+    async def _reinclude_orphaned(self, rows: List[dict]) -> List[Deposit]:
+        """Move the orphaned deposits among already-keyed rows back to PENDING in their new block."""
+        reincluded = values(
+            column("blockchain_network_id", UUID(as_uuid=True)),
+            column("tx_hash", String),
+            column("log_index", Integer),
+            column("confirmations", Integer),
+            column("block_number", BigInteger),
+            column("block_hash", String),
+            name="reincluded",
+        ).data([
+            (
+                row["blockchain_network_id"],
+                row["tx_hash"],
+                row["log_index"],
+                row.get("confirmations", 0),
+                row.get("block_number"),
+                row.get("block_hash"),
+            )
+            for row in rows
+        ])
+        
+        # The key's created_at pins each update to the deposit's partition
+        result = await self.db.execute(
+            update(Deposit)
+            .where(
+                DepositTxKey.blockchain_network_id == reincluded.c.blockchain_network_id,
+                DepositTxKey.tx_hash == reincluded.c.tx_hash,
+                DepositTxKey.log_index == reincluded.c.log_index,
+                Deposit.id == DepositTxKey.deposit_id,
+                Deposit.created_at == DepositTxKey.created_at,
+                Deposit.status == DepositStatus.ORPHANED,
+            )
+            .values(
+                status=DepositStatus.PENDING,
+                confirmations=reincluded.c.confirmations,
+                block_number=reincluded.c.block_number,
+                block_hash=reincluded.c.block_hash,
+                updated_at=func.now(),
+            )
+            .returning(Deposit)
+            .execution_options(synchronize_session=False)
+        )
+        return result.scalars().all()
+    
     async def update_deposit(self, deposit_id: str, update_data: DepositUpdate) -> Optional[Deposit]:
         """Update an existing deposit."""
-        result = await self.db.execute(select(Deposit).where(Deposit.id == deposit_id))
+        result = await self.db.execute(deposit_by_id_query(deposit_id))
         deposit = result.scalar_one_or_none()
         
         if not deposit:
             return None
         
+        old_status = deposit.status
+        
         # Update fields
         if update_data.confirmations is not None:
             deposit.confirmations = update_data.confirmations
@@ -81,6 +303,9 @@ class DepositProcessor:
         if update_data.block_hash is not None:
             deposit.block_hash = update_data.block_hash
         
+        await self.apply_balance_changes([BalanceChange(
+            deposit.wallet_id, deposit.token_address, deposit.amount, old_status, deposit.status
+        )])
         await self.db.commit()
         await self.db.refresh(deposit)
         
@@ -89,14 +314,13 @@ class DepositProcessor:
     
     async def update_deposit_confirmations(self, tx_hash: str, confirmations: int, block_hash: str = None) -> Optional[Deposit]:
         """Update deposit confirmations and determine status."""
-        normalized_hash = normalize_transaction_hash(tx_hash)
-        
-        result = await self.db.execute(select(Deposit).where(Deposit.tx_hash == normalized_hash))
-        deposit = result.scalar_one_or_none()
+        deposit = await self.get_deposit_by_tx_hash(tx_hash)
         
         if not deposit:
             return None
         
+        old_status = deposit.status
+        
         # Update confirmations
         deposit.confirmations = confirmations
         
@@ -114,34 +338,254 @@ class DepositProcessor:
         else:
             deposit.status = DepositStatus.PENDING
         
+        await self.apply_balance_changes([BalanceChange(
+            deposit.wallet_id, deposit.token_address, deposit.amount, old_status, deposit.status
+        )])
         await self.db.commit()
         await self.db.refresh(deposit)
         
         logger.info(f"Updated deposit {deposit.id} confirmations to {confirmations}, status: {deposit.status}")
         return deposit
     
+    async def update_confirmations_bulk(
+        self,
+        current_block: int,
+        deposit_ids: Optional[Sequence] = None,
+        created_since: Optional[datetime] = None,
+    ) -> list:
+        """Update confirmations and status of pending deposits in one statement.
+        
+        Runs a single UPDATE deposits ... FROM blockchain_networks that derives
+        confirmations from the chain head and the status from each network's
+        confirmations_required, optionally restricted to ``deposit_ids``.
+        ``created_since``, the oldest created_at among them, prunes the
+        partitions that cannot hold any of the deposits. Only rows whose
+        confirmations changed are touched and returned, as (id, tx_hash,
+        log_index, confirmations, status, block_number, confirmations_required,
+        wallet_address, wallet_id, token_address, amount, created_at) rows.
+        Completions move the amount to the wallet's completed balance in the
+        same transaction.
+        """
+        deposits = Deposit.__table__
+        confirmations = current_block - deposits.c.block_number
+        status_type = deposits.c.status.type
+        
+        new_status = case(
+            (
+                confirmations >= BlockchainNetwork.confirmations_required,
+                literal(DepositStatus.COMPLETED, status_type),
+            ),
+            (confirmations > 0, literal(DepositStatus.CONFIRMING, status_type)),
+            else_=literal(DepositStatus.PENDING, status_type),
+        )
+        
+        stmt = (
+            update(deposits)
+            .where(
+                deposits.c.blockchain_network_id == BlockchainNetwork.id,
+                deposits.c.wallet_id == Wallet.id,
+                deposits.c.status.in_([DepositStatus.PENDING, DepositStatus.CONFIRMING]),
+                deposits.c.block_number.isnot(None),
+                deposits.c.confirmations != confirmations,
+            )
+            .values(confirmations=confirmations, status=new_status)
+            .returning(
+                deposits.c.id,
+                deposits.c.tx_hash,
+                deposits.c.log_index,
+                deposits.c.confirmations,
+                deposits.c.status,
+                deposits.c.block_number,
+                BlockchainNetwork.confirmations_required,
+                Wallet.address.label("wallet_address"),
+                deposits.c.wallet_id,
+                deposits.c.token_address,
+                deposits.c.amount,
+                deposits.c.created_at,
+            )
+        )
+        
+        if deposit_ids is not None:
+            if not deposit_ids:
+                return []
+            stmt = stmt.where(deposits.c.id.in_(deposit_ids))
+        if created_since is not None:
+            stmt = stmt.where(deposits.c.created_at >= created_since)
+        
+        result = await self.db.execute(stmt)
+        updated = result.all()
+        # Only PENDING and CONFIRMING rows are updated, and both count as pending
+        await self.apply_balance_changes(
+            BalanceChange(d.wallet_id, d.token_address, d.amount, DepositStatus.PENDING, d.status)
+            for d in updated
+        )
+        await self.db.commit()
+        
+        return updated
+    
+    async def get_pending_deposit_schedule(self, network_id=None, address_range=None) -> list:
+        """Get (id, block_number, confirmations, confirmations_required, created_at) rows for deposits awaiting confirmations."""
+        query = (
+            select(
+                Deposit.id,
+                Deposit.block_number,
+                Deposit.confirmations,
+                BlockchainNetwork.confirmations_required,
+                Deposit.created_at,
+            )
+            .join(BlockchainNetwork, Deposit.blockchain_network_id == BlockchainNetwork.id)
+            .where(
+                Deposit.status.in_([DepositStatus.PENDING, DepositStatus.CONFIRMING]),
+                Deposit.block_number.isnot(None),
+            )
+        )
+        if network_id is not None:
+            query = query.where(Deposit.blockchain_network_id == network_id)
+        if address_range is not None:
+            range_clause = address_range.clause(Wallet.address)
+            if range_clause is not None:
+                query = query.join(Wallet, Deposit.wallet_id == Wallet.id).where(range_clause)
+        
+        result = await self.db.execute(query)
+        return result.all()
+    
+    async def get_deposit_states(self, deposit_ids: Sequence) -> list:
+        """Get (id, status, block_number, confirmations, confirmations_required, created_at) rows of the given deposits."""
+        if not deposit_ids:
+            return []
+        
+        result = await self.db.execute(
+            select(
+                Deposit.id,
+                Deposit.status,
+                Deposit.block_number,
+                Deposit.confirmations,
+                BlockchainNetwork.confirmations_required,
+                Deposit.created_at,
+            )
+            .join(
+                DepositTxKey,
+                (DepositTxKey.deposit_id == Deposit.id) & (DepositTxKey.created_at == Deposit.created_at),
+            )
+            .join(BlockchainNetwork, Deposit.blockchain_network_id == BlockchainNetwork.id)
+            .where(DepositTxKey.deposit_id.in_(deposit_ids))
+        )
+        return result.all()
+    
     async def mark_deposit_orphaned(self, tx_hash: str) -> Optional[Deposit]:
         """Mark a deposit as orphaned due to blockchain reorg."""
-        normalized_hash = normalize_transaction_hash(tx_hash)
-        
-        result = await self.db.execute(select(Deposit).where(Deposit.tx_hash == normalized_hash))
-        deposit = result.scalar_one_or_none()
+        deposit = await self.get_deposit_by_tx_hash(tx_hash)
         
         if not deposit:
             return None
         
+        old_status = deposit.status
         deposit.status = DepositStatus.ORPHANED
+        await self.apply_balance_changes([BalanceChange(
+            deposit.wallet_id, deposit.token_address, deposit.amount, old_status, deposit.status
+        )])
         await self.db.commit()
         await self.db.refresh(deposit)
         
         logger.warning(f"Marked deposit {deposit.id} as orphaned")
         return deposit
     
-    async def get_deposit_by_tx_hash(self, tx_hash: str) -> Optional[Deposit]:
-        """Get deposit by transaction hash."""
+    async def mark_deposits_orphaned_by_block_hash(self, block_hashes: Sequence[str], address_range=None) -> list:
+        """Mark every live deposit mined in one of the given blocks as orphaned.
+        
+        ``address_range`` limits this to the wallets of one monitor shard.
+        Their amounts are reversed out of the wallet balances in the same
+        transaction. Returns (id, tx_hash, log_index, wallet_address,
+        wallet_id, token_address, amount, previous_status) rows for the
+        orphaned deposits.
+        """
+        if not block_hashes:
+            return []
+        
+        deposits = Deposit.__table__
+        # Self-join to read each row's status from before the update
+        previous = deposits.alias("previous")
+        conditions = [
+            deposits.c.wallet_id == Wallet.id,
+            previous.c.id == deposits.c.id,
+            previous.c.created_at == deposits.c.created_at,
+            deposits.c.block_hash.in_(block_hashes),
+            deposits.c.status.in_([
+                DepositStatus.PENDING,
+                DepositStatus.CONFIRMING,
+                DepositStatus.COMPLETED,
+            ]),
+        ]
+        if address_range is not None:
+            range_clause = address_range.clause(Wallet.address)
+            if range_clause is not None:
+                conditions.append(range_clause)
+        
+        result = await self.db.execute(
+            update(deposits)
+            .where(*conditions)
+            .values(status=DepositStatus.ORPHANED)
+            .returning(
+                deposits.c.id,
+                deposits.c.tx_hash,
+                deposits.c.log_index,
+                Wallet.address.label("wallet_address"),
+                deposits.c.wallet_id,
+                deposits.c.token_address,
+                deposits.c.amount,
+                previous.c.status.label("previous_status"),
+            )
+        )
+        orphaned = result.all()
+        # Reverse the orphaned amounts out of the wallets' balances
+        await self.apply_balance_changes(
+            BalanceChange(d.wallet_id, d.token_address, d.amount, d.previous_status, DepositStatus.ORPHANED)
+            for d in orphaned
+        )
+        await self.db.commit()
+        
+        for deposit in orphaned:
+            logger.warning(f"Marked deposit {deposit.id} as orphaned")
+        return orphaned
+    
+    async def apply_balance_changes(self, changes: Iterable[BalanceChange]):
+        """Add the effect of deposit status transitions to wallet_balances.
+        
+        Runs one multi-row upsert of per-(wallet, asset) deltas in the
+        caller's transaction; the caller commits.
+        """
+        rows = balance_deltas(changes)
+        if not rows:
+            return
+        
+        stmt = insert(WalletBalance).values(rows)
+        balances = WalletBalance.__table__.c
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[WalletBalance.wallet_id, WalletBalance.asset],
+            set_={
+                "completed_total": balances.completed_total + stmt.excluded.completed_total,
+                "pending_total": balances.pending_total + stmt.excluded.pending_total,
+                "completed_count": balances.completed_count + stmt.excluded.completed_count,
+                "pending_count": balances.pending_count + stmt.excluded.pending_count,
+                # GREATEST ignores NULLs, so a reversal keeps the last deposit time
+                "last_deposit_at": func.greatest(balances.last_deposit_at, stmt.excluded.last_deposit_at),
+                "updated_at": func.now(),
+            },
+        )
+        await self.db.execute(stmt)
+    
+    async def get_deposit_by_tx_hash(self, tx_hash: str, log_index: Optional[int] = None) -> Optional[Deposit]:
+        """Get deposit by transaction hash.
+        
+        A transaction can carry several token deposits; without ``log_index``
+        the first one (the native transfer, if any) is returned.
+        """
         normalized_hash = normalize_transaction_hash(tx_hash)
-        result = await self.db.execute(select(Deposit).where(Deposit.tx_hash == normalized_hash))
-        return result.scalar_one_or_none()
+        query = deposits_by_tx_hash_query(normalized_hash)
+        if log_index is not None:
+            query = query.where(DepositTxKey.log_index == log_index)
+        result = await self.db.execute(query.limit(1))
+        return result.scalars().first()
     
     async def get_wallet_by_id(self, wallet_id: str) -> Optional[Wallet]:
         """Get wallet by ID."""
@@ -153,6 +597,32 @@ class DepositProcessor:
         result = await self.db.execute(select(BlockchainNetwork).where(BlockchainNetwork.id == network_id))
         return result.scalar_one_or_none()
     
+    async def get_network_by_chain_id(self, chain_id: int) -> Optional[BlockchainNetwork]:
+        """Get blockchain network by chain ID."""
+        result = await self.db.execute(select(BlockchainNetwork).where(BlockchainNetwork.chain_id == chain_id))
+        return result.scalar_one_or_none()
+    
+    async def get_active_networks(self) -> List[BlockchainNetwork]:
+        """Get all blockchain networks that should be monitored."""
+        result = await self.db.execute(
+            select(BlockchainNetwork).where(BlockchainNetwork.is_active == True)
+        )
+        return result.scalars().all()
+    
+    async def get_network_tokens(self, network_id) -> List[Token]:
+        """Get the active ERC-20 tokens whose transfers are ingested on a network."""
+        result = await self.db.execute(
+            select(Token).where(Token.blockchain_network_id == network_id, Token.is_active == True)
+        )
+        return result.scalars().all()
+    
+    async def get_network_confirmations(self) -> Dict:
+        """Get confirmations_required keyed by blockchain network ID."""
+        result = await self.db.execute(
+            select(BlockchainNetwork.id, BlockchainNetwork.confirmations_required)
+        )
+        return {network_id: required for network_id, required in result.all()}
+    
     async def get_monitored_wallets(self) -> List[Wallet]:
         """Get all active wallets that should be monitored."""
         result = await self.db.execute(
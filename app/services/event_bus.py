@@ -0,0 +1,254 @@
+import abc
+import asyncio
+import logging
+from typing import Awaitable, Callable, List, Optional
+
+import asyncpg
+import orjson
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+EventHandler = Callable[[dict], Awaitable[None]]
+
+# Postgres rejects NOTIFY payloads of 8000 bytes or more
+MAX_NOTIFY_PAYLOAD = 7900
+
+
+def deposit_update_event(wallet_address: str, deposit_data: dict) -> dict:
+    """Build a deposit update event for a wallet."""
+    return {
+        "type": "deposit_update",
+        "wallet_address": wallet_address,
+        "data": deposit_data
+    }
+
+
+def deposit_seen_event(wallet_address: str, deposit_data: dict) -> dict:
+    """Build an event for a deposit seen in the mempool, before it is mined."""
+    return {
+        "type": "deposit_seen",
+        "wallet_address": wallet_address,
+        "data": deposit_data
+    }
+
+
+def confirmation_update_event(wallet_address: str, tx_hash: str, confirmations: int, status: str, log_index: int = -1) -> dict:
+    """Build a confirmation update event for a wallet."""
+    return {
+        "type": "confirmation_update",
+        "wallet_address": wallet_address,
+        "tx_hash": tx_hash,
+        "log_index": log_index,
+        "confirmations": confirmations,
+        "status": status
+    }
+
+
+def wallet_changed_event(wallet_address: str) -> dict:
+    """Build an event telling the monitor a wallet was added or changed."""
+    return {
+        "type": "wallet_changed",
+        "wallet_address": wallet_address
+    }
+
+
+def wallets_imported_event(count: int) -> dict:
+    """Build an event telling the monitor a bulk import added wallets."""
+    return {
+        "type": "wallets_imported",
+        "count": count
+    }
+
+
+def listener_reconnected_event() -> dict:
+    """Build the local event dispatched after the listener reconnects; events may have been missed meanwhile."""
+    return {
+        "type": "listener_reconnected"
+    }
+
+
+def encode_event(event: dict) -> str:
+    """Serialize an event as compact JSON."""
+    return orjson.dumps(event, default=str).decode()
+
+
+class EventBus(abc.ABC):
+    """Delivers deposit events from the blockchain monitor to API workers."""
+
+    def __init__(self):
+        self._handlers: List[EventHandler] = []
+
+    def subscribe(self, handler: EventHandler):
+        """Register a coroutine called with every delivered event."""
+        self._handlers.append(handler)
+
+    async def start(self):
+        """Start delivering events."""
+
+    async def stop(self):
+        """Stop delivering events and release resources."""
+
+    @abc.abstractmethod
+    async def publish(self, events: List[dict]):
+        """Publish a batch of events, typically all events of one block."""
+
+    async def _dispatch(self, events: List[dict]):
+        for event in events:
+            for handler in self._handlers:
+                try:
+                    await handler(event)
+                except Exception as e:
+                    logger.error(f"Error handling {event.get('type')} event: {e}")
+
+
+class InProcessEventBus(EventBus):
+    """Event bus for a monitor and API running in the same process."""
+
+    async def publish(self, events: List[dict]):
+        if events:
+            await self._dispatch(events)
+
+
+class PostgresEventBus(EventBus):
+    """Event bus backed by Postgres LISTEN/NOTIFY.
+
+    Each published batch is sent as one NOTIFY carrying a compact JSON array,
+    split only when it would exceed the payload limit. Every API worker
+    LISTENs on the channel and dispatches events in arrival order.
+    """
+
+    def __init__(self, dsn: str, channel: str):
+        super().__init__()
+        self.dsn = dsn
+        self.channel = channel
+        self._publish_connection: Optional[asyncpg.Connection] = None
+        self._publish_lock = asyncio.Lock()
+        self._listen_connection: Optional[asyncpg.Connection] = None
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._consumer: Optional[asyncio.Task] = None
+        self._reconnect: Optional[asyncio.Task] = None
+        self._running = False
+
+    async def start(self):
+        if self._running:
+            return
+        self._running = True
+
+        if self._handlers:
+            self._consumer = asyncio.create_task(self._consume())
+            await self._listen()
+
+        logger.info(f"Started Postgres event bus on channel {self.channel}")
+
+    async def stop(self):
+        self._running = False
+
+        for task in (self._consumer, self._reconnect):
+            if task:
+                task.cancel()
+
+        for connection in (self._listen_connection, self._publish_connection):
+            if connection and not connection.is_closed():
+                await connection.close()
+
+        self._listen_connection = None
+        self._publish_connection = None
+
+    async def publish(self, events: List[dict]):
+        if not events:
+            return
+
+        async with self._publish_lock:
+            for attempt in range(2):
+                try:
+                    if self._publish_connection is None or self._publish_connection.is_closed():
+                        self._publish_connection = await asyncpg.connect(self.dsn)
+
+                    for payload in self._payloads(events):
+                        await self._publish_connection.execute("SELECT pg_notify($1, $2)", self.channel, payload)
+                    return
+                except (asyncpg.PostgresConnectionError, ConnectionError, OSError) as e:
+                    logger.warning(f"Event bus publish failed, reconnecting: {e}")
+                    self._publish_connection = None
+                    if attempt:
+                        raise
+
+    def _payloads(self, events: List[dict]) -> List[str]:
+        """Pack encoded events into JSON arrays that fit in one NOTIFY each."""
+        payloads = []
+        batch: List[str] = []
+        size = 2
+
+        for event in events:
+            encoded = encode_event(event)
+            encoded_size = len(encoded.encode()) + 1
+            if encoded_size + 2 > MAX_NOTIFY_PAYLOAD:
+                logger.error(f"Dropping {event.get('type')} event larger than the NOTIFY payload limit")
+                continue
+
+            if batch and size + encoded_size > MAX_NOTIFY_PAYLOAD:
+                payloads.append("[" + ",".join(batch) + "]")
+                batch, size = [], 2
+
+            batch.append(encoded)
+            size += encoded_size
+
+        if batch:
+            payloads.append("[" + ",".join(batch) + "]")
+
+        return payloads
+
+    async def _listen(self):
+        self._listen_connection = await asyncpg.connect(self.dsn)
+        self._listen_connection.add_termination_listener(self._on_terminated)
+        await self._listen_connection.add_listener(self.channel, self._on_notification)
+
+    def _on_notification(self, connection, pid, channel, payload):
+        try:
+            self._queue.put_nowait(orjson.loads(payload))
+        except orjson.JSONDecodeError as e:
+            logger.error(f"Invalid event bus payload: {e}")
+
+    def _on_terminated(self, connection):
+        if self._running and not self._reconnect:
+            logger.warning("Event bus listener connection lost, reconnecting...")
+            self._reconnect = asyncio.create_task(self._reconnect_listener())
+
+    async def _reconnect_listener(self):
+        try:
+            while self._running:
+                try:
+                    await self._listen()
+                    logger.info("Event bus listener reconnected")
+                    await self._queue.put([listener_reconnected_event()])
+                    return
+                except Exception as e:
+                    logger.error(f"Event bus listener reconnect failed: {e}")
+                    await asyncio.sleep(5)
+        finally:
+            self._reconnect = None
+
+    async def _consume(self):
+        while True:
+            events = await self._queue.get()
+            await self._dispatch(events)
+
+
+_event_bus: Optional[EventBus] = None
+
+
+def get_event_bus() -> EventBus:
+    """Get the process-wide event bus for the configured backend."""
+    global _event_bus
+
+    if _event_bus is None:
+        if settings.event_bus_backend == "postgres":
+            _event_bus = PostgresEventBus(settings.database_url, settings.event_bus_channel)
+        elif settings.event_bus_backend == "memory":
+            _event_bus = InProcessEventBus()
+        else:
+            raise ValueError(f"Unknown event bus backend: {settings.event_bus_backend}")
+
+    return _event_bus
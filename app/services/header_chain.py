@@ -0,0 +1,76 @@
+from collections import deque
+from typing import Iterable, List, NamedTuple, Optional
+
+
+class ChainHeader(NamedTuple):
+    number: int
+    hash: str
+    parent_hash: str
+
+    @classmethod
+    def from_rpc(cls, block: dict) -> "ChainHeader":
+        """Build a header from a newHeads payload or an eth_getBlock* result."""
+        return cls(int(block["number"], 16), block["hash"], block["parentHash"])
+
+
+class HeaderChain:
+    """Bounded ring buffer of recent canonical block headers.
+
+    Headers are kept contiguous and ordered by number, so a new head either
+    links onto the tip by parent hash or reveals a reorg.
+    """
+
+    def __init__(self, max_length: int):
+        self.max_length = max_length
+        self._headers: deque = deque(maxlen=max_length)
+
+    @property
+    def tip(self) -> Optional[ChainHeader]:
+        return self._headers[-1] if self._headers else None
+
+    @property
+    def oldest(self) -> Optional[ChainHeader]:
+        return self._headers[0] if self._headers else None
+
+    def get(self, number: int) -> Optional[ChainHeader]:
+        """Get the stored header at ``number``, if it is inside the buffer."""
+        if not self._headers:
+            return None
+        index = number - self._headers[0].number
+        if 0 <= index < len(self._headers):
+            return self._headers[index]
+        return None
+
+    def contains(self, header: ChainHeader) -> bool:
+        """Check whether this exact header is already part of the chain."""
+        stored = self.get(header.number)
+        return stored is not None and stored.hash == header.hash
+
+    def links_to(self, header: ChainHeader) -> bool:
+        """Check whether ``header``'s parent is stored in the chain."""
+        parent = self.get(header.number - 1)
+        return parent is not None and parent.hash == header.parent_hash
+
+    def append(self, header: ChainHeader):
+        """Append a header after the tip, restarting the buffer if it does not follow on."""
+        tip = self.tip
+        if tip is not None and header.number != tip.number + 1:
+            self._headers.clear()
+        self._headers.append(header)
+
+    def rewind(self, number: int) -> List[ChainHeader]:
+        """Remove and return the headers at ``number`` and above, oldest first."""
+        removed = []
+        while self._headers and self._headers[-1].number >= number:
+            removed.append(self._headers.pop())
+        removed.reverse()
+        return removed
+
+    def load(self, headers: Iterable[ChainHeader]):
+        """Replace the buffer with headers ordered by number."""
+        self._headers.clear()
+        for header in headers:
+            self.append(header)
+
+    def __len__(self) -> int:
+        return len(self._headers)
@@ -0,0 +1,256 @@
+import asyncio
+import json
+import logging
+import time
+from collections import OrderedDict
+from decimal import Decimal
+from typing import Awaitable, Callable, NamedTuple, Optional
+
+import orjson
+import websockets
+
+from app.config import settings
+from app.models.user import Wallet
+from app.services.rpc_pool import endpoint_name, split_urls
+from app.services.token_transfers import TokenTransferScanner
+from app.services.wallet_registry import WalletRegistry
+from app.utils import normalize_address, normalize_transaction_hash
+
+logger = logging.getLogger(__name__)
+
+# Selector of ERC-20 transfer(address,uint256)
+TRANSFER_SELECTOR = "0xa9059cbb"
+
+
+class PendingTransfer(NamedTuple):
+    """A transfer to a monitored wallet seen in the mempool."""
+
+    wallet: Wallet
+    from_address: str
+    amount: Decimal
+    token_address: Optional[str]
+    seen_at: float
+
+
+class PendingIndex:
+    """Transfers seen in the mempool, keyed by transaction hash, oldest first.
+
+    Dropped or replaced transactions are never mined, so entries expire
+    after ``ttl`` seconds, and the oldest are evicted beyond ``max_size``.
+    """
+
+    def __init__(self, ttl: float, max_size: int):
+        self.ttl = ttl
+        self.max_size = max_size
+        self.promoted = 0
+        self.expired = 0
+        self._entries: "OrderedDict[str, PendingTransfer]" = OrderedDict()
+
+    def add(self, tx_hash: str, transfer: PendingTransfer) -> bool:
+        """Index a pending transfer; returns False if it was already known."""
+        if tx_hash in self._entries:
+            return False
+
+        self._entries[tx_hash] = transfer
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.expired += 1
+        return True
+
+    def pop(self, tx_hash: str) -> Optional[PendingTransfer]:
+        """Remove and return the pending transfer of a mined transaction."""
+        transfer = self._entries.pop(tx_hash, None)
+        if transfer is not None:
+            self.promoted += 1
+        return transfer
+
+    def evict_expired(self, now: Optional[float] = None) -> int:
+        """Drop entries older than the TTL and return how many were dropped."""
+        now = time.monotonic() if now is None else now
+        evicted = 0
+        while self._entries:
+            transfer = next(iter(self._entries.values()))
+            if now - transfer.seen_at < self.ttl:
+                break
+            self._entries.popitem(last=False)
+            evicted += 1
+
+        self.expired += evicted
+        return evicted
+
+    def __contains__(self, tx_hash: str) -> bool:
+        return tx_hash in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class MempoolWatcher:
+    """Pre-detects deposits from a network's pending transactions.
+
+    Subscribes to ``newPendingTransactions`` with full transaction objects
+    and matches native transfers and direct ERC-20 ``transfer`` calls
+    against the monitor's wallet registry and tokens. Each match is indexed
+    and handed to ``publish`` right away; the block scan pops it from the
+    index once the transaction is mined.
+
+    Providers that only send hashes are supported by resolving them with
+    ``eth_getTransactionByHash``. Hashes are queued by the receive loop and
+    resolved in batches of up to ``MEMPOOL_LOOKUP_BATCH`` by a separate
+    task, so lookups never stall the subscription; beyond
+    ``MEMPOOL_LOOKUP_QUEUE`` waiting hashes, new ones are dropped (their
+    deposits are still found when mined).
+    ``ws_url`` may list several comma-separated endpoints, which are tried
+    in turn after a failure.
+    """
+
+    def __init__(
+        self,
+        ws_url: str,
+        wallet_registry: WalletRegistry,
+        token_scanner: TokenTransferScanner,
+        publish: Callable[[str, PendingTransfer], Awaitable[None]],
+        log: logging.LoggerAdapter = None,
+    ):
+        self.ws_urls = split_urls(ws_url)
+        self._ws_index = 0
+        self.wallet_registry = wallet_registry
+        self.token_scanner = token_scanner
+        self.publish = publish
+        self.logger = log or logger
+        self.index = PendingIndex(settings.mempool_pending_ttl, settings.mempool_max_pending)
+        self.rpc = None
+        self.dropped_lookups = 0
+
+    async def run(self, rpc=None):
+        """Follow pending transactions, reconnecting with backoff after failures."""
+        self.rpc = rpc
+        retry_delay = 5
+
+        while True:
+            try:
+                await self._watch()
+                retry_delay = 5
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.logger.error(f"Pending transaction subscription failed, retrying in {retry_delay}s: {e}")
+                self._ws_index += 1
+
+            await asyncio.sleep(retry_delay)
+            retry_delay = min(retry_delay * 2, 60)
+
+    async def _watch(self):
+        ws_url = self.ws_urls[self._ws_index % len(self.ws_urls)]
+        async with websockets.connect(ws_url, max_size=None) as connection:
+            await connection.send(json.dumps({
+                "id": 1,
+                "method": "eth_subscribe",
+                "params": ["newPendingTransactions", True]
+            }))
+            response = json.loads(await connection.recv())
+            if "error" in response:
+                raise Exception(f"newPendingTransactions subscription failed: {response['error']}")
+
+            self.logger.info(f"Subscribed to pending transactions on {endpoint_name(ws_url)}")
+            last_eviction = time.monotonic()
+            lookups: asyncio.Queue = asyncio.Queue(maxsize=settings.mempool_lookup_queue)
+            resolver = asyncio.create_task(self._resolve_hashes(lookups)) if self.rpc is not None else None
+
+            try:
+                async for message in connection:
+                    data = orjson.loads(message)
+                    if data.get("method") != "eth_subscription":
+                        continue
+
+                    tx = data["params"]["result"]
+                    if isinstance(tx, str):
+                        if resolver is not None:
+                            self._queue_lookup(lookups, tx)
+                    elif tx:
+                        await self.handle_transaction(tx)
+
+                    now = time.monotonic()
+                    if now - last_eviction >= 1:
+                        self.index.evict_expired(now)
+                        last_eviction = now
+            finally:
+                if resolver is not None:
+                    resolver.cancel()
+
+    def _queue_lookup(self, lookups: asyncio.Queue, tx_hash: str):
+        try:
+            lookups.put_nowait(tx_hash)
+        except asyncio.QueueFull:
+            self.dropped_lookups += 1
+            if self.dropped_lookups % 1000 == 1:
+                self.logger.warning(f"Pending transaction lookups are falling behind, {self.dropped_lookups} hashes dropped")
+
+    async def _resolve_hashes(self, lookups: asyncio.Queue):
+        """Resolve queued pending transaction hashes in batches and handle the transactions."""
+        while True:
+            hashes = [await lookups.get()]
+            while len(hashes) < settings.mempool_lookup_batch and not lookups.empty():
+                hashes.append(lookups.get_nowait())
+
+            try:
+                transactions = await self.rpc.batch([("eth_getTransactionByHash", [tx_hash]) for tx_hash in hashes])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.logger.warning(f"Failed to resolve {len(hashes)} pending transactions: {e}")
+                continue
+
+            for tx in transactions:
+                if tx:
+                    await self.handle_transaction(tx)
+
+    async def handle_transaction(self, tx: dict) -> Optional[PendingTransfer]:
+        """Index and publish a pending transaction if it pays a monitored wallet."""
+        transfer = self.match(tx)
+        if transfer is None:
+            return None
+
+        tx_hash = normalize_transaction_hash(tx["hash"])
+        if not self.index.add(tx_hash, transfer):
+            return None
+
+        await self.publish(tx_hash, transfer)
+        return transfer
+
+    def match(self, tx: dict) -> Optional[PendingTransfer]:
+        """Build the pending transfer of a transaction to a monitored wallet, if any."""
+        to_address = (tx.get("to") or "").lower()
+        if not to_address:
+            return None
+
+        wallet = self.wallet_registry.get(to_address)
+        if wallet is not None:
+            value = int(tx.get("value") or "0x0", 16)
+            if value == 0:
+                return None
+            return PendingTransfer(
+                wallet,
+                normalize_address(tx.get("from", "")),
+                Decimal(value) / Decimal(10**18),
+                None,
+                time.monotonic(),
+            )
+
+        token = self.token_scanner.tokens.get(to_address)
+        data = tx.get("input") or ""
+        if token is None or not data.startswith(TRANSFER_SELECTOR) or len(data) < 138:
+            return None
+
+        wallet = self.wallet_registry.get("0x" + data[34:74].lower())
+        value = int(data[74:138], 16)
+        if wallet is None or value == 0:
+            return None
+
+        return PendingTransfer(
+            wallet,
+            normalize_address(tx.get("from", "")),
+            Decimal(value) / Decimal(10**token.decimals),
+            to_address,
+            time.monotonic(),
+        )
@@ -0,0 +1,794 @@
+import asyncio
+import json
+import logging
+import time
+from typing import Dict, List, Optional
+from decimal import Decimal
+import websockets
+
+from app.config import settings
+from app.database import AsyncSessionLocal
+from app.models.user import Wallet, BlockchainNetwork, DepositStatus
+from app.services.chain_state import ChainStateStore
+from app.services.confirmation_scheduler import ConfirmationScheduler, ScheduledDeposit
+from app.services.deposit_processor import DepositProcessor
+from app.services.header_chain import ChainHeader, HeaderChain
+from app.services.mempool import MempoolWatcher, PendingTransfer
+from app.services.rpc_cache import CachedRPCClient, RPCCache
+from app.services.rpc_pool import endpoint_name, split_urls
+from app.services.shard_coordinator import WorkUnit
+from app.services.token_transfers import TokenTransferScanner, topic_address
+from app.services.wallet_registry import WalletRegistry
+from app.services.event_bus import EventBus, deposit_seen_event, deposit_update_event, confirmation_update_event
+from app.utils import normalize_address, normalize_transaction_hash
+
+logger = logging.getLogger(__name__)
+
+
+class NetworkLogger(logging.LoggerAdapter):
+    """Prefixes log messages with the network name."""
+    
+    def process(self, msg, kwargs):
+        return f"[{self.extra['network']}] {msg}", kwargs
+
+
+class NetworkMonitor:
+    """Monitors one blockchain network for new transactions and confirmations.
+    
+    Every network has its own RPC connection pool, newHeads subscription,
+    header chain, block cursor, wallet registry and confirmation schedule,
+    so a slow or failing chain never holds back the others.
+    
+    Besides native transfers, ERC-20 Transfer logs of the network's active
+    tokens are ingested as deposits. A block's logs are only requested when
+    its logsBloom may contain a matching transfer.
+    
+    With ``mempool_monitoring``, transfers are announced as soon as they
+    reach the mempool and promoted from the pending index once mined.
+    
+    When monitor workers are sharded, ``unit`` restricts the monitor to the
+    wallets in one address range of the network.
+    
+    Blocks, block receipts and block logs are read through ``rpc_cache``,
+    which monitors of the same network share.
+    
+    ``rpc_url`` and ``ws_url`` may list several comma-separated providers:
+    JSON-RPC calls go through a provider pool with failover and hedging, and
+    the newHeads subscription moves to the next endpoint when one fails or
+    stops delivering heads.
+    """
+    
+    def __init__(
+        self,
+        network: BlockchainNetwork,
+        event_bus: EventBus,
+        unit: Optional[WorkUnit] = None,
+        rpc_cache: Optional[RPCCache] = None
+    ):
+        self.network = network
+        self.unit = unit or WorkUnit(network.id)
+        self.rpc_cache = rpc_cache or RPCCache(settings.rpc_cache_size)
+        self.rpc: Optional[CachedRPCClient] = None
+        self.ws_connection = None
+        self._ws_index = 0
+        self.event_bus = event_bus
+        self.running = False
+        self.token_scanner = TokenTransferScanner()
+        self.wallet_registry = WalletRegistry(
+            network.id,
+            self.unit.address_range,
+            indexes=[self.token_scanner.bloom]
+        )
+        self.confirmation_scheduler = ConfirmationScheduler()
+        self.logger = NetworkLogger(logger, {"network": self._log_name()})
+        self.mempool: Optional[MempoolWatcher] = None
+        if settings.mempool_monitoring:
+            self.mempool = MempoolWatcher(
+                network.ws_url,
+                self.wallet_registry,
+                self.token_scanner,
+                self._publish_pending,
+                self.logger
+            )
+        self.header_chain = HeaderChain(settings.header_buffer_size)
+        self.last_processed_block: Optional[int] = None
+        self.backfill_stats: Dict = {}
+    
+    async def initialize(self):
+        """Initialize RPC connections."""
+        try:
+            # Initialize pooled async JSON-RPC client
+            self.rpc = CachedRPCClient(split_urls(self.network.rpc_url), self.rpc_cache)
+            
+            # Verify connection
+            if not await self.rpc.is_connected():
+                raise Exception("Failed to connect to Ethereum node via HTTP")
+            
+            self.logger.info("Initialized async JSON-RPC connection")
+            
+            # Initialize WebSocket connection
+            await self._initialize_websocket()
+        
+        except Exception as e:
+            self.logger.error(f"Failed to initialize network monitor: {e}")
+            raise
+    
+    async def _initialize_websocket(self):
+        """Initialize the newHeads WebSocket subscription, trying each of the network's endpoints in turn."""
+        ws_urls = split_urls(self.network.ws_url)
+        last_error = None
+        
+        for attempt in range(len(ws_urls)):
+            index = (self._ws_index + attempt) % len(ws_urls)
+            try:
+                # Create WebSocket connection
+                self.ws_connection = await websockets.connect(ws_urls[index])
+                
+                # Subscribe to new block headers
+                subscribe_message = {
+                    "id": 1,
+                    "method": "eth_subscribe",
+                    "params": ["newHeads"]
+                }
+                
+                await self.ws_connection.send(json.dumps(subscribe_message))
+                response = await self.ws_connection.recv()
+                response_data = json.loads(response)
+                
+                if "error" in response_data:
+                    raise Exception(f"WebSocket subscription failed: {response_data['error']}")
+                
+                self._ws_index = index
+                self.logger.info(f"Initialized WebSocket connection to {endpoint_name(ws_urls[index])} and subscribed to new blocks")
+                return
+            
+            except Exception as e:
+                self.logger.error(f"Failed to initialize WebSocket on {endpoint_name(ws_urls[index])}: {e}")
+                last_error = e
+                if self.ws_connection:
+                    await self.ws_connection.close()
+                    self.ws_connection = None
+        
+        raise last_error or Exception("No WebSocket endpoint configured")
+    
+    async def run(self):
+        """Run the network's ingestion loop, restarting it with backoff after failures."""
+        self.running = True
+        retry_delay = 5
+        
+        while self.running:
+            try:
+                await self.start_monitoring()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.logger.error(f"Network monitor error, restarting in {retry_delay}s: {e}")
+            finally:
+                await self._close_connections()
+            
+            if self.running:
+                await asyncio.sleep(retry_delay)
+                retry_delay = min(retry_delay * 2, 60)
+    
+    async def start_monitoring(self):
+        """Connect, load the network's state and follow its chain."""
+        self.logger.info(f"Starting monitor for chain ID {self.network.chain_id}...")
+        
+        await self.initialize()
+        await self.load_network()
+        await self.load_monitored_wallets()
+        await self.load_tokens()
+        await self.load_confirmation_schedule()
+        
+        # Catch up on transitions that came due while the monitor was down
+        await self._process_due_confirmations(await self.rpc.block_number())
+        
+        # Start monitoring tasks
+        tasks = [
+            asyncio.create_task(self._monitor_new_blocks()),
+            asyncio.create_task(self.wallet_registry.run()),
+            asyncio.create_task(self._refresh_tokens())
+        ]
+        if self.mempool:
+            tasks.append(asyncio.create_task(self.mempool.run(self.rpc)))
+        
+        try:
+            await asyncio.gather(*tasks)
+        finally:
+            for task in tasks:
+                task.cancel()
+    
+    async def stop_monitoring(self):
+        """Stop monitoring the network."""
+        self.logger.info("Stopping network monitor...")
+        self.running = False
+        await self._close_connections()
+    
+    async def _close_connections(self):
+        if self.ws_connection:
+            await self.ws_connection.close()
+            self.ws_connection = None
+        
+        if self.rpc:
+            await self.rpc.close()
+            self.rpc = None
+    
+    def _log_name(self) -> str:
+        if self.unit.shard_count == 1:
+            return self.network.name
+        return f"{self.network.name} {self.unit.shard_index}/{self.unit.shard_count}"
+    
+    def _chain_state(self, db) -> ChainStateStore:
+        return ChainStateStore(db, self.unit.shard_index, self.unit.shard_count)
+    
+    async def load_network(self):
+        """Load the network's block cursor and recent canonical headers."""
+        async with AsyncSessionLocal() as db:
+            store = self._chain_state(db)
+            self.last_processed_block = await store.get_cursor(self.network.id)
+            if self.last_processed_block is None:
+                # A new shard resumes from the slowest unit of the network
+                self.last_processed_block = await store.get_network_cursor(self.network.id)
+            self.header_chain.load(await store.load_headers(self.network.id, self.header_chain.max_length))
+        
+        self.logger.info(
+            f"Loaded {len(self.header_chain)} recent headers, "
+            f"last processed block: {self.last_processed_block}"
+        )
+    
+    async def load_monitored_wallets(self):
+        """Load all wallets that should be monitored.
+        
+        Later additions and deactivations are applied incrementally by the
+        wallet registry's refresh task.
+        """
+        await self.wallet_registry.load()
+    
+    async def load_tokens(self):
+        """Load the network's active ERC-20 tokens."""
+        async with AsyncSessionLocal() as db:
+            processor = DepositProcessor(db)
+            tokens = await processor.get_network_tokens(self.network.id)
+        
+        changed = set(self.token_scanner.tokens) != {token.address.lower() for token in tokens}
+        self.token_scanner.set_tokens(tokens)
+        if changed:
+            self.logger.info(f"Watching Transfer events of {len(tokens)} tokens")
+    
+    async def _refresh_tokens(self):
+        """Pick up token additions and deactivations periodically."""
+        while self.running:
+            await asyncio.sleep(settings.network_refresh_interval)
+            try:
+                await self.load_tokens()
+            except Exception as e:
+                self.logger.error(f"Error refreshing tokens: {e}")
+    
+    async def load_confirmation_schedule(self):
+        """Rebuild the confirmation schedule from pending deposits in the database."""
+        async with AsyncSessionLocal() as db:
+            processor = DepositProcessor(db)
+            pending = await processor.get_pending_deposit_schedule(self.network.id, self.unit.address_range)
+        
+        self.confirmation_scheduler.clear()
+        for deposit in pending:
+            self.confirmation_scheduler.schedule(
+                deposit.id,
+                deposit.block_number,
+                deposit.confirmations_required,
+                deposit.confirmations,
+                deposit.created_at
+            )
+        
+        self.logger.info(f"Scheduled {len(self.confirmation_scheduler)} pending deposits for confirmation")
+    
+    async def _monitor_new_blocks(self):
+        """Monitor for new blocks and process transactions."""
+        self.logger.info("Starting new block monitoring...")
+        
+        needs_backfill = True
+        
+        while self.running:
+            try:
+                if not self.ws_connection:
+                    await self._initialize_websocket()
+                    needs_backfill = True
+                
+                if needs_backfill:
+                    # The subscription is already open, so heads mined during
+                    # the backfill are buffered and skipped once processed
+                    await self._backfill()
+                    needs_backfill = False
+                
+                # Wait for new block notification; a silent endpoint counts as failed
+                message = await asyncio.wait_for(self.ws_connection.recv(), timeout=settings.ws_head_timeout)
+                data = json.loads(message)
+                
+                if data.get("method") == "eth_subscription":
+                    head = data["params"]["result"]
+                    await self._process_new_block(head)
+                    await self._process_due_confirmations(int(head["number"], 16))
+            
+            except (websockets.exceptions.ConnectionClosed, asyncio.TimeoutError) as e:
+                if isinstance(e, asyncio.TimeoutError):
+                    self.logger.warning(f"No new heads for {settings.ws_head_timeout}s, switching WebSocket endpoint...")
+                    await self.ws_connection.close()
+                else:
+                    self.logger.warning("WebSocket connection closed, reconnecting...")
+                self.ws_connection = None
+                # Start with the next endpoint; the failed one is tried last
+                self._ws_index += 1
+                await asyncio.sleep(5)
+            except Exception as e:
+                self.logger.error(f"Error in block monitoring: {e}")
+                # Resume from the persisted cursor so no block is skipped
+                needs_backfill = True
+                await asyncio.sleep(5)
+    
+    async def _backfill(self):
+        """Process the blocks mined since the persisted cursor, then hand off to live heads."""
+        head = await self.rpc.block_number()
+        
+        # Without a cursor, start following the chain from the current head
+        start = head if self.last_processed_block is None else self.last_processed_block + 1
+        if start > head:
+            return
+        
+        block_count = head - start + 1
+        self.logger.info(f"Backfilling blocks {start}-{head}")
+        
+        started = time.monotonic()
+        await self._backfill_range(start, head)
+        elapsed = time.monotonic() - started
+        
+        blocks_per_second = block_count / elapsed if elapsed > 0 else float(block_count)
+        self.backfill_stats = {
+            "from_block": start,
+            "to_block": head,
+            "blocks": block_count,
+            "seconds": round(elapsed, 3),
+            "blocks_per_second": round(blocks_per_second, 1),
+        }
+        self.logger.info(f"Backfilled {block_count} blocks in {elapsed:.1f}s ({blocks_per_second:.1f} blocks/sec)")
+        self.logger.info(f"RPC cache: {self.rpc_cache.stats()}")
+        
+        await self._process_due_confirmations(head)
+    
+    async def _backfill_range(self, start: int, end: int):
+        """Fetch blocks with bounded concurrency and process them in order.
+        
+        Token Transfer logs are fetched with ranged eth_getLogs calls of up to
+        ``token_log_chunk_size`` blocks, starting at the first block whose
+        logsBloom may contain a match, instead of one call per block.
+        """
+        semaphore = asyncio.Semaphore(settings.backfill_concurrency)
+        window = settings.backfill_concurrency * 4
+        prefetched_until = start - 1
+        prefetched_logs: Dict[str, List[dict]] = {}
+        prefetched_numbers = set()
+        
+        async def fetch(block_number: int) -> dict:
+            async with semaphore:
+                block = await self.rpc.get_block(block_number, full_transactions=True)
+            if not block:
+                raise Exception(f"Block {block_number} not available from RPC provider")
+            return block
+        
+        async def token_logs(block: dict) -> Optional[List[dict]]:
+            nonlocal prefetched_until, prefetched_logs, prefetched_numbers
+            
+            if not self.token_scanner.bloom.may_contain(block.get("logsBloom")):
+                return []
+            
+            block_number = int(block["number"], 16)
+            if block_number > prefetched_until:
+                prefetched_until = min(block_number + settings.token_log_chunk_size - 1, end)
+                prefetched_logs = await self.token_scanner.get_range_logs(
+                    self.rpc, block_number, prefetched_until, list(self.wallet_registry.wallets)
+                )
+                prefetched_numbers = {int(logs[0]["blockNumber"], 16) for logs in prefetched_logs.values()}
+            
+            if block["hash"] in prefetched_logs:
+                return prefetched_logs[block["hash"]]
+            if block_number in prefetched_numbers:
+                # The range was read from another branch; fetch this block's logs by hash
+                return None
+            return []
+        
+        for window_start in range(start, end + 1, window):
+            window_end = min(window_start + window, end + 1)
+            tasks = [asyncio.create_task(fetch(number)) for number in range(window_start, window_end)]
+            
+            try:
+                for task in tasks:
+                    block = await task
+                    await self._process_new_block(block, block, await token_logs(block))
+            finally:
+                for task in tasks:
+                    task.cancel()
+    
+    async def _process_new_block(self, block_data: dict, block: Optional[dict] = None, token_logs: Optional[List[dict]] = None):
+        """Process a new head: extend the header chain, handle reorgs and scan new blocks.
+        
+        ``block`` is the head's full block and ``token_logs`` its token
+        Transfer logs when they have already been fetched.
+        Errors are raised so the caller can resume from the persisted cursor.
+        """
+        head = ChainHeader.from_rpc(block_data)
+        
+        if self.header_chain.contains(head):
+            return
+        
+        self.logger.info(f"Processing new block {head.number}: {head.hash}")
+        
+        # Headers of the new canonical branch, oldest first
+        new_headers = await self._collect_new_headers(head)
+        orphaned_headers = self.header_chain.rewind(new_headers[0].number)
+        for header in new_headers:
+            self.header_chain.append(header)
+        
+        try:
+            # Notifications for the whole block are published as one batch
+            events = []
+            
+            if orphaned_headers:
+                events.extend(await self._handle_reorg(orphaned_headers))
+            
+            for header in new_headers:
+                if header == head:
+                    events.extend(await self._scan_block(header, block, token_logs))
+                else:
+                    events.extend(await self._scan_block(header))
+            
+            async with AsyncSessionLocal() as db:
+                store = self._chain_state(db)
+                await store.save_headers(
+                    self.network.id,
+                    new_headers,
+                    keep_from=head.number - self.header_chain.max_length + 1
+                )
+                await store.set_cursor(self.network.id, head.number)
+        except Exception:
+            # Forget the unprocessed headers so these blocks are picked up again
+            self.header_chain.rewind(new_headers[0].number)
+            raise
+        
+        self.last_processed_block = head.number
+        await self._publish(events)
+    
+    async def _collect_new_headers(self, head: ChainHeader) -> List[ChainHeader]:
+        """Walk back from a new head by parent hash until it links onto the stored chain."""
+        new_headers = [head]
+        
+        while self.header_chain.tip and len(new_headers) < self.header_chain.max_length:
+            first = new_headers[0]
+            if self.header_chain.links_to(first) or first.number <= self.header_chain.oldest.number:
+                break
+            
+            parent = await self.rpc.get_block_by_hash(first.parent_hash)
+            if not parent:
+                break
+            new_headers.insert(0, ChainHeader.from_rpc(parent))
+        
+        return new_headers
+    
+    async def _handle_reorg(self, orphaned_headers: List[ChainHeader]) -> List[dict]:
+        """Orphan the deposits mined in blocks that left the canonical chain and return their events."""
+        self.logger.warning(
+            f"Reorg detected: blocks {orphaned_headers[0].number}-{orphaned_headers[-1].number} replaced"
+        )
+        
+        # Cached blocks stay valid by hash, but number lookups may now resolve differently
+        self.rpc_cache.invalidate_from(orphaned_headers[0].number)
+        
+        async with AsyncSessionLocal() as db:
+            processor = DepositProcessor(db)
+            orphaned_deposits = await processor.mark_deposits_orphaned_by_block_hash(
+                [header.hash for header in orphaned_headers],
+                self.unit.address_range
+            )
+        
+        events = []
+        for deposit in orphaned_deposits:
+            self.confirmation_scheduler.discard(deposit.id)
+            
+            events.append(deposit_update_event(
+                deposit.wallet_address,
+                {
+                    "id": str(deposit.id),
+                    "tx_hash": deposit.tx_hash,
+                    "log_index": deposit.log_index,
+                    "status": DepositStatus.ORPHANED.value,
+                    "message": "Transaction orphaned due to blockchain reorganization"
+                }
+            ))
+        
+        return events
+    
+    async def _scan_block(self, header: ChainHeader, block: Optional[dict] = None, token_logs: Optional[List[dict]] = None) -> List[dict]:
+        """Scan a canonical block for transfers to monitored wallets and return deposit events."""
+        block_number = header.number
+        block_hash = header.hash
+        
+        # Get block details with transactions
+        if block is None:
+            block = await self.rpc.get_block_by_hash(block_hash, full_transactions=True)
+        if not block:
+            raise Exception(f"Block {block_number} not available from RPC provider")
+        
+        # Collect transactions sent to monitored wallets in one pass
+        matches = self.wallet_registry.block_filter.match(block["transactions"])
+        
+        deposit_rows = []
+        wallets_by_key: Dict[tuple, Wallet] = {}
+        
+        if matches:
+            # Resolve wallets now; the registry may refresh while receipts are fetched
+            wallets = {tx["hash"]: self.wallet_registry.get(tx["to"].lower()) for tx in matches}
+            
+            # Fetch receipts for all matching transactions in one round-trip
+            try:
+                receipts = await self.rpc.get_receipts(block_hash, [tx["hash"] for tx in matches])
+            except Exception as e:
+                self.logger.warning(f"Failed to fetch receipts for block {block_number}: {e}")
+                receipts = {}
+            
+            # Build deposit rows for successful transfers
+            for tx in matches:
+                pending = self.mempool.index.pop(normalize_transaction_hash(tx["hash"])) if self.mempool else None
+                if pending and pending.token_address is None:
+                    # Seen in the mempool: the wallet and amount are already resolved
+                    wallet = pending.wallet
+                    deposit_row = self._promote_pending(tx, pending, receipts.get(tx["hash"]), block_number, block_hash)
+                else:
+                    wallet = wallets[tx["hash"]]
+                    deposit_row = self._build_deposit_row(tx, wallet, receipts.get(tx["hash"]), block_number, block_hash)
+                if deposit_row:
+                    deposit_rows.append(deposit_row)
+                    wallets_by_key[(deposit_row["tx_hash"], -1)] = wallet
+        
+        for deposit_row, wallet in await self._scan_token_transfers(block, token_logs):
+            deposit_rows.append(deposit_row)
+            wallets_by_key[(deposit_row["tx_hash"], deposit_row["log_index"])] = wallet
+        
+        return await self._store_deposits(deposit_rows, wallets_by_key)
+    
+    async def _scan_token_transfers(self, block: dict, logs: Optional[List[dict]] = None) -> List[tuple]:
+        """Build (deposit row, wallet) pairs for the block's token transfers into monitored wallets.
+        
+        ``logs`` are the block's already fetched Transfer logs; without them,
+        logs are only requested when the block's logsBloom may hold a match.
+        """
+        if not self.token_scanner.tokens:
+            return []
+        
+        if logs is None:
+            if not self.token_scanner.bloom.may_contain(block.get("logsBloom")):
+                return []
+            logs = await self.token_scanner.get_block_logs(
+                self.rpc, block["hash"], list(self.wallet_registry.wallets)
+            )
+        
+        block_number = int(block["number"], 16)
+        rows = []
+        for log in self.token_scanner.match(logs, self.wallet_registry.wallets):
+            if log.get("blockHash") != block["hash"]:
+                continue
+            wallet = self.wallet_registry.get(topic_address(log["topics"][2]))
+            deposit_row = self.token_scanner.build_deposit_row(log, wallet, block_number, block["hash"])
+            if deposit_row and self.mempool:
+                self.mempool.index.pop(deposit_row["tx_hash"])
+            if deposit_row:
+                rows.append((deposit_row, wallet))
+        
+        return rows
+    
+    def _promote_pending(self, tx, pending: PendingTransfer, receipt: Optional[dict], block_number: int, block_hash: str) -> Optional[dict]:
+        """Build the deposit row of a mined transaction from its pending index entry."""
+        if receipt and int(receipt["status"], 16) == 0:
+            return None
+        
+        return {
+            "wallet_id": pending.wallet.id,
+            "tx_hash": normalize_transaction_hash(tx["hash"]),
+            "log_index": -1,
+            "token_address": None,
+            "amount": pending.amount,
+            "confirmations": 0,
+            "status": DepositStatus.PENDING,
+            "blockchain_network_id": pending.wallet.blockchain_network_id,
+            "block_number": block_number,
+            "block_hash": block_hash,
+            "from_address": pending.from_address
+        }
+    
+    def _build_deposit_row(self, tx, wallet: Wallet, receipt: Optional[dict], block_number: int, block_hash: str) -> Optional[dict]:
+        """Build the deposit row for a transaction sent to a monitored wallet."""
+        # Skip failed transactions
+        if receipt and int(receipt["status"], 16) == 0:
+            return None
+        
+        # Calculate amount in ETH
+        amount_wei = int(tx["value"], 16)
+        amount_eth = Decimal(amount_wei) / Decimal(10**18)
+        
+        return {
+            "wallet_id": wallet.id,
+            "tx_hash": normalize_transaction_hash(tx["hash"]),
+            "log_index": -1,
+            "token_address": None,
+            "amount": amount_eth,
+            "confirmations": 0,
+            "status": DepositStatus.PENDING,
+            "blockchain_network_id": wallet.blockchain_network_id,
+            "block_number": block_number,
+            "block_hash": block_hash,
+            "from_address": normalize_address(tx.get("from", ""))
+        }
+    
+    async def _store_deposits(self, deposit_rows: List[dict], wallets_by_key: Dict[tuple, Wallet]) -> List[dict]:
+        """Write all deposits of a block in one transaction and return events for new ones.
+        
+        ``wallets_by_key`` maps (tx_hash, log_index) to the receiving wallet.
+        """
+        if not deposit_rows:
+            return []
+        
+        async with AsyncSessionLocal() as db:
+            processor = DepositProcessor(db)
+            deposits = await processor.create_deposits_bulk(deposit_rows)
+        
+        # Only newly inserted deposits are broadcast
+        events = []
+        for deposit in deposits:
+            wallet = wallets_by_key[(deposit.tx_hash, deposit.log_index)]
+            
+            self.confirmation_scheduler.schedule(
+                deposit.id,
+                deposit.block_number,
+                self.network.confirmations_required,
+                deposit.confirmations,
+                deposit.created_at
+            )
+            
+            events.append(deposit_update_event(
+                wallet.address,
+                {
+                    "id": str(deposit.id),
+                    "tx_hash": deposit.tx_hash,
+                    "log_index": deposit.log_index,
+                    "token_address": deposit.token_address,
+                    "amount": str(deposit.amount),
+                    "confirmations": deposit.confirmations,
+                    "status": deposit.status.value,
+                    "block_number": deposit.block_number,
+                    "from_address": deposit.from_address
+                }
+            ))
+            
+            token = self.token_scanner.tokens.get(deposit.token_address) if deposit.token_address else None
+            self.logger.info(f"Detected deposit: {deposit.amount} {token.symbol if token else 'ETH'} to {wallet.address}")
+        
+        return events
+    
+    async def _process_due_confirmations(self, head: int):
+        """Apply the status transitions that are due at the given chain head."""
+        due_deposits = self.confirmation_scheduler.pop_due(head)
+        if not due_deposits:
+            return
+        
+        # Lets the update skip partitions older than every due deposit
+        created_times = [deposit.created_at for deposit in due_deposits]
+        created_since = min(created_times) if None not in created_times else None
+        
+        try:
+            # Recompute confirmations and statuses in one set-based statement
+            async with AsyncSessionLocal() as db:
+                processor = DepositProcessor(db)
+                updated_deposits = await processor.update_confirmations_bulk(
+                    head,
+                    [deposit.deposit_id for deposit in due_deposits],
+                    created_since
+                )
+        except Exception as e:
+            self.logger.error(f"Error updating confirmations at block {head}: {e}")
+            # Retry on the next head
+            for deposit in due_deposits:
+                self.confirmation_scheduler.schedule_at(deposit, head + 1)
+            return
+        
+        events = []
+        for deposit in updated_deposits:
+            if deposit.status != DepositStatus.COMPLETED:
+                self.confirmation_scheduler.schedule(
+                    deposit.id,
+                    deposit.block_number,
+                    deposit.confirmations_required,
+                    deposit.confirmations,
+                    deposit.created_at
+                )
+            
+            events.append(confirmation_update_event(
+                deposit.wallet_address,
+                deposit.tx_hash,
+                deposit.confirmations,
+                deposit.status.value,
+                deposit.log_index
+            ))
+        
+        # The update skips rows it has nothing to change on, which are still due
+        updated_ids = {deposit.id for deposit in updated_deposits}
+        skipped = [deposit for deposit in due_deposits if deposit.deposit_id not in updated_ids]
+        if skipped:
+            await self._reschedule_skipped(skipped, head)
+        
+        await self._publish(events)
+        self.logger.info(f"Updated confirmations for {len(updated_deposits)} deposits at block {head}")
+    
+    async def _reschedule_skipped(self, skipped: List[ScheduledDeposit], head: int):
+        """Reschedule due deposits the bulk update left untouched from their stored rows.
+        
+        Only deposits the database reports as settled (completed, orphaned or
+        failed) or no longer has are dropped from the schedule.
+        """
+        try:
+            async with AsyncSessionLocal() as db:
+                processor = DepositProcessor(db)
+                states = await processor.get_deposit_states([deposit.deposit_id for deposit in skipped])
+        except Exception as e:
+            self.logger.error(f"Error reading skipped deposits at block {head}: {e}")
+            # Retry on the next head
+            for deposit in skipped:
+                self.confirmation_scheduler.schedule_at(deposit, head + 1)
+            return
+        
+        states_by_id = {state.id: state for state in states}
+        for deposit in skipped:
+            state = states_by_id.get(deposit.deposit_id)
+            if state is None:
+                self.logger.warning(f"Scheduled deposit {deposit.deposit_id} no longer exists")
+                continue
+            if state.status not in (DepositStatus.PENDING, DepositStatus.CONFIRMING):
+                continue
+            
+            if state.block_number is None:
+                self.confirmation_scheduler.schedule_at(deposit, head + 1)
+                continue
+            
+            due_height = self.confirmation_scheduler.next_status_change(
+                state.block_number,
+                state.confirmations,
+                state.confirmations_required
+            )
+            # A count written out of band can leave the status lagging; the next head corrects it
+            self.confirmation_scheduler.schedule_at(
+                ScheduledDeposit(state.id, state.block_number, state.confirmations_required, state.created_at),
+                max(due_height, head + 1)
+            )
+    
+    async def _publish_pending(self, tx_hash: str, transfer: PendingTransfer):
+        """Announce a transfer seen in the mempool to the wallet's subscribers."""
+        token = self.token_scanner.tokens.get(transfer.token_address) if transfer.token_address else None
+        await self._publish([deposit_seen_event(
+            transfer.wallet.address,
+            {
+                "tx_hash": tx_hash,
+                "token_address": transfer.token_address,
+                "amount": str(transfer.amount),
+                "from_address": transfer.from_address,
+                "status": "mempool"
+            }
+        )])
+        self.logger.info(
+            f"Pending deposit in mempool: {transfer.amount} {token.symbol if token else 'ETH'} to {transfer.wallet.address}"
+        )
+    
+    async def _publish(self, events: List[dict]):
+        """Publish a batch of deposit events to the API WebSocket tier."""
+        if not events:
+            return
+        
+        try:
+            await self.event_bus.publish(events)
+        except Exception as e:
+            self.logger.error(f"Failed to publish {len(events)} deposit events: {e}")
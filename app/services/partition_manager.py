@@ -0,0 +1,150 @@
+import logging
+import re
+from datetime import datetime, timezone
+from typing import List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+PARENT_TABLE = "deposits"
+PARTITION_NAME = re.compile(r"^deposits_y(\d{4})m(\d{2})$")
+
+# Advisory lock namespace serializing partition DDL between monitors and the maintenance command
+PARTITION_LOCK_NAMESPACE = 0x6D6F6E03
+
+
+def month_start(moment: datetime) -> datetime:
+    """First instant of the UTC month containing ``moment``."""
+    moment = moment.astimezone(timezone.utc)
+    return datetime(moment.year, moment.month, 1, tzinfo=timezone.utc)
+
+
+def add_months(month: datetime, months: int) -> datetime:
+    index = month.year * 12 + month.month - 1 + months
+    return datetime(index // 12, index % 12 + 1, 1, tzinfo=timezone.utc)
+
+
+def partition_name(month: datetime) -> str:
+    return f"{PARENT_TABLE}_y{month.year:04d}m{month.month:02d}"
+
+
+def partition_month(name: str) -> Optional[datetime]:
+    match = PARTITION_NAME.match(name)
+    if not match:
+        return None
+    return datetime(int(match.group(1)), int(match.group(2)), 1, tzinfo=timezone.utc)
+
+
+def create_partition_sql(month: datetime) -> str:
+    """DDL creating the monthly partition of deposits that starts at ``month``."""
+    return (
+        f"CREATE TABLE IF NOT EXISTS {partition_name(month)} PARTITION OF {PARENT_TABLE} "
+        f"FOR VALUES FROM ('{month.isoformat()}') TO ('{add_months(month, 1).isoformat()}')"
+    )
+
+
+class PartitionManager:
+    """Maintains the monthly range partitions of the deposits table.
+
+    ``ensure_partitions`` creates the partitions of the current month and
+    ``PARTITION_PREMAKE_MONTHS`` months ahead, so inserts never hit a
+    missing partition. ``retire_partitions`` detaches partitions older than
+    ``PARTITION_RETAIN_MONTHS`` and moves them to the archive schema (or
+    drops them), skipping any that still hold deposits awaiting
+    confirmations. Each call runs in its own transaction under an advisory
+    lock, so concurrent monitors and the maintenance command do not race.
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def _lock(self):
+        await self.db.execute(text("SELECT pg_advisory_xact_lock(:namespace, 0)"), {"namespace": PARTITION_LOCK_NAMESPACE})
+
+    async def list_partitions(self) -> List[datetime]:
+        """Months of the attached monthly partitions, oldest first."""
+        result = await self.db.execute(
+            text(
+                "SELECT child.relname FROM pg_inherits "
+                "JOIN pg_class parent ON parent.oid = pg_inherits.inhparent "
+                "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+                "WHERE parent.relname = :parent"
+            ),
+            {"parent": PARENT_TABLE},
+        )
+        months = [partition_month(name) for name in result.scalars()]
+        return sorted(month for month in months if month is not None)
+
+    async def ensure_partitions(self, months_ahead: Optional[int] = None, now: Optional[datetime] = None) -> List[str]:
+        """Create any missing partition from the current month to ``months_ahead`` months ahead."""
+        months_ahead = settings.partition_premake_months if months_ahead is None else months_ahead
+        current = month_start(now or datetime.now(timezone.utc))
+
+        await self._lock()
+        existing = set(await self.list_partitions())
+
+        created = []
+        for offset in range(months_ahead + 1):
+            month = add_months(current, offset)
+            if month not in existing:
+                await self.db.execute(text(create_partition_sql(month)))
+                created.append(partition_name(month))
+
+        await self.db.commit()
+        if created:
+            logger.info(f"Created deposit partitions: {', '.join(created)}")
+        return created
+
+    async def retire_partitions(
+        self,
+        retain_months: Optional[int] = None,
+        drop: bool = False,
+        now: Optional[datetime] = None,
+    ) -> List[str]:
+        """Detach partitions whose month ended more than ``retain_months`` months ago.
+
+        Detached partitions are moved to ``PARTITION_ARCHIVE_SCHEMA`` unless
+        ``drop`` is set. Their deposit_tx_keys rows are kept, so a rescan
+        cannot credit a retired deposit again, but lookups through the keys no
+        longer find it; wallet_balances totals are left as they are. A
+        ``retain_months`` of 0 keeps every partition.
+        """
+        retain_months = settings.partition_retain_months if retain_months is None else retain_months
+        if retain_months <= 0:
+            return []
+
+        cutoff = add_months(month_start(now or datetime.now(timezone.utc)), -retain_months)
+        archive_schema = settings.partition_archive_schema
+
+        await self._lock()
+        retired = []
+        for month in await self.list_partitions():
+            if month >= cutoff:
+                break
+
+            name = partition_name(month)
+            # Deposits still awaiting confirmations stay queryable
+            live = await self.db.scalar(text(
+                f"SELECT EXISTS (SELECT 1 FROM {name} WHERE status IN ('pending', 'confirming'))"
+            ))
+            if live:
+                logger.warning(f"Keeping partition {name}: it still holds pending deposits")
+                continue
+
+            await self.db.execute(text(f"ALTER TABLE {PARENT_TABLE} DETACH PARTITION {name}"))
+            if drop:
+                await self.db.execute(text(f"DROP TABLE {name}"))
+            else:
+                await self.db.execute(text(f"CREATE SCHEMA IF NOT EXISTS {archive_schema}"))
+                await self.db.execute(text(f"ALTER TABLE {name} SET SCHEMA {archive_schema}"))
+            retired.append(name)
+
+        await self.db.commit()
+        if retired:
+            action = "Dropped" if drop else f"Archived to {archive_schema}"
+            logger.info(f"{action} deposit partitions: {', '.join(retired)}")
+        return retired
@@ -0,0 +1,248 @@
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+import orjson
+
+from app.config import settings
+
+try:
+    import redis.asyncio as redis
+except ImportError:  # Optional, only needed for RESPONSE_CACHE_BACKEND=redis
+    redis = None
+
+logger = logging.getLogger(__name__)
+
+
+def deposit_tx_key(tx_hash: str) -> str:
+    return f"deposit:tx:{tx_hash}"
+
+
+def wallet_address_key(address: str) -> str:
+    return f"wallet:address:{address}"
+
+
+class MemoryCacheBackend:
+    """Size-bounded LRU of JSON-compatible values with per-entry expiry."""
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self.evictions = 0
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+
+    async def get(self, key: str) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        expires_at, value = entry
+        if time.monotonic() >= expires_at:
+            del self._entries[key]
+            return None
+
+        self._entries.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: Any, ttl: float):
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    async def delete(self, key: str):
+        self._entries.pop(key, None)
+
+    async def clear(self):
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class RedisCacheBackend:
+    """Cache shared by all API workers, stored in Redis under a key prefix."""
+
+    def __init__(self, url: str, prefix: str = "response_cache:"):
+        if redis is None:
+            raise RuntimeError("RESPONSE_CACHE_BACKEND=redis requires the redis package")
+        self.client = redis.from_url(url)
+        self.prefix = prefix
+        self.evictions = 0  # Redis evicts on its own
+
+    async def get(self, key: str) -> Optional[Any]:
+        value = await self.client.get(self.prefix + key)
+        return orjson.loads(value) if value is not None else None
+
+    async def set(self, key: str, value: Any, ttl: float):
+        await self.client.set(self.prefix + key, orjson.dumps(value), px=max(int(ttl * 1000), 1))
+
+    async def delete(self, key: str):
+        await self.client.delete(self.prefix + key)
+
+    async def clear(self):
+        async for key in self.client.scan_iter(match=self.prefix + "*"):
+            await self.client.delete(key)
+
+    def __len__(self) -> int:
+        return -1  # Not tracked for a shared backend
+
+
+class ResponseCache:
+    """Read-through cache of hot API lookups, invalidated by deposit events.
+
+    Entries expire after ``RESPONSE_CACHE_TTL`` seconds as a safety net,
+    but are normally dropped as soon as the monitor publishes a change:
+    deposit and confirmation events drop the transaction's entry and
+    ``wallet_changed`` drops the wallet's. Lookups that found nothing are
+    cached for the shorter ``RESPONSE_CACHE_NEGATIVE_TTL``, so clients
+    polling for a deposit that is not mined yet stop reaching the database
+    too; the deposit's first event invalidates the negative entry.
+
+    A load that overlaps an invalidation of its key is returned but not
+    stored, so a row read just before a change cannot outlive it.
+    """
+
+    def __init__(self, backend, ttl: float, negative_ttl: float):
+        self.backend = backend
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.errors = 0
+        self._generations: Dict[str, int] = {}
+
+    async def get_or_load(self, key: str, load: Callable[[], Awaitable[Any]]) -> Any:
+        """Return the cached value of ``key``, loading and caching it on a miss.
+
+        ``load`` returns a JSON-compatible value; None and empty lists count
+        as not found and are cached for the negative TTL.
+        """
+        try:
+            cached = await self.backend.get(key)
+        except Exception as e:
+            # A cache outage must not take the endpoint down with it
+            self.errors += 1
+            logger.warning(f"Response cache read failed: {e}")
+            return await load()
+
+        if cached is not None:
+            self.hits += 1
+            return cached["value"]
+
+        self.misses += 1
+        generation = self._generations.get(key, 0)
+        value = await load()
+
+        if self._generations.get(key, 0) == generation:
+            ttl = self.ttl if value else self.negative_ttl
+            try:
+                await self.backend.set(key, {"value": value}, ttl)
+            except Exception as e:
+                self.errors += 1
+                logger.warning(f"Response cache write failed: {e}")
+
+        return value
+
+    async def invalidate(self, key: str):
+        self._generations[key] = self._generations.get(key, 0) + 1
+        if len(self._generations) > 100000:
+            # Generations only matter while a load is in flight
+            self._generations.clear()
+        self.invalidations += 1
+        try:
+            await self.backend.delete(key)
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"Response cache invalidation failed: {e}")
+
+    async def clear(self):
+        self._generations.clear()
+        try:
+            await self.backend.clear()
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"Response cache clear failed: {e}")
+
+    async def handle_event(self, event: dict):
+        """Drop the entries an event bus event makes stale."""
+        event_type = event.get("type")
+
+        if event_type == "deposit_update":
+            tx_hash = event["data"].get("tx_hash")
+            if tx_hash:
+                await self.invalidate(deposit_tx_key(tx_hash))
+        elif event_type == "confirmation_update":
+            await self.invalidate(deposit_tx_key(event["tx_hash"]))
+        elif event_type == "wallet_changed":
+            await self.invalidate(wallet_address_key(event["wallet_address"]))
+        elif event_type == "listener_reconnected":
+            # Invalidations sent while the listener was down are lost
+            await self.clear()
+        elif event_type == "wallets_imported":
+            # Too many addresses to drop one by one; only not-found entries can be stale
+            await self.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "backend": settings.response_cache_backend,
+            "entries": len(self.backend),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 3) if lookups else 0.0,
+            "invalidations": self.invalidations,
+            "evictions": self.backend.evictions,
+            "errors": self.errors,
+        }
+
+
+class NullResponseCache(ResponseCache):
+    """Pass-through used when caching is disabled."""
+
+    def __init__(self):
+        super().__init__(None, 0, 0)
+
+    async def get_or_load(self, key: str, load: Callable[[], Awaitable[Any]]) -> Any:
+        self.misses += 1
+        return await load()
+
+    async def invalidate(self, key: str):
+        pass
+
+    async def clear(self):
+        pass
+
+    def stats(self) -> Dict[str, Any]:
+        return {"backend": "none", "misses": self.misses}
+
+
+_response_cache: Optional[ResponseCache] = None
+
+
+def get_response_cache() -> ResponseCache:
+    """Get the process-wide response cache for the configured backend."""
+    global _response_cache
+
+    if _response_cache is None:
+        backend = settings.response_cache_backend
+        if backend == "memory":
+            _response_cache = ResponseCache(
+                MemoryCacheBackend(settings.response_cache_size),
+                settings.response_cache_ttl,
+                settings.response_cache_negative_ttl,
+            )
+        elif backend == "redis":
+            _response_cache = ResponseCache(
+                RedisCacheBackend(settings.response_cache_url),
+                settings.response_cache_ttl,
+                settings.response_cache_negative_ttl,
+            )
+        elif backend == "none":
+            _response_cache = NullResponseCache()
+        else:
+            raise ValueError(f"Unknown response cache backend: {backend}")
+
+    return _response_cache
@@ -0,0 +1,170 @@
+import asyncio
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional, Sequence, Union
+
+import orjson
+
+from app.services.rpc_pool import ProviderPool
+
+
+def is_block_hash(block: Union[int, str]) -> bool:
+    return isinstance(block, str) and len(block) == 66 and block.startswith("0x")
+
+
+class RPCCache:
+    """Size-bounded LRU cache of immutable, hash-addressed RPC results.
+
+    Blocks, block receipts and block logs never change for a given block
+    hash, so they are cached by hash. Lookups by block number go through a
+    number-to-hash index that is invalidated from the fork point on reorg.
+    Concurrent fetches of the same key share one request.
+
+    One cache is shared by every monitor task of a network.
+    """
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._hashes_by_number: Dict[int, str] = {}
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        value = self._entries.get(key)
+        if value is not None:
+            self._entries.move_to_end(key)
+        return value
+
+    def put(self, key: Hashable, value: Any):
+        if value is None:
+            return
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    async def get_or_fetch(self, key: Hashable, fetch: Callable[[], Awaitable[Any]], store: bool = True) -> Any:
+        """Return the cached value for ``key``, fetching it once if missing.
+
+        With ``store=False`` concurrent fetches are still shared, but the
+        result is not kept under ``key``.
+        """
+        value = self.get(key)
+        if value is not None:
+            self.hits += 1
+            return value
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            self.hits += 1
+            return await asyncio.shield(inflight)
+
+        self.misses += 1
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            value = await fetch()
+        except BaseException as e:
+            if isinstance(e, asyncio.CancelledError):
+                # Only the fetching task was cancelled, the waiters should just fail
+                e = Exception(f"Shared fetch of {key[0]} was cancelled")
+            future.set_exception(e)
+            # Mark it retrieved so it is not reported as unhandled when nobody waits
+            future.exception()
+            raise
+        else:
+            future.set_result(value)
+            if store:
+                self.put(key, value)
+            return value
+        finally:
+            del self._inflight[key]
+
+    def hash_for_number(self, number: int) -> Optional[str]:
+        return self._hashes_by_number.get(number)
+
+    def set_number(self, number: int, block_hash: str):
+        self._hashes_by_number[number] = block_hash
+        # Keep the index to the blocks that can still be in the cache
+        while len(self._hashes_by_number) > self.max_size:
+            del self._hashes_by_number[next(iter(self._hashes_by_number))]
+
+    def invalidate_from(self, number: int):
+        """Forget number lookups at and above a reorg's fork point."""
+        for block_number in [n for n in self._hashes_by_number if n >= number]:
+            del self._hashes_by_number[block_number]
+
+    def stats(self) -> Dict[str, Any]:
+        requests = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / requests, 3) if requests else 0.0,
+        }
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class CachedRPCClient(ProviderPool):
+    """Provider pool that serves blocks, block receipts and block logs from an RPCCache."""
+
+    def __init__(self, urls: Sequence[str], cache: RPCCache, timeout: float = None):
+        super().__init__(urls, timeout)
+        self.cache = cache
+
+    async def get_block(self, block: Union[int, str], full_transactions: bool = False) -> Optional[Dict]:
+        if not isinstance(block, int):
+            # Tags like "latest" move with the chain
+            return await super().get_block(block, full_transactions)
+
+        block_hash = self.cache.hash_for_number(block)
+        if block_hash is not None:
+            return await self.get_block_by_hash(block_hash, full_transactions)
+
+        result = await self.cache.get_or_fetch(
+            ("number", block, full_transactions),
+            lambda: super(CachedRPCClient, self).get_block(block, full_transactions),
+            store=False,
+        )
+        if result:
+            self.cache.put(("block", result["hash"], full_transactions), result)
+            self.cache.set_number(block, result["hash"])
+        return result
+
+    async def get_block_by_hash(self, block_hash: str, full_transactions: bool = False) -> Optional[Dict]:
+        if not full_transactions:
+            # A cached full block also answers header lookups
+            full_block = self.cache.get(("block", block_hash, True))
+            if full_block is not None:
+                self.cache.hits += 1
+                return {**full_block, "transactions": [tx["hash"] for tx in full_block["transactions"]]}
+
+        return await self.cache.get_or_fetch(
+            ("block", block_hash, full_transactions),
+            lambda: super(CachedRPCClient, self).get_block_by_hash(block_hash, full_transactions),
+        )
+
+    async def get_block_receipts(self, block: Union[int, str]) -> List[Dict]:
+        if not is_block_hash(block):
+            return await super().get_block_receipts(block)
+
+        return await self.cache.get_or_fetch(
+            ("receipts", block),
+            lambda: super(CachedRPCClient, self).get_block_receipts(block),
+        )
+
+    async def get_logs(self, log_filter: Dict) -> List[Dict]:
+        if "blockHash" not in log_filter:
+            # Ranged filters are addressed by number and may cross a reorg
+            return await super().get_logs(log_filter)
+
+        return await self.cache.get_or_fetch(
+            ("logs", orjson.dumps(log_filter, option=orjson.OPT_SORT_KEYS)),
+            lambda: super(CachedRPCClient, self).get_logs(log_filter),
+        )
@@ -0,0 +1,171 @@
+import itertools
+import logging
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+import httpx
+import orjson
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# JSON-RPC error code returned by nodes that do not implement a method
+METHOD_NOT_FOUND = -32601
+
+
+class RPCError(Exception):
+    """Raised when a JSON-RPC request returns an error object."""
+
+    def __init__(self, code: int, message: str):
+        super().__init__(f"RPC error {code}: {message}")
+        self.code = code
+        self.message = message
+
+
+class AsyncRPCClient:
+    """Async Ethereum JSON-RPC client backed by a pooled keep-alive HTTP client.
+
+    Results are returned as raw JSON-RPC values (hex quantities, dicts),
+    without the web3 formatting layer.
+    """
+
+    def __init__(self, url: str, timeout: float = None):
+        self.url = url
+        self._ids = itertools.count(1)
+        self.block_receipts_supported = settings.rpc_use_block_receipts
+        self._client = httpx.AsyncClient(
+            timeout=timeout or settings.rpc_timeout,
+            limits=httpx.Limits(
+                max_connections=settings.rpc_max_connections,
+                max_keepalive_connections=settings.rpc_max_keepalive_connections,
+            ),
+            headers={"Content-Type": "application/json"},
+        )
+
+    async def close(self):
+        """Close the underlying HTTP connection pool."""
+        await self._client.aclose()
+
+    async def call(self, method: str, params: Optional[list] = None) -> Any:
+        """Perform a single JSON-RPC call and return its result."""
+        payload = {
+            "jsonrpc": "2.0",
+            "id": next(self._ids),
+            "method": method,
+            "params": params or [],
+        }
+
+        response = await self._client.post(self.url, json=payload)
+        response.raise_for_status()
+        # Full blocks are large; orjson decodes them several times faster than json
+        data = orjson.loads(response.content)
+
+        if "error" in data:
+            error = data["error"]
+            raise RPCError(error.get("code", 0), error.get("message", ""))
+
+        return data.get("result")
+
+    async def batch(self, calls: Sequence[Tuple[str, list]]) -> List[Any]:
+        """Send several JSON-RPC calls in one batch request.
+
+        Results are returned in the same order as ``calls``.
+        """
+        if not calls:
+            return []
+
+        payload = []
+        for method, params in calls:
+            payload.append({
+                "jsonrpc": "2.0",
+                "id": next(self._ids),
+                "method": method,
+                "params": params or [],
+            })
+
+        response = await self._client.post(self.url, json=payload)
+        response.raise_for_status()
+        data = orjson.loads(response.content)
+
+        # A provider may reject the whole batch with a single error object
+        if isinstance(data, dict):
+            error = data.get("error", {})
+            raise RPCError(error.get("code", 0), error.get("message", "Invalid batch response"))
+
+        # Batch responses may come back in any order
+        by_id = {item.get("id"): item for item in data}
+        results = []
+        for request in payload:
+            item = by_id.get(request["id"])
+            if item is None:
+                raise RPCError(0, f"Missing response for {request['method']}")
+            if "error" in item:
+                error = item["error"]
+                raise RPCError(error.get("code", 0), error.get("message", ""))
+            results.append(item.get("result"))
+
+        return results
+
+    async def is_connected(self) -> bool:
+        """Check that the node answers JSON-RPC requests."""
+        try:
+            await self.call("web3_clientVersion")
+            return True
+        except Exception as e:
+            logger.warning(f"RPC endpoint {self.url} is not reachable: {e}")
+            return False
+
+    async def block_number(self) -> int:
+        """Get the current chain head number."""
+        return int(await self.call("eth_blockNumber"), 16)
+
+    async def get_block(self, block: Union[int, str], full_transactions: bool = False) -> Optional[Dict]:
+        """Get a block by number or tag ("latest", "safe", ...)."""
+        block_id = hex(block) if isinstance(block, int) else block
+        return await self.call("eth_getBlockByNumber", [block_id, full_transactions])
+
+    async def get_block_by_hash(self, block_hash: str, full_transactions: bool = False) -> Optional[Dict]:
+        """Get a block by hash."""
+        return await self.call("eth_getBlockByHash", [block_hash, full_transactions])
+
+    async def get_logs(self, log_filter: Dict) -> List[Dict]:
+        """Get the logs matching an eth_getLogs filter (block range or blockHash, addresses, topics)."""
+        return await self.call("eth_getLogs", [log_filter]) or []
+
+    async def get_transaction_receipt(self, tx_hash: str) -> Optional[Dict]:
+        """Get the receipt of a mined transaction."""
+        return await self.call("eth_getTransactionReceipt", [tx_hash])
+
+    async def get_block_receipts(self, block: Union[int, str]) -> List[Dict]:
+        """Get all receipts of a block (by number, tag or hash) with eth_getBlockReceipts."""
+        block_id = hex(block) if isinstance(block, int) else block
+        return await self.call("eth_getBlockReceipts", [block_id]) or []
+
+    async def get_receipts(self, block: Union[int, str], tx_hashes: Sequence[str]) -> Dict[str, Dict]:
+        """Get receipts for transactions of one block in a single round-trip.
+
+        Uses eth_getBlockReceipts when the provider supports it and falls back
+        to a batch of eth_getTransactionReceipt calls otherwise.
+        """
+        if not tx_hashes:
+            return {}
+
+        if self.block_receipts_supported:
+            try:
+                receipts = await self.get_block_receipts(block)
+                return {receipt["transactionHash"]: receipt for receipt in receipts}
+            except RPCError as e:
+                if e.code == METHOD_NOT_FOUND:
+                    logger.info("eth_getBlockReceipts not supported by provider, using batched receipts")
+                    self.block_receipts_supported = False
+                else:
+                    logger.warning(f"eth_getBlockReceipts failed for block {block}: {e}")
+
+        receipts = await self.batch(
+            [("eth_getTransactionReceipt", [tx_hash]) for tx_hash in tx_hashes]
+        )
+        return {
+            tx_hash: receipt
+            for tx_hash, receipt in zip(tx_hashes, receipts)
+            if receipt is not None
+        }
@@ -0,0 +1,262 @@
+import asyncio
+import itertools
+import logging
+import random
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+from urllib.parse import urlsplit
+
+import httpx
+
+from app.config import settings
+from app.services.rpc_client import AsyncRPCClient, RPCError
+
+logger = logging.getLogger(__name__)
+
+# JSON-RPC error codes providers use for rate limiting; treated like transport failures
+RATE_LIMIT_ERROR_CODES = {-32005, 429}
+
+# Latency samples needed before a provider's percentile is trusted as a hedge budget
+MIN_HEDGE_SAMPLES = 20
+
+
+def split_urls(value: str) -> List[str]:
+    """Split a comma-separated endpoint list, as stored in rpc_url and ws_url."""
+    return [url.strip() for url in value.split(",") if url.strip()]
+
+
+def endpoint_name(url: str) -> str:
+    """Host of an endpoint URL, safe to log (provider URLs often embed API keys)."""
+    return urlsplit(url).netloc or url
+
+
+class TokenBucket:
+    """Token bucket limiting the request rate to one provider; a rate of 0 disables it."""
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = max(capacity, 1)
+        self.tokens = float(self.capacity)
+        self.updated_at = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def available(self) -> bool:
+        if self.rate <= 0:
+            return True
+        self._refill()
+        return self.tokens >= 1
+
+    def try_acquire(self) -> bool:
+        if self.rate <= 0:
+            return True
+        self._refill()
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True
+        return False
+
+    async def acquire(self):
+        while not self.try_acquire():
+            await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class Provider:
+    """One RPC endpoint of a pool with its health and latency statistics."""
+
+    def __init__(self, url: str, timeout: float = None):
+        self.client = AsyncRPCClient(url, timeout)
+        self.name = endpoint_name(url)
+        self.bucket = TokenBucket(settings.rpc_provider_rate_limit, settings.rpc_provider_burst)
+        self.latency = 0.1  # EWMA of successful request latency, seconds
+        self.error_rate = 0.0  # EWMA of failed requests
+        self.samples: deque = deque(maxlen=100)
+        self.consecutive_failures = 0
+        self.cooldown_until = 0.0
+        self.requests = 0
+        self.failures = 0
+        self.hedges = 0
+
+    @property
+    def healthy(self) -> bool:
+        return time.monotonic() >= self.cooldown_until
+
+    @property
+    def weight(self) -> float:
+        """Selection weight: favors fast providers, discounted by recent errors."""
+        return max(1.0 - self.error_rate, 0.05) / max(self.latency, 0.001)
+
+    def latency_percentile(self, percentile: float) -> Optional[float]:
+        if len(self.samples) < MIN_HEDGE_SAMPLES:
+            return None
+        ordered = sorted(self.samples)
+        return ordered[min(int(len(ordered) * percentile), len(ordered) - 1)]
+
+    def record_success(self, elapsed: float):
+        self.requests += 1
+        self.samples.append(elapsed)
+        self.latency = 0.8 * self.latency + 0.2 * elapsed
+        self.error_rate *= 0.8
+        self.consecutive_failures = 0
+
+    def record_failure(self):
+        self.requests += 1
+        self.failures += 1
+        self.error_rate = 0.8 * self.error_rate + 0.2
+        self.consecutive_failures += 1
+        if self.consecutive_failures >= 3:
+            # Back off exponentially while the provider keeps failing
+            cooldown = min(2 ** (self.consecutive_failures - 3), settings.rpc_failure_cooldown)
+            self.cooldown_until = time.monotonic() + cooldown
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "provider": self.name,
+            "healthy": self.healthy,
+            "latency_ms": round(self.latency * 1000, 1),
+            "error_rate": round(self.error_rate, 3),
+            "requests": self.requests,
+            "failures": self.failures,
+            "hedges": self.hedges,
+        }
+
+
+class ProviderPool(AsyncRPCClient):
+    """JSON-RPC client that spreads requests over several providers of one network.
+
+    Providers are picked at random weighted by their latency EWMA and
+    recent error rate; a provider that fails three times in a row is
+    skipped for an exponentially growing cooldown. Transport errors, 5xx
+    and rate-limit responses fail over to another provider. When a request
+    is still pending after the provider's ``RPC_HEDGE_PERCENTILE`` latency,
+    a hedged copy goes to a second provider and the first answer wins.
+    Every provider has its own token bucket (``RPC_PROVIDER_RATE_LIMIT``),
+    and hedges are only sent when the second provider has a token to spare.
+
+    All monitor calls are reads, so duplicating them is safe. The typed
+    helpers of AsyncRPCClient are inherited and go through ``call``/``batch``.
+    """
+
+    def __init__(self, urls: Sequence[str], timeout: float = None):
+        # The pool has no connection of its own; every provider owns one
+        if not urls:
+            raise ValueError("Provider pool needs at least one RPC URL")
+        self.url = ",".join(urls)
+        self._ids = itertools.count(1)
+        self.block_receipts_supported = settings.rpc_use_block_receipts
+        self.providers = [Provider(url, timeout) for url in urls]
+
+    async def close(self):
+        for provider in self.providers:
+            await provider.client.close()
+
+    async def call(self, method: str, params: Optional[list] = None) -> Any:
+        return await self._request(lambda client: client.call(method, params))
+
+    async def batch(self, calls: Sequence[Tuple[str, list]]) -> List[Any]:
+        if not calls:
+            return []
+        return await self._request(lambda client: client.batch(calls))
+
+    async def is_connected(self) -> bool:
+        """Check that at least one provider answers JSON-RPC requests."""
+        results = await asyncio.gather(*[provider.client.is_connected() for provider in self.providers])
+        return any(results)
+
+    def stats(self) -> List[Dict[str, Any]]:
+        return [provider.stats() for provider in self.providers]
+
+    def _choose(self, exclude: Sequence[Provider] = (), require_token: bool = False) -> Optional[Provider]:
+        candidates = [
+            provider for provider in self.providers
+            if provider not in exclude and provider.healthy and (not require_token or provider.bucket.available())
+        ]
+        if not candidates:
+            if require_token:
+                return None
+            # Everything is cooling down: try the one that recovers first rather than stall
+            remaining = [provider for provider in self.providers if provider not in exclude]
+            return min(remaining, key=lambda provider: provider.cooldown_until) if remaining else None
+
+        return random.choices(candidates, weights=[provider.weight for provider in candidates])[0]
+
+    async def _attempt(self, provider: Provider, send: Callable[[AsyncRPCClient], Awaitable[Any]]) -> Any:
+        await provider.bucket.acquire()
+        started = time.monotonic()
+        try:
+            result = await send(provider.client)
+        except RPCError as e:
+            if e.code in RATE_LIMIT_ERROR_CODES:
+                provider.record_failure()
+            else:
+                # The node answered; the request itself is at fault
+                provider.record_success(time.monotonic() - started)
+            raise
+        except (httpx.HTTPError, ValueError):
+            provider.record_failure()
+            raise
+        provider.record_success(time.monotonic() - started)
+        return result
+
+    async def _request(self, send: Callable[[AsyncRPCClient], Awaitable[Any]]) -> Any:
+        tried: List[Provider] = []
+        last_error: Optional[BaseException] = None
+
+        while len(tried) < len(self.providers):
+            provider = self._choose(exclude=tried)
+            if provider is None:
+                break
+            tried.append(provider)
+
+            try:
+                return await self._hedged(provider, send, tried)
+            except RPCError as e:
+                if e.code not in RATE_LIMIT_ERROR_CODES:
+                    raise
+                last_error = e
+            except (httpx.HTTPError, ValueError) as e:
+                last_error = e
+
+            logger.warning(f"RPC provider {provider.name} failed, trying another: {last_error}")
+
+        raise last_error or RPCError(0, "No RPC provider available")
+
+    async def _hedged(self, provider: Provider, send, tried: List[Provider]) -> Any:
+        """Run a request on ``provider``, hedging on a second provider past its latency budget."""
+        primary = asyncio.ensure_future(self._attempt(provider, send))
+
+        budget = None
+        if settings.rpc_hedge_percentile > 0 and len(self.providers) > 1:
+            budget = provider.latency_percentile(settings.rpc_hedge_percentile)
+        if budget is None:
+            return await primary
+
+        budget = max(budget, settings.rpc_hedge_min_delay)
+        done, _ = await asyncio.wait({primary}, timeout=budget)
+        if done:
+            return primary.result()
+
+        backup_provider = self._choose(exclude=tried, require_token=True)
+        if backup_provider is None:
+            return await primary
+
+        tried.append(backup_provider)
+        backup_provider.hedges += 1
+        backup = asyncio.ensure_future(self._attempt(backup_provider, send))
+        pending = {primary, backup}
+
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+            # Both failed: surface the primary's error
+            return primary.result()
+        finally:
+            for task in pending:
+                task.cancel()
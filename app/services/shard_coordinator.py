@@ -0,0 +1,194 @@
+import hashlib
+import logging
+from typing import Awaitable, Callable, Dict, Iterable, List, NamedTuple, Optional
+from uuid import UUID
+
+import asyncpg
+from sqlalchemy import and_
+
+logger = logging.getLogger(__name__)
+
+# Advisory lock namespaces (first key of the two-key lock form)
+MEMBER_LOCK_NAMESPACE = 0x6D6F6E01
+UNIT_LOCK_NAMESPACE = 0x6D6F6E02
+
+# Member slots a worker tries when registering itself
+MAX_MEMBERS = 1024
+
+ADDRESS_SPACE = 1 << 160
+
+
+class AddressRange(NamedTuple):
+    """Half-open range of lowercase hex wallet addresses, ``None`` meaning unbounded."""
+
+    low: Optional[str]
+    high: Optional[str]
+
+    def contains(self, address: str) -> bool:
+        return (self.low is None or address >= self.low) and (self.high is None or address < self.high)
+
+    def clause(self, column):
+        """SQL condition restricting an address column to the range, or ``None`` for all addresses."""
+        conditions = []
+        if self.low is not None:
+            conditions.append(column >= self.low)
+        if self.high is not None:
+            conditions.append(column < self.high)
+        if not conditions:
+            return None
+        return and_(*conditions)
+
+
+class WorkUnit(NamedTuple):
+    """One network's share of the wallet address space, processed by a single worker."""
+
+    network_id: UUID
+    shard_index: int = 0
+    shard_count: int = 1
+
+    @property
+    def address_range(self) -> AddressRange:
+        """Contiguous slice of the address space owned by this shard.
+
+        Normalized addresses are fixed-length lowercase hex, so string order
+        matches numeric order and the range can use the address index.
+        """
+        def bound(index: int) -> Optional[str]:
+            if index <= 0 or index >= self.shard_count:
+                return None
+            return "0x" + format(index * ADDRESS_SPACE // self.shard_count, "040x")
+
+        return AddressRange(bound(self.shard_index), bound(self.shard_index + 1))
+
+    @property
+    def lock_key(self) -> int:
+        """Signed 32-bit advisory lock key for the unit."""
+        digest = hashlib.blake2b(
+            f"{self.network_id}:{self.shard_index}:{self.shard_count}".encode(),
+            digest_size=4,
+        ).digest()
+        return int.from_bytes(digest, "big", signed=True)
+
+    def __str__(self) -> str:
+        if self.shard_count == 1:
+            return str(self.network_id)
+        return f"{self.network_id}:{self.shard_index}/{self.shard_count}"
+
+
+class ShardCoordinator:
+    """Leases work units to monitor processes with Postgres advisory locks.
+
+    Each worker holds one session-level lock in the member namespace to
+    announce itself, and one lock per work unit it processes. Locks live as
+    long as the worker's connection, so a worker that dies releases its
+    units automatically.
+
+    Shares are deterministic: live workers are ranked by member slot, every
+    worker gets floor(units / workers) units and the lowest-ranked ones one
+    more, so shares add up to exactly the number of units. ``rebalance``
+    releases units above this worker's share and claims free ones up to it.
+    """
+
+    def __init__(self, dsn: str):
+        self.dsn = dsn
+        self.owned: Dict[WorkUnit, int] = {}
+        self.member_slot: Optional[int] = None
+        self._connection: Optional[asyncpg.Connection] = None
+
+    @property
+    def connected(self) -> bool:
+        return self._connection is not None and not self._connection.is_closed()
+
+    async def start(self):
+        """Open the lock connection and register as a live worker."""
+        self._connection = await asyncpg.connect(self.dsn)
+        self.owned.clear()
+
+        for slot in range(MAX_MEMBERS):
+            if await self._connection.fetchval(
+                "SELECT pg_try_advisory_lock($1, $2)", MEMBER_LOCK_NAMESPACE, slot
+            ):
+                self.member_slot = slot
+                logger.info(f"Registered as monitor worker {slot}")
+                return
+
+        raise Exception(f"No free monitor worker slot out of {MAX_MEMBERS}")
+
+    async def stop(self):
+        """Release every lease by closing the lock connection."""
+        if self._connection and not self._connection.is_closed():
+            await self._connection.close()
+        self._connection = None
+        self.owned.clear()
+        self.member_slot = None
+
+    async def member_slots(self) -> List[int]:
+        """Get the member slots of the live workers, including this one, in rank order."""
+        rows = await self._connection.fetch(
+            """
+            SELECT objid::bigint AS slot FROM pg_locks
+            WHERE locktype = 'advisory' AND granted
+              AND database = (SELECT oid FROM pg_database WHERE datname = current_database())
+              AND classid::bigint = $1 AND objsubid = 2
+            ORDER BY objid::bigint
+            """,
+            MEMBER_LOCK_NAMESPACE,
+        )
+        return [row["slot"] for row in rows]
+
+    def share(self, unit_count: int, member_slots: List[int]) -> int:
+        """Get this worker's number of units given the live member slots."""
+        members = max(len(member_slots), 1)
+        rank = member_slots.index(self.member_slot) if self.member_slot in member_slots else members - 1
+        return unit_count // members + (1 if rank < unit_count % members else 0)
+
+    async def rebalance(
+        self,
+        units: Iterable[WorkUnit],
+        release: Callable[[WorkUnit], Awaitable[None]],
+    ) -> List[WorkUnit]:
+        """Adjust owned units towards this worker's fair share and return the newly acquired ones.
+
+        ``release`` is awaited for every unit given up, before its lock is
+        released, so the caller can stop processing it first. Owned units
+        that are no longer in ``units`` are always released.
+        """
+        units = sorted(set(units), key=lambda unit: (str(unit.network_id), unit.shard_count, unit.shard_index))
+        member_slots = await self.member_slots()
+        members = max(len(member_slots), 1)
+        share = self.share(len(units), member_slots)
+
+        released = [unit for unit in self.owned if unit not in units]
+        surplus = len(self.owned) - len(released) - share
+        if surplus > 0:
+            released.extend([unit for unit in reversed(units) if unit in self.owned][:surplus])
+
+        for unit in released:
+            await release(unit)
+            await self._unlock(unit)
+
+        acquired = []
+        # Start at a different offset per worker so idle workers do not all race for the same units
+        offset = ((self.member_slot or 0) * len(units) // members) % len(units) if units else 0
+        for unit in units[offset:] + units[:offset]:
+            if len(self.owned) >= share:
+                break
+            if unit in self.owned:
+                continue
+            if await self._connection.fetchval(
+                "SELECT pg_try_advisory_lock($1, $2)", UNIT_LOCK_NAMESPACE, unit.lock_key
+            ):
+                self.owned[unit] = unit.lock_key
+                acquired.append(unit)
+
+        if acquired or released:
+            logger.info(
+                f"Rebalanced work units across {members} workers: "
+                f"{len(acquired)} acquired, {len(released)} released, {len(self.owned)} owned"
+            )
+
+        return acquired
+
+    async def _unlock(self, unit: WorkUnit):
+        lock_key = self.owned.pop(unit)
+        await self._connection.fetchval("SELECT pg_advisory_unlock($1, $2)", UNIT_LOCK_NAMESPACE, lock_key)
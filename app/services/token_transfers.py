@@ -0,0 +1,212 @@
+from decimal import Decimal
+from typing import Dict, Iterable, List, Optional
+
+from eth_utils import keccak
+
+from app.config import settings
+from app.models.user import DepositStatus, Token, Wallet
+from app.utils import normalize_address, normalize_transaction_hash
+
+# keccak256("Transfer(address,address,uint256)")
+TRANSFER_TOPIC = "0xddf252ad1be2c89b69c2b068fc378daa952ba7f163c4a11628f55a4df523b3ef"
+
+
+def bloom_mask(value: bytes) -> int:
+    """Get the logsBloom bits set by one log address or topic, as a 2048-bit integer."""
+    digest = keccak(value)
+    mask = 0
+    for i in (0, 2, 4):
+        mask |= 1 << (((digest[i] << 8) | digest[i + 1]) & 0x7FF)
+    return mask
+
+
+def address_topic(address: str) -> str:
+    """Left-pad an address to the 32-byte topic form used by indexed event arguments."""
+    return "0x" + "0" * 24 + address[2:].lower()
+
+
+def topic_address(topic: str) -> str:
+    """Extract the lowercase address from a 32-byte topic."""
+    return "0x" + topic[-40:].lower()
+
+
+class TransferBloomFilter:
+    """Per-block logsBloom pre-check for Transfer events that may pay a monitored wallet.
+
+    A block can only contain a relevant log if its bloom has the bits of the
+    Transfer topic, of at least one watched token contract, and of at least
+    one monitored recipient topic. Recipients are bucketed by their lowest
+    bloom bit, so a sparse bloom only tests the recipients in the buckets of
+    its few set bits.
+
+    Kept current by the wallet registry through ``update``/``add``/``discard``.
+    """
+
+    def __init__(self):
+        self.transfer_mask = bloom_mask(bytes.fromhex(TRANSFER_TOPIC[2:]))
+        self.token_masks: List[int] = []
+        self._recipient_masks: Dict[str, int] = {}
+        self._buckets: Dict[int, Dict[str, int]] = {}
+
+    def update_tokens(self, token_addresses: Iterable[str]):
+        """Replace the set of watched token contracts."""
+        self.token_masks = [bloom_mask(bytes.fromhex(address[2:])) for address in token_addresses]
+
+    def update(self, addresses: Iterable[str]):
+        """Replace the set of monitored recipients."""
+        self._recipient_masks.clear()
+        self._buckets.clear()
+        self.add(addresses)
+
+    def add(self, addresses: Iterable[str]):
+        for address in addresses:
+            address = address.lower()
+            if address in self._recipient_masks:
+                continue
+            mask = bloom_mask(bytes.fromhex(address_topic(address)[2:]))
+            self._recipient_masks[address] = mask
+            self._buckets.setdefault(mask & -mask, {})[address] = mask
+
+    def discard(self, addresses: Iterable[str]):
+        for address in addresses:
+            mask = self._recipient_masks.pop(address.lower(), None)
+            if mask is None:
+                continue
+            bucket = self._buckets[mask & -mask]
+            del bucket[address.lower()]
+            if not bucket:
+                del self._buckets[mask & -mask]
+
+    def may_contain(self, logs_bloom: Optional[str]) -> bool:
+        """Check whether a block's logsBloom may hold a watched Transfer to a monitored wallet."""
+        if not self.token_masks or not self._recipient_masks:
+            return False
+        if not logs_bloom:
+            # No bloom to rule the block out
+            return True
+
+        bloom = int(logs_bloom, 16)
+        if bloom & self.transfer_mask != self.transfer_mask:
+            return False
+        if not any(bloom & mask == mask for mask in self.token_masks):
+            return False
+
+        if bloom.bit_count() < len(self._buckets):
+            # Sparse bloom: visit only the buckets of its set bits
+            remaining = bloom
+            while remaining:
+                low_bit = remaining & -remaining
+                remaining ^= low_bit
+                for mask in self._buckets.get(low_bit, {}).values():
+                    if bloom & mask == mask:
+                        return True
+            return False
+
+        for low_bit, bucket in self._buckets.items():
+            if bloom & low_bit:
+                for mask in bucket.values():
+                    if bloom & mask == mask:
+                        return True
+        return False
+
+
+class TokenTransferScanner:
+    """Finds ERC-20 Transfer logs paying into monitored wallets and turns them into deposit rows."""
+
+    def __init__(self):
+        self.tokens: Dict[str, Token] = {}
+        self.bloom = TransferBloomFilter()
+
+    def set_tokens(self, tokens: Iterable[Token]):
+        """Replace the set of watched token contracts."""
+        self.tokens = {token.address.lower(): token for token in tokens}
+        self.bloom.update_tokens(self.tokens.keys())
+
+    def _filters(self, recipients: List[str]) -> List[dict]:
+        """Build the eth_getLogs filters for the watched tokens and recipients.
+
+        Small recipient sets go into the topic filter, in batches the provider
+        accepts. Large ones are matched client-side against an unfiltered
+        recipient topic, which costs one request instead of many.
+        """
+        base = {"address": list(self.tokens.keys())}
+        batch_size = settings.token_log_recipient_batch
+
+        if len(recipients) > batch_size:
+            return [{**base, "topics": [TRANSFER_TOPIC]}]
+
+        return [
+            {
+                **base,
+                "topics": [
+                    TRANSFER_TOPIC,
+                    None,
+                    [address_topic(address) for address in recipients[start:start + batch_size]],
+                ],
+            }
+            for start in range(0, len(recipients), batch_size)
+        ]
+
+    async def get_block_logs(self, rpc, block_hash: str, recipients: Iterable[str]) -> List[dict]:
+        """Fetch the watched Transfer logs of one block by hash."""
+        recipients = list(recipients)
+        if not self.tokens or not recipients:
+            return []
+
+        logs = []
+        for log_filter in self._filters(recipients):
+            logs.extend(await rpc.get_logs({**log_filter, "blockHash": block_hash}))
+        return logs
+
+    async def get_range_logs(self, rpc, from_block: int, to_block: int, recipients: Iterable[str]) -> Dict[str, List[dict]]:
+        """Fetch the watched Transfer logs of a block range in chunks, grouped by block hash."""
+        recipients = list(recipients)
+        logs_by_block: Dict[str, List[dict]] = {}
+        if not self.tokens or not recipients:
+            return logs_by_block
+
+        chunk_size = settings.token_log_chunk_size
+        for chunk_start in range(from_block, to_block + 1, chunk_size):
+            chunk_end = min(chunk_start + chunk_size - 1, to_block)
+            for log_filter in self._filters(recipients):
+                logs = await rpc.get_logs({**log_filter, "fromBlock": hex(chunk_start), "toBlock": hex(chunk_end)})
+                for log in logs:
+                    logs_by_block.setdefault(log["blockHash"], []).append(log)
+
+        return logs_by_block
+
+    def match(self, logs: List[dict], wallets: Dict[str, Wallet]) -> List[dict]:
+        """Return the logs that are ERC-20 transfers of a watched token into a monitored wallet."""
+        matches = []
+        for log in logs:
+            topics = log.get("topics") or []
+            # ERC-721 Transfer has the same signature but a fourth, indexed tokenId topic
+            if len(topics) != 3 or topics[0] != TRANSFER_TOPIC or log.get("removed"):
+                continue
+            if log["address"].lower() not in self.tokens:
+                continue
+            if topic_address(topics[2]) not in wallets:
+                continue
+            matches.append(log)
+        return matches
+
+    def build_deposit_row(self, log: dict, wallet: Wallet, block_number: int, block_hash: str) -> Optional[dict]:
+        """Build the deposit row for a Transfer log into a monitored wallet."""
+        token = self.tokens[log["address"].lower()]
+        value = int(log["data"], 16) if log.get("data") not in (None, "0x") else 0
+        if value == 0:
+            return None
+
+        return {
+            "wallet_id": wallet.id,
+            "tx_hash": normalize_transaction_hash(log["transactionHash"]),
+            "log_index": int(log["logIndex"], 16),
+            "token_address": token.address.lower(),
+            "amount": Decimal(value) / Decimal(10 ** token.decimals),
+            "confirmations": 0,
+            "status": DepositStatus.PENDING,
+            "blockchain_network_id": wallet.blockchain_network_id,
+            "block_number": block_number,
+            "block_hash": block_hash,
+            "from_address": normalize_address(topic_address(log["topics"][1])),
+        }
@@ -0,0 +1,241 @@
+import asyncio
+import csv
+import itertools
+import logging
+import re
+import uuid
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+from sqlalchemy import Column, Index, Integer, MetaData, String, Table, and_, delete, exists, func, literal, select
+from sqlalchemy.dialects.postgresql import UUID, insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.schema import CreateIndex, CreateTable
+
+from app.config import settings
+from app.models.user import BlockchainNetwork, User, Wallet
+from app.schemas.wallet import WalletImportIssue, WalletImportResult
+
+logger = logging.getLogger(__name__)
+
+ADDRESS_PATTERN = re.compile(r"^0x[0-9a-f]{40}$")
+
+# Issues listed in the result; the counts always cover every row
+MAX_REPORTED_ISSUES = 1000
+
+# Session-local staging table, dropped when the import transaction ends
+staging = Table(
+    "wallet_import_staging",
+    MetaData(),
+    Column("line", Integer, nullable=False),
+    Column("user_id", UUID(as_uuid=True), nullable=False),
+    Column("address", String, nullable=False),
+    Column("blockchain_network_id", UUID(as_uuid=True), nullable=False),
+    Column("label", String),
+    prefixes=["TEMPORARY"],
+    postgresql_on_commit="DROP",
+)
+staging_address_index = Index("ix_wallet_import_staging_address", staging.c.address)
+
+StagingRecord = Tuple[int, uuid.UUID, str, uuid.UUID, Optional[str]]
+
+
+def parse_uuid(value: str) -> Optional[uuid.UUID]:
+    try:
+        return uuid.UUID(value)
+    except (ValueError, AttributeError, TypeError):
+        return None
+
+
+def validate_batch(rows: List[Tuple[int, dict]]) -> Tuple[List[StagingRecord], List[WalletImportIssue]]:
+    """Validate a batch of parsed CSV rows and build staging records for the valid ones.
+
+    Imports repeat a few users and networks across many rows, so each
+    distinct id string is parsed once per batch.
+    """
+    records: List[StagingRecord] = []
+    issues: List[WalletImportIssue] = []
+
+    user_ids = [(row.get("user_id") or "").strip() for _, row in rows]
+    network_ids = [(row.get("blockchain_network_id") or row.get("network") or "").strip() for _, row in rows]
+    parsed = {value: parse_uuid(value) for value in set(user_ids) | set(network_ids)}
+
+    for (line, row), user_value, network_value in zip(rows, user_ids, network_ids):
+        address = (row.get("address") or "").strip().lower()
+        user_id = parsed[user_value]
+        network_id = parsed[network_value]
+        label = (row.get("label") or "").strip() or None
+
+        if not ADDRESS_PATTERN.match(address):
+            issues.append(WalletImportIssue(line=line, address=address or None, reason="Invalid Ethereum address format"))
+        elif user_id is None:
+            issues.append(WalletImportIssue(line=line, address=address, reason="Invalid user_id"))
+        elif network_id is None:
+            issues.append(WalletImportIssue(line=line, address=address, reason="Invalid blockchain_network_id"))
+        else:
+            records.append((line, user_id, address, network_id, label))
+
+    return records, issues
+
+
+def read_batch(rows: Iterator[Tuple[int, dict]], size: int) -> Tuple[int, List[StagingRecord], List[WalletImportIssue]]:
+    """Read and validate the next ``size`` rows; returns (row count, records, issues)."""
+    batch = list(itertools.islice(rows, size))
+    records, issues = validate_batch(batch)
+    return len(batch), records, issues
+
+
+def read_csv_rows(text_file: Iterable[str]) -> Iterator[Tuple[int, dict]]:
+    """Yield (line number, row) pairs of a CSV file with a header row."""
+    reader = csv.DictReader(text_file)
+    missing = {"user_id", "address"} - set(reader.fieldnames or ())
+    if missing or not {"blockchain_network_id", "network"} & set(reader.fieldnames or ()):
+        raise ValueError(
+            "CSV header must contain user_id, address, blockchain_network_id (or network) and optionally label"
+        )
+
+    for row in reader:
+        yield reader.line_num, row
+
+
+class WalletImporter:
+    """Registers wallets in bulk from a CSV file.
+
+    Rows are read and validated in batches on a worker thread, so a large
+    upload does not block the event loop, and each batch is loaded into a
+    temporary staging table with Postgres COPY. The staged rows are merged
+    into ``wallets`` with a few set-based statements in one transaction:
+    duplicates within the file, unknown users or networks and addresses
+    that are already registered are removed from the staging table and
+    reported, and the rest is inserted with ``ON CONFLICT (address) DO
+    NOTHING``.
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+        self.result = WalletImportResult()
+
+    def _report(self, issues: Iterable[WalletImportIssue]):
+        for issue in issues:
+            if len(self.result.issues) >= MAX_REPORTED_ISSUES:
+                self.result.issues_truncated = True
+                return
+            self.result.issues.append(issue)
+
+    async def import_rows(self, rows: Iterator[Tuple[int, dict]]) -> WalletImportResult:
+        """Import parsed CSV rows and commit; returns the import report."""
+        await self.db.execute(CreateTable(staging))
+
+        connection = await self.db.connection()
+        raw_connection = await connection.get_raw_connection()
+        copy_connection = raw_connection.driver_connection
+
+        staged = 0
+        while True:
+            # Uploads over 1 MB are spooled to disk; reading and parsing stay off the event loop
+            count, records, issues = await asyncio.to_thread(read_batch, rows, settings.wallet_import_batch_size)
+            if not count:
+                break
+
+            self.result.rows += count
+            self.result.invalid += len(issues)
+            self._report(issues)
+
+            if records:
+                await copy_connection.copy_records_to_table(
+                    staging.name, records=records, columns=[column.name for column in staging.columns]
+                )
+                staged += len(records)
+
+        if staged:
+            await self.db.execute(CreateIndex(staging_address_index))
+            await self._merge()
+
+        await self.db.commit()
+        logger.info(
+            f"Wallet import: {self.result.imported} of {self.result.rows} rows imported, "
+            f"{self.result.already_registered} already registered, {self.result.conflicts} conflicts, "
+            f"{self.result.invalid} invalid"
+        )
+        return self.result
+
+    async def _merge(self):
+        # The first occurrence of an address in the file wins
+        earlier = staging.alias("earlier")
+        result = await self.db.execute(
+            delete(staging)
+            .where(earlier.c.address == staging.c.address, earlier.c.line < staging.c.line)
+            .returning(staging.c.line, staging.c.address)
+        )
+        duplicates = result.all()
+        self.result.conflicts += len(duplicates)
+        self._report(
+            WalletImportIssue(line=line, address=address, reason="Duplicate address in file")
+            for line, address in duplicates
+        )
+
+        for model, column, reason in (
+            (User, staging.c.user_id, "User not found"),
+            (BlockchainNetwork, staging.c.blockchain_network_id, "Blockchain network not found"),
+        ):
+            result = await self.db.execute(
+                delete(staging)
+                .where(~exists().where(model.id == column))
+                .returning(staging.c.line, staging.c.address)
+            )
+            unknown = result.all()
+            self.result.invalid += len(unknown)
+            self._report(WalletImportIssue(line=line, address=address, reason=reason) for line, address in unknown)
+
+        result = await self.db.execute(
+            delete(staging)
+            .where(Wallet.address == staging.c.address)
+            .returning(
+                staging.c.line,
+                staging.c.address,
+                and_(
+                    Wallet.user_id == staging.c.user_id,
+                    Wallet.blockchain_network_id == staging.c.blockchain_network_id,
+                ),
+            )
+        )
+        for line, address, same_owner in result.all():
+            if same_owner:
+                self.result.already_registered += 1
+            else:
+                self.result.conflicts += 1
+                self._report([WalletImportIssue(
+                    line=line, address=address, reason="Address registered to another user or network"
+                )])
+
+        inserted = (
+            insert(Wallet)
+            .from_select(
+                ["id", "user_id", "address", "blockchain_network_id", "label", "is_active"],
+                select(
+                    func.gen_random_uuid(),
+                    staging.c.user_id,
+                    staging.c.address,
+                    staging.c.blockchain_network_id,
+                    staging.c.label,
+                    literal(True),
+                ),
+            )
+            .on_conflict_do_nothing(index_elements=[Wallet.address])
+            .returning(Wallet.address)
+            .cte("inserted")
+        )
+        # Rows left out by ON CONFLICT were registered by a concurrent request
+        result = await self.db.execute(
+            select(staging.c.line, staging.c.address)
+            .outerjoin(inserted, inserted.c.address == staging.c.address)
+            .where(inserted.c.address.is_(None))
+        )
+        raced = result.all()
+        remaining = await self.db.scalar(select(func.count()).select_from(staging))
+
+        self.result.imported = remaining - len(raced)
+        self.result.conflicts += len(raced)
+        self._report(
+            WalletImportIssue(line=line, address=address, reason="Address registered concurrently")
+            for line, address in raced
+        )
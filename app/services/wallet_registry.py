@@ -0,0 +1,151 @@
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import select
+
+from app.config import settings
+from app.database import AsyncSessionLocal
+from app.models.user import Wallet, BlockchainNetwork
+from app.services.block_filter import BlockFilter
+
+logger = logging.getLogger(__name__)
+
+# Rows committed late can carry an updated_at slightly older than the cursor,
+# so each refresh re-reads a short window behind it. Applying a row is idempotent.
+REFRESH_LOOKBACK = timedelta(seconds=5)
+
+
+class WalletRegistry:
+    """The monitor's live set of watched wallets and the block filter built from it.
+
+    Scoped to one blockchain network when ``network_id`` is given, and to
+    one monitor shard's slice of the address space when ``address_range`` is.
+
+    Loaded in full once at startup, then kept current incrementally: each
+    refresh reads only the wallets whose ``updated_at`` moved past the cursor
+    and adds or removes them from the filter in place. Refreshes run on a
+    timer and immediately on ``wallet_changed`` events from the event bus, so
+    block processing never pauses for a reload. A ``wallets_imported`` event
+    triggers one full reload instead.
+
+    ``indexes`` are extra address indexes (anything with ``update``, ``add``
+    and ``discard``) kept in step with the block filter.
+    """
+
+    def __init__(self, network_id=None, address_range=None, indexes: Iterable = ()):
+        self.network_id = network_id
+        self.address_range = address_range
+        self.wallets: Dict[str, Wallet] = {}
+        self.block_filter = BlockFilter()
+        self.indexes = [self.block_filter, *indexes]
+        self.cursor: Optional[datetime] = None
+        self._wake = asyncio.Event()
+        self._reload = False
+        self._lock = asyncio.Lock()
+
+    def get(self, address: str) -> Optional[Wallet]:
+        """Get the watched wallet for a lowercase address."""
+        return self.wallets.get(address)
+
+    async def load(self):
+        """Load every monitored wallet, replacing the current set."""
+        async with self._lock:
+            async with AsyncSessionLocal() as db:
+                result = await db.execute(self._query())
+                rows = result.all()
+
+            self.wallets = {}
+            for index in self.indexes:
+                index.update(())
+            self.cursor = None
+            self._apply(rows)
+
+        logger.info(f"Loaded {len(self.wallets)} monitored wallets")
+
+    async def refresh(self) -> int:
+        """Apply wallets added, changed or deactivated since the last refresh.
+
+        Returns the number of changed rows read.
+        """
+        async with self._lock:
+            query = self._query()
+            if self.cursor is not None:
+                query = query.where(Wallet.updated_at >= self.cursor - REFRESH_LOOKBACK)
+
+            async with AsyncSessionLocal() as db:
+                result = await db.execute(query.order_by(Wallet.updated_at))
+                rows = result.all()
+
+            added, removed = self._apply(rows)
+
+        if added or removed:
+            logger.info(f"Wallet registry refreshed: {added} added, {removed} removed, {len(self.wallets)} monitored")
+
+        return len(rows)
+
+    def notify(self):
+        """Request a refresh as soon as possible."""
+        self._wake.set()
+
+    async def handle_event(self, event: dict):
+        """Event bus handler that refreshes on wallet changes, or when changes may have been missed."""
+        if event.get("type") in ("wallet_changed", "listener_reconnected"):
+            self.notify()
+        elif event.get("type") == "wallets_imported":
+            # A long import transaction can commit rows older than the refresh lookback
+            self._reload = True
+            self.notify()
+
+    async def run(self):
+        """Refresh on every change notification, and at least once per interval."""
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=settings.wallet_refresh_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+
+            try:
+                if self._reload:
+                    self._reload = False
+                    await self.load()
+                else:
+                    await self.refresh()
+            except Exception as e:
+                logger.error(f"Error refreshing wallet registry: {e}")
+
+    def _query(self):
+        query = select(Wallet, BlockchainNetwork.is_active).join(BlockchainNetwork)
+        if self.network_id is not None:
+            query = query.where(Wallet.blockchain_network_id == self.network_id)
+        if self.address_range is not None:
+            range_clause = self.address_range.clause(Wallet.address)
+            if range_clause is not None:
+                query = query.where(range_clause)
+        return query
+
+    def _apply(self, rows: Iterable) -> Tuple[int, int]:
+        added: List[str] = []
+        removed: List[str] = []
+
+        for wallet, network_active in rows:
+            address = wallet.address.lower()
+            if wallet.is_active and network_active:
+                if address not in self.wallets:
+                    added.append(address)
+                self.wallets[address] = wallet
+            elif self.wallets.pop(address, None) is not None:
+                removed.append(address)
+
+            if self.cursor is None or wallet.updated_at > self.cursor:
+                self.cursor = wallet.updated_at
+
+        for index in self.indexes:
+            index.add(added)
+            index.discard(removed)
+        return len(added), len(removed)
+
+    def __len__(self) -> int:
+        return len(self.wallets)
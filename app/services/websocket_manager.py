@@ -1,84 +1,263 @@
 from fastapi import WebSocket
-from typing import Dict, List, Set
-import json
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+import asyncio
 import logging
 from collections import defaultdict
 
+from app.config import settings
+from app.models.user import DepositStatus
+from app.services.event_bus import deposit_update_event, confirmation_update_event, encode_event
+
 logger = logging.getLogger(__name__)
 
+# Close code sent to clients that cannot keep up with their updates
+SLOW_CONSUMER_CLOSE_CODE = 1013
+
+# Event bus events that are forwarded to WebSocket clients
+CLIENT_EVENT_TYPES = {"deposit_seen", "deposit_update", "confirmation_update"}
+
+# Confirmation updates in these statuses are delivered immediately, never coalesced
+FINAL_STATUSES = {
+    DepositStatus.COMPLETED.value,
+    DepositStatus.FAILED.value,
+    DepositStatus.ORPHANED.value,
+}
+
+
+class ClientConnection:
+    """Outbound side of one WebSocket: a bounded queue drained by its own writer task."""
+    
+    def __init__(self, websocket: WebSocket, manager: "WebSocketManager"):
+        self.websocket = websocket
+        self.manager = manager
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=settings.websocket_send_queue_size)
+        self.writer: Optional[asyncio.Task] = None
+    
+    def start(self):
+        """Start the writer task."""
+        self.writer = asyncio.create_task(self._write())
+    
+    def enqueue(self, message: str) -> bool:
+        """Queue a message without waiting. Returns False when the queue is full."""
+        try:
+            self.queue.put_nowait(message)
+            return True
+        except asyncio.QueueFull:
+            return False
+    
+    @property
+    def queue_depth(self) -> int:
+        return self.queue.qsize()
+    
+    async def _write(self):
+        try:
+            while True:
+                message = await self.queue.get()
+                await asyncio.wait_for(
+                    self.websocket.send_text(message),
+                    timeout=settings.websocket_send_timeout
+                )
+        except asyncio.CancelledError:
+            raise
+        except asyncio.TimeoutError:
+            await self.manager.evict(self.websocket, "send stalled")
+        except Exception as e:
+            logger.error(f"Error sending message to WebSocket: {e}")
+            await self.manager.disconnect(self.websocket)
+
 
 class WebSocketManager:
-    """Manages WebSocket connections for real-time updates."""
+    """Manages WebSocket connections for real-time updates.
+    
+    Broadcasts only enqueue onto each connection's bounded outbound queue;
+    a per-connection writer task does the actual sends, so a slow client
+    never delays the others. Clients that overflow their queue or stall a
+    send past the deadline are disconnected.
+    
+    Each event is encoded once and the same frame is shared by every
+    recipient. Intermediate confirmation counts for a transaction are
+    coalesced within a short tick so only the latest one is sent; final
+    statuses go out immediately and supersede any count still waiting.
+    
+    One connection can subscribe to any number of wallets. Subscriptions
+    are indexed both ways, so fan-out only touches the wallet's subscribers.
+    """
     
     def __init__(self):
         # Map wallet addresses to sets of WebSocket connections
         self.active_connections: Dict[str, Set[WebSocket]] = defaultdict(set)
-        # Map WebSocket connections to wallet addresses
-        self.connection_wallets: Dict[WebSocket, str] = {}
+        # Map WebSocket connections to their subscribed wallet addresses
+        self.connection_wallets: Dict[WebSocket, Set[str]] = {}
+        # Map WebSocket connections to their outbound queues
+        self.connections: Dict[WebSocket, ClientConnection] = {}
+        self.evicted_connections = 0
+        # Latest intermediate confirmation update per (wallet, tx_hash, log_index)
+        self.pending_confirmations: Dict[Tuple[str, str, int], dict] = {}
+        self.coalesced_updates = 0
+        self._flush_task: Optional[asyncio.Task] = None
+    
+    async def connect(self, websocket: WebSocket, wallet_address: Optional[str] = None):
+        """Register a new WebSocket connection, optionally subscribed to a wallet."""
+        connection = ClientConnection(websocket, self)
+        connection.start()
+        
+        self.connections[websocket] = connection
+        self.connection_wallets[websocket] = set()
+        
+        if wallet_address:
+            self.subscribe(websocket, [wallet_address])
+        logger.info(f"Connected WebSocket for wallet {wallet_address}" if wallet_address else "Connected WebSocket")
     
-    async def connect(self, websocket: WebSocket, wallet_address: str):
-        """Register a new WebSocket connection for a wallet."""
-        self.active_connections[wallet_address].add(websocket)
-        self.connection_wallets[websocket] = wallet_address
-        logger.info(f"Connected WebSocket for wallet {wallet_address}")
+    def subscribe(self, websocket: WebSocket, wallet_addresses: Iterable[str]) -> List[str]:
+        """Subscribe a connection to wallets. Returns the newly added addresses.
+        
+        Raises ValueError if the connection would exceed the subscription limit.
+        """
+        subscribed = self.connection_wallets.get(websocket)
+        if subscribed is None:
+            return []
+        
+        added = [address for address in dict.fromkeys(wallet_addresses) if address not in subscribed]
+        if len(subscribed) + len(added) > settings.websocket_max_subscriptions:
+            raise ValueError(
+                f"A connection can subscribe to at most {settings.websocket_max_subscriptions} wallets"
+            )
+        
+        for address in added:
+            subscribed.add(address)
+            self.active_connections[address].add(websocket)
+        
+        return added
+    
+    def unsubscribe(self, websocket: WebSocket, wallet_addresses: Iterable[str]) -> List[str]:
+        """Unsubscribe a connection from wallets. Returns the removed addresses."""
+        subscribed = self.connection_wallets.get(websocket)
+        if subscribed is None:
+            return []
+        
+        removed = []
+        for address in dict.fromkeys(wallet_addresses):
+            if address not in subscribed:
+                continue
+            
+            subscribed.discard(address)
+            self.active_connections[address].discard(websocket)
+            removed.append(address)
+            
+            # Clean up empty sets
+            if not self.active_connections[address]:
+                del self.active_connections[address]
+        
+        return removed
     
     async def disconnect(self, websocket: WebSocket, wallet_address: str = None):
-        """Unregister a WebSocket connection."""
+        """Unregister a WebSocket connection and all of its subscriptions."""
         if websocket in self.connection_wallets:
-            wallet_address = self.connection_wallets[websocket]
+            self.unsubscribe(websocket, list(self.connection_wallets[websocket]))
             del self.connection_wallets[websocket]
         
-        if wallet_address and websocket in self.active_connections[wallet_address]:
-            self.active_connections[wallet_address].discard(websocket)
-            
-            # Clean up empty sets
-            if not self.active_connections[wallet_address]:
-                del self.active_connections[wallet_address]
+        connection = self.connections.pop(websocket, None)
+        if connection and connection.writer and connection.writer is not asyncio.current_task():
+            connection.writer.cancel()
         
-        logger.info(f"Disconnected WebSocket for wallet {wallet_address}")
+        if connection:
+            logger.info("Disconnected WebSocket")
+    
+    async def evict(self, websocket: WebSocket, reason: str):
+        """Disconnect a slow consumer and close its socket."""
+        if websocket not in self.connections:
+            return
+        
+        wallet_count = len(self.connection_wallets.get(websocket, ()))
+        self.evicted_connections += 1
+        logger.warning(f"Evicting slow WebSocket client subscribed to {wallet_count} wallets: {reason}")
+        
+        await self.disconnect(websocket)
+        
+        try:
+            await asyncio.wait_for(
+                websocket.close(code=SLOW_CONSUMER_CLOSE_CODE, reason=reason),
+                timeout=settings.websocket_send_timeout
+            )
+        except Exception:
+            pass
+    
+    def send(self, websocket: WebSocket, message: str):
+        """Queue a text message for a single connection."""
+        connection = self.connections.get(websocket)
+        if connection and not connection.enqueue(message):
+            asyncio.create_task(self.evict(websocket, "send queue full"))
     
     async def send_to_wallet(self, wallet_address: str, message: dict):
-        """Send a message to all connections monitoring a specific wallet."""
+        """Queue a message for all connections monitoring a specific wallet."""
         if wallet_address not in self.active_connections:
             return
         
-        message_json = json.dumps(message)
-        disconnected_connections = set()
+        # Encode once; every recipient shares the same frame
+        message_json = encode_event(message)
+        overflowed = []
         
         for websocket in self.active_connections[wallet_address]:
-            try:
-                await websocket.send_text(message_json)
-            except Exception as e:
-                logger.error(f"Error sending message to WebSocket: {e}")
-                disconnected_connections.add(websocket)
+            connection = self.connections.get(websocket)
+            if connection and not connection.enqueue(message_json):
+                overflowed.append(websocket)
         
-        # Clean up disconnected connections
-        for websocket in disconnected_connections:
-            await self.disconnect(websocket, wallet_address)
+        # Disconnect clients that cannot keep up
+        for websocket in overflowed:
+            await self.evict(websocket, "send queue full")
     
     async def broadcast_deposit_update(self, wallet_address: str, deposit_data: dict):
         """Broadcast a deposit update to all connections monitoring the wallet."""
-        message = {
-            "type": "deposit_update",
-            "wallet_address": wallet_address,
-            "data": deposit_data
-        }
-        await self.send_to_wallet(wallet_address, message)
+        await self.send_to_wallet(wallet_address, deposit_update_event(wallet_address, deposit_data))
     
     async def broadcast_confirmation_update(self, wallet_address: str, tx_hash: str, confirmations: int, status: str):
         """Broadcast a confirmation update to all connections monitoring the wallet."""
-        message = {
-            "type": "confirmation_update",
-            "wallet_address": wallet_address,
-            "tx_hash": tx_hash,
-            "confirmations": confirmations,
-            "status": status
-        }
-        await self.send_to_wallet(wallet_address, message)
+        await self.handle_event(confirmation_update_event(wallet_address, tx_hash, confirmations, status))
+    
+    async def handle_event(self, event: dict):
+        """Deliver an event received from the event bus to the wallet's connections."""
+        if event.get("type") not in CLIENT_EVENT_TYPES:
+            return
+        
+        wallet_address = event["wallet_address"]
+        if wallet_address not in self.active_connections:
+            return
+        
+        if event.get("type") == "confirmation_update":
+            key = (wallet_address, event["tx_hash"], event.get("log_index", -1))
+            
+            if event["status"] not in FINAL_STATUSES and settings.websocket_coalesce_interval > 0:
+                if key in self.pending_confirmations:
+                    self.coalesced_updates += 1
+                self.pending_confirmations[key] = event
+                
+                if self._flush_task is None or self._flush_task.done():
+                    self._flush_task = asyncio.create_task(self._flush_confirmations())
+                return
+            
+            # A final status supersedes any count still waiting for the tick
+            self.pending_confirmations.pop(key, None)
+        
+        elif event.get("type") == "deposit_update" and event["data"].get("status") in FINAL_STATUSES:
+            data = event["data"]
+            self.pending_confirmations.pop((wallet_address, data.get("tx_hash"), data.get("log_index", -1)), None)
+        
+        await self.send_to_wallet(wallet_address, event)
+    
+    async def _flush_confirmations(self):
+        """Send the latest confirmation update of each transaction after one tick."""
+        await asyncio.sleep(settings.websocket_coalesce_interval)
+        
+        pending, self.pending_confirmations = self.pending_confirmations, {}
+        for (wallet_address, _, _), event in pending.items():
+            try:
+                await self.send_to_wallet(wallet_address, event)
+            except Exception as e:
+                logger.error(f"Error sending confirmation update to wallet {wallet_address}: {e}")
     
     def get_connection_count(self) -> int:
         """Get the total number of active connections."""
-        return len(self.connection_wallets)
+        return len(self.connections)
     
     def get_monitored_wallets(self) -> List[str]:
         """Get list of wallet addresses being monitored."""
@@ -87,3 +266,13 @@ class WebSocketManager:
     def get_wallet_connection_count(self, wallet_address: str) -> int:
         """Get the number of connections monitoring a specific wallet."""
         return len(self.active_connections.get(wallet_address, set()))
+    
+    def get_queue_depths(self) -> List[dict]:
+        """Get the outbound queue depth of every connection."""
+        return [
+            {
+                "wallet_count": len(self.connection_wallets.get(websocket, ())),
+                "queue_depth": connection.queue_depth,
+            }
+            for websocket, connection in self.connections.items()
+        ]
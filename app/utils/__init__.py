@@ -1,14 +1,17 @@
-# Utility functions for security and validation
+# Utility functions for security, validation and pagination
 from .security import (
     is_valid_ethereum_address,
     normalize_address,
     validate_transaction_hash,
     normalize_transaction_hash
 )
+from .pagination import encode_cursor, decode_cursor
 
 __all__ = [
     "is_valid_ethereum_address",
     "normalize_address", 
     "validate_transaction_hash",
-    "normalize_transaction_hash"
+    "normalize_transaction_hash",
+    "encode_cursor",
+    "decode_cursor"
 ]
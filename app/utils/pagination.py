@@ -0,0 +1,39 @@
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Optional, Tuple
+from uuid import UUID
+
+
+def encode_cursor(created_at: datetime, row_id: UUID) -> str:
+    """
+    Encode the sort key of the last row of a page as an opaque cursor.
+    
+    Args:
+        created_at: Creation time of the last row
+        row_id: ID of the last row, which breaks ties on equal timestamps
+        
+    Returns:
+        str: URL-safe cursor for the next page
+    """
+    payload = json.dumps([created_at.isoformat(), str(row_id)], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Optional[Tuple[datetime, UUID]]:
+    """
+    Decode a cursor produced by encode_cursor.
+    
+    Args:
+        cursor: The cursor to decode
+        
+    Returns:
+        Optional[Tuple[datetime, UUID]]: The (created_at, id) sort key, or None if the cursor is malformed
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, row_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.fromisoformat(created_at), UUID(row_id)
+    except (binascii.Error, UnicodeDecodeError, TypeError, ValueError):
+        return None
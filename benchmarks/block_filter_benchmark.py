@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Block Filter Benchmark
+
+Measures per-block CPU time of the block scan filter stage against the
+previous approach of awaiting one coroutine per transaction.
+
+Usage:
+    python benchmarks/block_filter_benchmark.py
+"""
+
+import asyncio
+import os
+import random
+import sys
+import time
+from pathlib import Path
+
+# Add the app directory to Python path
+sys.path.append(str(Path(__file__).parent.parent))
+
+# The benchmark never talks to a node, but importing app.services loads settings
+os.environ.setdefault("ALCHEMY_API_KEY", "benchmark")
+os.environ.setdefault("ALCHEMY_WS_URL", "wss://localhost")
+os.environ.setdefault("ALCHEMY_HTTP_URL", "https://localhost")
+
+from app.services.block_filter import BlockFilter
+from app.utils import normalize_address
+
+MONITORED_WALLETS = 10_000
+HIT_RATE = 0.005
+ROUNDS = 200
+
+
+def random_address() -> str:
+    return "0x" + "".join(random.choices("0123456789abcdefABCDEF", k=40))
+
+
+def build_block(size: int, wallets: list) -> list:
+    """Build a synthetic block with a small share of monitored recipients."""
+    transactions = []
+    for _ in range(size):
+        if random.random() < HIT_RATE:
+            to_address = random.choice(wallets)
+        elif random.random() < 0.01:
+            to_address = None  # Contract creation
+        else:
+            to_address = random_address()
+        transactions.append({"hash": "0x" + "00" * 32, "to": to_address, "value": "0x1"})
+    return transactions
+
+
+async def per_transaction_scan(transactions: list, monitored: dict) -> list:
+    """Previous approach: one awaited coroutine per transaction."""
+    matches = []
+
+    async def process(tx):
+        to_address = tx.get("to")
+        if not to_address:
+            return
+        normalized_to = normalize_address(to_address)
+        if normalized_to not in monitored:
+            return
+        matches.append(tx)
+
+    for tx in transactions:
+        await process(tx)
+    return matches
+
+
+def measure(label: str, fn, rounds: int = ROUNDS) -> float:
+    start = time.process_time()
+    for _ in range(rounds):
+        fn()
+    per_block = (time.process_time() - start) / rounds
+    print(f"  {label:<24} {per_block * 1e6:10.1f} us/block")
+    return per_block
+
+
+def main():
+    random.seed(42)
+    wallets = [random_address().lower() for _ in range(MONITORED_WALLETS)]
+    monitored = {address: True for address in wallets}
+    block_filter = BlockFilter(wallets)
+    loop = asyncio.new_event_loop()
+
+    print(f"Monitored wallets: {MONITORED_WALLETS}, hit rate: {HIT_RATE:.1%}")
+    for size in (300, 3000):
+        transactions = build_block(size, wallets)
+        print(f"\nBlock with {size} transactions:")
+        before = measure(
+            "per-transaction coroutine",
+            lambda: loop.run_until_complete(per_transaction_scan(transactions, monitored)),
+        )
+        after = measure("filter stage", lambda: block_filter.match(transactions))
+        print(f"  speedup: {before / after:.1f}x")
+
+    loop.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+logsBloom Pre-check Benchmark
+
+Measures the per-block CPU time of the token Transfer logsBloom pre-check
+for blocks of increasing log counts, and the share of blocks it lets skip
+their eth_getLogs request. Recipient masks are bucketed by lowest bit; the
+naive check that tests every monitored recipient is shown for comparison.
+
+Blooms saturate as log counts grow, so on busy chains most blocks pass the
+check; it pays off on quiet chains and for rarely used tokens.
+
+Usage:
+    python benchmarks/logs_bloom_benchmark.py
+"""
+
+import os
+import random
+import sys
+import time
+from pathlib import Path
+
+# Add the app directory to Python path
+sys.path.append(str(Path(__file__).parent.parent))
+
+# The benchmark never talks to a node, but importing app.services loads settings
+os.environ.setdefault("ALCHEMY_API_KEY", "benchmark")
+os.environ.setdefault("ALCHEMY_WS_URL", "wss://localhost")
+os.environ.setdefault("ALCHEMY_HTTP_URL", "https://localhost")
+
+from app.services.token_transfers import TRANSFER_TOPIC, TransferBloomFilter, address_topic, bloom_mask
+
+MONITORED_WALLETS = (1_000, 50_000)
+WATCHED_TOKENS = 2
+LOGS_PER_BLOCK = (5, 20, 50, 200)
+BLOCKS = 200
+
+
+def random_address() -> str:
+    return "0x" + "".join(random.choices("0123456789abcdef", k=40))
+
+
+def build_bloom(log_count: int) -> str:
+    """Build the logsBloom of a block of unrelated logs with three topics each."""
+    bloom = 0
+    for _ in range(log_count):
+        bloom |= bloom_mask(bytes.fromhex(random_address()[2:]))
+        for _ in range(3):
+            bloom |= bloom_mask(random.randbytes(32))
+    return "0x" + format(bloom, "0512x")
+
+
+def naive_may_contain(bloom_filter: TransferBloomFilter, logs_bloom: str) -> bool:
+    """Test every recipient mask in turn."""
+    bloom = int(logs_bloom, 16)
+    if bloom & bloom_filter.transfer_mask != bloom_filter.transfer_mask:
+        return False
+    if not any(bloom & mask == mask for mask in bloom_filter.token_masks):
+        return False
+    return any(bloom & mask == mask for mask in bloom_filter._recipient_masks.values())
+
+
+def measure(check, blooms: list) -> tuple:
+    start = time.perf_counter()
+    passed = sum(1 for logs_bloom in blooms if check(logs_bloom))
+    return (time.perf_counter() - start) / len(blooms), passed
+
+
+def main():
+    random.seed(42)
+    transfer_mask = bloom_mask(bytes.fromhex(TRANSFER_TOPIC[2:]))
+    tokens = [random_address() for _ in range(WATCHED_TOKENS)]
+
+    for wallet_count in MONITORED_WALLETS:
+        bloom_filter = TransferBloomFilter()
+        bloom_filter.update_tokens(tokens)
+        bloom_filter.update(random_address() for _ in range(wallet_count))
+        print(f"Monitored wallets: {wallet_count}, watched tokens: {WATCHED_TOKENS}")
+
+        for log_count in LOGS_PER_BLOCK:
+            # Popular tokens are transferred in nearly every block, just not to our wallets
+            blooms = []
+            for _ in range(BLOCKS):
+                bloom = int(build_bloom(log_count), 16) | transfer_mask
+                bloom |= bloom_mask(bytes.fromhex(random.choice(tokens)[2:]))
+                blooms.append("0x" + format(bloom, "0512x"))
+
+            bucketed, passed = measure(bloom_filter.may_contain, blooms)
+            naive, _ = measure(lambda logs_bloom: naive_may_contain(bloom_filter, logs_bloom), blooms)
+            print(
+                f"  {log_count:4d} logs/block: {bucketed * 1e6:8.1f} us/block "
+                f"(naive {naive * 1e6:8.1f} us), {1 - passed / BLOCKS:5.1%} of blocks skip eth_getLogs"
+            )
+
+        # A block with a monitored recipient must always pass
+        recipient = next(iter(bloom_filter._recipient_masks))
+        hit = int(build_bloom(20), 16) | transfer_mask | bloom_mask(bytes.fromhex(tokens[0][2:]))
+        hit |= bloom_mask(bytes.fromhex(address_topic(recipient)[2:]))
+        assert bloom_filter.may_contain("0x" + format(hit, "0512x"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Mempool Pre-detection Benchmark
+
+Runs a local stand-in for a node's WebSocket endpoint that streams
+newPendingTransactions notifications, points a MempoolWatcher at it and
+measures the time from a pending transaction leaving the node to its
+"seen in mempool" event being handed to the publisher. Also checks that
+mined transactions are promoted from the pending index.
+
+Usage:
+    python benchmarks/mempool_latency_benchmark.py
+"""
+
+import asyncio
+import os
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+import orjson
+import websockets
+
+# Add the app directory to Python path
+sys.path.append(str(Path(__file__).parent.parent))
+
+# The benchmark never talks to a node, but importing app.services loads settings
+os.environ.setdefault("ALCHEMY_API_KEY", "benchmark")
+os.environ.setdefault("ALCHEMY_WS_URL", "wss://localhost")
+os.environ.setdefault("ALCHEMY_HTTP_URL", "https://localhost")
+
+from app.services.mempool import TRANSFER_SELECTOR, MempoolWatcher
+from app.services.token_transfers import TokenTransferScanner
+from app.services.wallet_registry import WalletRegistry
+
+MONITORED_WALLETS = 10_000
+PENDING_TRANSACTIONS = 20_000
+HIT_RATE = 0.05
+SEND_RATE = 2_000  # Pending transactions per second, above mainnet's usual rate
+PORT = 8765
+
+
+def random_address() -> str:
+    return "0x" + "".join(random.choices("0123456789abcdef", k=40))
+
+
+def build_pending(index: int, wallets: list, token: str) -> dict:
+    """Build a pending transaction; some pay monitored wallets in ETH or tokens."""
+    tx = {
+        "hash": "0x" + format(index, "064x"),
+        "from": random_address(),
+        "to": random_address(),
+        "value": hex(random.randint(1, 10**18)),
+        "input": "0x",
+    }
+    if random.random() < HIT_RATE:
+        if random.random() < 0.5:
+            tx["to"] = random.choice(wallets)
+        else:
+            recipient = random.choice(wallets)
+            tx["to"] = token
+            tx["value"] = "0x0"
+            tx["input"] = TRANSFER_SELECTOR + "0" * 24 + recipient[2:] + format(10**6, "064x")
+    return tx
+
+
+async def main():
+    random.seed(42)
+    addresses = [random_address() for _ in range(MONITORED_WALLETS)]
+    token = random_address()
+    pending = [build_pending(index, addresses, token) for index in range(PENDING_TRANSACTIONS)]
+    sent_at = {}
+    done = asyncio.Event()
+
+    async def stand_in_node(connection):
+        """Answer eth_subscribe, then stream every pending transaction."""
+        await connection.recv()
+        await connection.send(orjson.dumps({"jsonrpc": "2.0", "id": 1, "result": "0x1"}).decode())
+        started = time.perf_counter()
+        try:
+            for index, tx in enumerate(pending):
+                delay = started + index / SEND_RATE - time.perf_counter()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                sent_at[tx["hash"]] = time.perf_counter()
+                await connection.send(orjson.dumps({
+                    "jsonrpc": "2.0",
+                    "method": "eth_subscription",
+                    "params": {"subscription": "0x1", "result": tx},
+                }).decode())
+            await done.wait()
+        except websockets.exceptions.ConnectionClosed:
+            pass
+
+    registry = WalletRegistry()
+    registry.wallets = {
+        address: SimpleNamespace(id=index, address=address, blockchain_network_id=None)
+        for index, address in enumerate(addresses)
+    }
+    scanner = TokenTransferScanner()
+    scanner.set_tokens([SimpleNamespace(address=token, symbol="USDT", decimals=6)])
+
+    latencies = []
+    expected = sum(1 for tx in pending if tx["to"] in registry.wallets or tx["to"] == token)
+
+    async def publish(tx_hash, transfer):
+        latencies.append(time.perf_counter() - sent_at[tx_hash])
+        if len(latencies) == expected:
+            done.set()
+
+    watcher = MempoolWatcher(f"ws://127.0.0.1:{PORT}", registry, scanner, publish)
+
+    async with websockets.serve(stand_in_node, "127.0.0.1", PORT, max_size=None):
+        task = asyncio.create_task(watcher.run())
+        await asyncio.wait_for(done.wait(), timeout=120)
+        task.cancel()
+
+    latencies.sort()
+    print(f"Monitored wallets: {MONITORED_WALLETS}, pending transactions: {PENDING_TRANSACTIONS}")
+    print(f"  seen events: {len(latencies)} (expected {expected}), pending index: {len(watcher.index)}")
+    print(
+        f"  seen latency: p50 {statistics.median(latencies) * 1e3:.2f} ms, "
+        f"p99 {latencies[int(len(latencies) * 0.99)] * 1e3:.2f} ms"
+    )
+
+    # Mining every matched transaction promotes it out of the index
+    for tx_hash in list(sent_at):
+        watcher.index.pop(tx_hash)
+    print(f"  promoted on mining: {watcher.index.promoted}, left pending: {len(watcher.index)}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+RPC Cache Benchmark
+
+Counts the provider requests made when several monitor tasks of one
+network fetch the same blocks and receipts (four shards following the
+chain, each re-walking recent headers and rescanning after a reorg), with
+and without the shared RPC cache. The provider is a stand-in that answers
+from memory after a simulated round-trip.
+
+Usage:
+    python benchmarks/rpc_cache_benchmark.py
+"""
+
+import asyncio
+import os
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+
+# Add the app directory to Python path
+sys.path.append(str(Path(__file__).parent.parent))
+
+# The benchmark never talks to a node, but importing app.services loads settings
+os.environ.setdefault("ALCHEMY_API_KEY", "benchmark")
+os.environ.setdefault("ALCHEMY_WS_URL", "wss://localhost")
+os.environ.setdefault("ALCHEMY_HTTP_URL", "https://localhost")
+
+from app.services.rpc_cache import CachedRPCClient, RPCCache
+from app.services.rpc_client import AsyncRPCClient
+
+BLOCKS = 200
+SHARDS = 4
+REORG_DEPTH = 3
+ROUND_TRIP = 0.002
+
+
+def block_hash(number: int) -> str:
+    return "0x" + format(number, "064x")
+
+
+class StandInProvider:
+    """Answers block and receipt calls from memory and counts them."""
+
+    def __init__(self):
+        self.requests = Counter()
+
+    async def call(self, method: str, params: list = None):
+        self.requests[method] += 1
+        await asyncio.sleep(ROUND_TRIP)
+
+        if method in ("eth_getBlockByNumber", "eth_getBlockByHash"):
+            # Stand-in block hashes encode the block number
+            number = int(params[0], 16)
+            transactions = [{"hash": "0x" + format(number * 100 + i, "064x")} for i in range(100)]
+            return {
+                "number": hex(number),
+                "hash": block_hash(number),
+                "parentHash": block_hash(number - 1),
+                "transactions": transactions if params[1] else [tx["hash"] for tx in transactions],
+            }
+        if method == "eth_getBlockReceipts":
+            number = int(params[0], 16)
+            return [{"transactionHash": "0x" + format(number * 100 + i, "064x"), "status": "0x1"} for i in range(100)]
+        return None
+
+
+async def follow_chain(client: AsyncRPCClient):
+    """One shard's view: fetch each head, its parent header and receipts, then rescan after a reorg."""
+    for number in range(1, BLOCKS + 1):
+        block = await client.get_block(number, full_transactions=True)
+        await client.get_block_by_hash(block["parentHash"])
+        await client.get_receipts(block["hash"], [block["transactions"][0]["hash"]])
+
+    for number in range(BLOCKS - REORG_DEPTH + 1, BLOCKS + 1):
+        await client.get_block_by_hash(block_hash(number), full_transactions=True)
+
+
+async def run(cached: bool) -> tuple:
+    provider = StandInProvider()
+    cache = RPCCache(512)
+    clients = []
+    for _ in range(SHARDS):
+        client = CachedRPCClient(["http://stand-in"], cache) if cached else AsyncRPCClient("http://stand-in")
+        client.call = provider.call
+        clients.append(client)
+
+    started = time.perf_counter()
+    await asyncio.gather(*[follow_chain(client) for client in clients])
+    elapsed = time.perf_counter() - started
+
+    for client in clients:
+        await client.close()
+    return provider.requests, elapsed, cache.stats() if cached else None
+
+
+async def main():
+    print(f"Blocks: {BLOCKS}, shards: {SHARDS}, reorg depth: {REORG_DEPTH}")
+    for cached in (False, True):
+        requests, elapsed, stats = await run(cached)
+        label = "shared cache" if cached else "no cache    "
+        print(f"  {label}: {sum(requests.values()):5d} provider requests in {elapsed:.2f}s {dict(requests)}")
+        if stats:
+            print(f"                cache {stats}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+RPC Provider Pool Benchmark
+
+Starts local fake JSON-RPC servers that inject latency tails, errors and
+a brown-out, then compares request latency and error rate of a single
+provider against the provider pool (failover, latency-weighted routing
+and hedged requests).
+
+Usage:
+    python benchmarks/rpc_pool_benchmark.py
+"""
+
+import asyncio
+import logging
+import os
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import uvicorn
+from starlette.applications import Starlette
+from starlette.requests import ClientDisconnect, Request
+from starlette.responses import JSONResponse, Response
+from starlette.routing import Route
+
+# Add the app directory to Python path
+sys.path.append(str(Path(__file__).parent.parent))
+
+# The benchmark never talks to a node, but importing app.services loads settings
+os.environ.setdefault("ALCHEMY_API_KEY", "benchmark")
+os.environ.setdefault("ALCHEMY_WS_URL", "wss://localhost")
+os.environ.setdefault("ALCHEMY_HTTP_URL", "https://localhost")
+
+from app.services.rpc_client import AsyncRPCClient
+from app.services.rpc_pool import ProviderPool
+
+REQUESTS = 1000
+CONCURRENCY = 10
+
+# name: (port, base latency, tail probability, tail latency, error probability)
+FAKE_PROVIDERS = {
+    "fast": (18545, 0.010, 0.05, 0.300, 0.00),
+    "steady": (18546, 0.030, 0.00, 0.000, 0.00),
+    "flaky": (18547, 0.015, 0.02, 0.300, 0.20),
+}
+
+
+def fake_rpc_app(base: float, tail_probability: float, tail: float, error_probability: float, state: dict):
+    """JSON-RPC endpoint answering eth_blockNumber with injected latency and errors."""
+
+    async def rpc(request: Request):
+        try:
+            payload = await request.json()
+        except ClientDisconnect:
+            # The pool cancelled a hedge that lost the race; nobody reads the answer
+            return Response(status_code=499)
+        await asyncio.sleep(tail if random.random() < tail_probability else base)
+        if state["brownout"] or random.random() < error_probability:
+            return Response(status_code=503)
+        return JSONResponse({"jsonrpc": "2.0", "id": payload["id"], "result": "0x10"})
+
+    return Starlette(routes=[Route("/", rpc, methods=["POST"])])
+
+
+async def measure(client: AsyncRPCClient, requests: int) -> tuple:
+    latencies = []
+    errors = 0
+    semaphore = asyncio.Semaphore(CONCURRENCY)
+
+    async def one():
+        nonlocal errors
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                await client.block_number()
+                latencies.append(time.perf_counter() - started)
+            except Exception:
+                errors += 1
+
+    await asyncio.gather(*[one() for _ in range(requests)])
+    latencies.sort()
+    return latencies, errors
+
+
+def report(label: str, latencies: list, errors: int, requests: int):
+    if not latencies:
+        print(f"  {label}: all {requests} requests failed")
+        return
+    p99 = latencies[min(int(len(latencies) * 0.99), len(latencies) - 1)]
+    print(
+        f"  {label}: p50 {statistics.median(latencies) * 1e3:6.1f} ms, "
+        f"p99 {p99 * 1e3:6.1f} ms, errors {errors / requests:5.1%}"
+    )
+
+
+async def main():
+    random.seed(42)
+    # Every failover is logged as a warning; keep the report readable
+    logging.getLogger("app.services.rpc_pool").setLevel(logging.ERROR)
+    state = {"brownout": False}
+    servers = []
+    for port, base, tail_probability, tail, error_probability in FAKE_PROVIDERS.values():
+        app = fake_rpc_app(base, tail_probability, tail, error_probability, state if port == 18545 else {"brownout": False})
+        server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="error"))
+        servers.append(server)
+        asyncio.create_task(server.serve())
+    while not all(server.started for server in servers):
+        await asyncio.sleep(0.05)
+
+    urls = [f"http://127.0.0.1:{port}/" for port, *_ in FAKE_PROVIDERS.values()]
+    print(f"Requests: {REQUESTS}, concurrency: {CONCURRENCY}, providers: {', '.join(FAKE_PROVIDERS)}")
+
+    single = AsyncRPCClient(urls[0])
+    pool = ProviderPool(urls)
+
+    report("single provider (fast)", *await measure(single, REQUESTS), REQUESTS)
+    report("provider pool         ", *await measure(pool, REQUESTS), REQUESTS)
+
+    # The fast provider browns out completely
+    state["brownout"] = True
+    print("After a brown-out of the fast provider:")
+    report("single provider (fast)", *await measure(single, REQUESTS // 4), REQUESTS // 4)
+    report("provider pool         ", *await measure(pool, REQUESTS), REQUESTS)
+
+    for stats in pool.stats():
+        print(f"    {stats}")
+
+    await single.close()
+    await pool.close()
+    for server in servers:
+        server.should_exit = True
+    await asyncio.sleep(0.2)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
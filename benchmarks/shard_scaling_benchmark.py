@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Shard Scaling Benchmark
+
+Measures the per-block CPU time one monitor worker spends on a synthetic
+deposit-heavy load when the wallet address space is split into N shards,
+and the resulting throughput speedup over a single unsharded worker.
+
+Every work unit still decodes and filters the full block; only the
+per-deposit work (row building, event encoding) is divided between shards,
+so the speedup approaches linear as the share of deposits in each block
+grows. Workers run on separate cores or machines, so the slowest worker's
+time is what bounds total throughput.
+
+Usage:
+    python benchmarks/shard_scaling_benchmark.py
+"""
+
+import os
+import random
+import sys
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+import orjson
+
+# Add the app directory to Python path
+sys.path.append(str(Path(__file__).parent.parent))
+
+# The benchmark never talks to a node, but importing app.services loads settings
+os.environ.setdefault("ALCHEMY_API_KEY", "benchmark")
+os.environ.setdefault("ALCHEMY_WS_URL", "wss://localhost")
+os.environ.setdefault("ALCHEMY_HTTP_URL", "https://localhost")
+
+from app.services.block_filter import BlockFilter
+from app.services.event_bus import deposit_update_event, encode_event
+from app.services.network_monitor import NetworkMonitor
+from app.services.shard_coordinator import WorkUnit
+
+MONITORED_WALLETS = 50_000
+BLOCK_SIZE = 1000
+HIT_RATE = 0.5
+BLOCKS = 50
+SHARD_COUNTS = (1, 2, 4, 8)
+
+
+def random_address() -> str:
+    return "0x" + "".join(random.choices("0123456789abcdef", k=40))
+
+
+def build_block(number: int, wallets: list) -> bytes:
+    """Build a synthetic full block as the raw JSON a node would return."""
+    transactions = []
+    for index in range(BLOCK_SIZE):
+        to_address = random.choice(wallets) if random.random() < HIT_RATE else random_address()
+        transactions.append({
+            "hash": "0x" + format(number * BLOCK_SIZE + index, "064x"),
+            "from": random_address(),
+            "to": to_address,
+            "value": hex(random.randint(1, 10**18)),
+        })
+    return orjson.dumps({"number": hex(number), "hash": "0x" + format(number, "064x"), "transactions": transactions})
+
+
+def process_block(raw_block: bytes, block_filter: BlockFilter, wallets: dict) -> int:
+    """The CPU-bound part of scanning one block for one work unit."""
+    block = orjson.loads(raw_block)
+    matches = block_filter.match(block["transactions"])
+
+    for tx in matches:
+        wallet = wallets[tx["to"]]
+        row = NetworkMonitor._build_deposit_row(None, tx, wallet, None, 1, block["hash"])
+        encode_event(deposit_update_event(tx["to"], {
+            "tx_hash": row["tx_hash"],
+            "amount": str(row["amount"]),
+            "status": row["status"].value,
+        }))
+
+    return len(matches)
+
+
+def main():
+    random.seed(42)
+    addresses = [random_address() for _ in range(MONITORED_WALLETS)]
+    wallets = {
+        address: SimpleNamespace(id=index, blockchain_network_id=None)
+        for index, address in enumerate(addresses)
+    }
+    blocks = [build_block(number, addresses) for number in range(BLOCKS)]
+
+    print(f"Monitored wallets: {MONITORED_WALLETS}, block size: {BLOCK_SIZE}, hit rate: {HIT_RATE:.0%}")
+    baseline = None
+
+    for shard_count in SHARD_COUNTS:
+        worker_times = []
+        for shard_index in range(shard_count):
+            address_range = WorkUnit(None, shard_index, shard_count).address_range
+            shard_wallets = {address: wallet for address, wallet in wallets.items() if address_range.contains(address)}
+            block_filter = BlockFilter(shard_wallets)
+
+            start = time.process_time()
+            for raw_block in blocks:
+                process_block(raw_block, block_filter, shard_wallets)
+            worker_times.append((time.process_time() - start) / BLOCKS)
+
+        # The slowest worker bounds throughput
+        per_block = max(worker_times)
+        baseline = baseline or per_block
+        speedup = baseline / per_block
+        print(
+            f"  {shard_count} workers: {per_block * 1e3:7.2f} ms/block per worker, "
+            f"speedup {speedup:4.2f}x ({speedup / shard_count:.0%} of linear)"
+        )
+
+
+if __name__ == "__main__":
+    main()
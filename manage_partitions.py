@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Deposit Partition Maintenance Script
+
+This script pre-creates the upcoming monthly partitions of the deposits
+table and detaches the ones older than the retention period, moving them
+to the archive schema or dropping them. Schedule it daily (e.g. with cron);
+the blockchain monitor also pre-creates partitions on its own.
+"""
+
+import argparse
+import asyncio
+import logging
+import sys
+from pathlib import Path
+
+# Add the app directory to Python path
+sys.path.append(str(Path(__file__).parent))
+
+from app.database import AsyncSessionLocal
+from app.services.partition_manager import PartitionManager, partition_name
+from app.config import settings
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    handlers=[logging.StreamHandler(sys.stdout)]
+)
+
+
+async def manage_partitions(args):
+    """Create upcoming partitions, then retire old ones."""
+    async with AsyncSessionLocal() as db:
+        manager = PartitionManager(db)
+        created = await manager.ensure_partitions(args.ahead)
+        retired = await manager.retire_partitions(args.retain_months, drop=args.drop)
+        partitions = await manager.list_partitions()
+
+    print(f"Created partitions: {', '.join(created) or 'none'}")
+    print(f"Retired partitions: {', '.join(retired) or 'none'}")
+    print(f"Attached partitions: {', '.join(partition_name(month) for month in partitions)}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Maintain the monthly partitions of the deposits table")
+    parser.add_argument(
+        "--ahead", type=int, default=settings.partition_premake_months,
+        help="months of partitions to create ahead of the current one"
+    )
+    parser.add_argument(
+        "--retain-months", type=int, default=settings.partition_retain_months,
+        help="months of partitions to keep attached; 0 keeps every partition"
+    )
+    parser.add_argument(
+        "--drop", action="store_true",
+        help=f"drop retired partitions instead of moving them to the {settings.partition_archive_schema} schema"
+    )
+    asyncio.run(manage_partitions(parser.parse_args()))
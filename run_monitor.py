@@ -3,7 +3,7 @@
 Blockchain Monitor Service Runner
 
 This script runs the blockchain monitoring service as a standalone process.
-It monitors Ethereum Sepolia testnet for deposits to registered wallets.
+It monitors every active blockchain network for deposits to registered wallets.
 """
 
 import asyncio
@@ -33,8 +33,7 @@ logger = logging.getLogger(__name__)
 async def main():
     """Main function to run the blockchain monitor."""
     logger.info("Starting Crypto Deposit Monitor Service")
-    logger.info(f"Monitoring chain ID: {settings.chain_id}")
-    logger.info(f"Required confirmations: {settings.confirmations_required}")
+    logger.info(f"Network refresh interval: {settings.network_refresh_interval}s")
     
     monitor = BlockchainMonitor()
     
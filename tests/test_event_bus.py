@@ -0,0 +1,123 @@
+import asyncio
+import uuid
+
+import asyncpg
+import orjson
+
+from app.services.event_bus import (
+    MAX_NOTIFY_PAYLOAD,
+    PostgresEventBus,
+    confirmation_update_event,
+    deposit_update_event,
+)
+
+WALLET = "0x" + "a" * 40
+
+
+def channel_name() -> str:
+    return f"test_events_{uuid.uuid4().hex[:12]}"
+
+
+async def wait_for(condition, timeout: float = 5.0):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not condition():
+        assert asyncio.get_running_loop().time() < deadline, "timed out waiting for events"
+        await asyncio.sleep(0.01)
+
+
+async def listening_bus(dsn: str, channel: str):
+    bus = PostgresEventBus(dsn, channel)
+    received = []
+
+    async def handler(event):
+        received.append(event)
+
+    bus.subscribe(handler)
+    await bus.start()
+    return bus, received
+
+
+async def raw_payloads(dsn: str, channel: str):
+    """A bare LISTEN connection recording every NOTIFY payload on the channel."""
+    connection = await asyncpg.connect(dsn)
+    payloads = []
+    await connection.add_listener(channel, lambda connection, pid, channel, payload: payloads.append(payload))
+    return connection, payloads
+
+
+def test_batch_is_sent_as_one_notify(database_url):
+    async def scenario():
+        channel = channel_name()
+        listener, received = await listening_bus(database_url, channel)
+        watcher, payloads = await raw_payloads(database_url, channel)
+        publisher = PostgresEventBus(database_url, channel)
+        try:
+            events = [
+                confirmation_update_event(WALLET, "0x" + f"{i:064x}", i, "confirming")
+                for i in range(20)
+            ]
+            await publisher.publish(events)
+
+            await wait_for(lambda: len(received) == 20 and payloads)
+            await asyncio.sleep(0.1)
+            assert received == events
+            assert len(payloads) == 1
+        finally:
+            await publisher.stop()
+            await listener.stop()
+            await watcher.close()
+
+    asyncio.run(scenario())
+
+
+def test_large_batch_is_split_and_reassembled_in_order(database_url):
+    async def scenario():
+        channel = channel_name()
+        listener, received = await listening_bus(database_url, channel)
+        watcher, payloads = await raw_payloads(database_url, channel)
+        publisher = PostgresEventBus(database_url, channel)
+        try:
+            events = [
+                deposit_update_event(WALLET, {"sequence": i, "memo": "x" * 1000})
+                for i in range(30)
+            ]
+            # Too large for any NOTIFY; dropped without holding back the rest
+            oversized = deposit_update_event(WALLET, {"memo": "x" * MAX_NOTIFY_PAYLOAD})
+            await publisher.publish(events[:15] + [oversized] + events[15:])
+
+            await wait_for(lambda: len(received) == 30)
+            await wait_for(lambda: sum(len(orjson.loads(payload)) for payload in payloads) == 30)
+            assert [event["data"]["sequence"] for event in received] == list(range(30))
+            assert len(payloads) > 1
+            assert all(len(payload.encode()) <= MAX_NOTIFY_PAYLOAD for payload in payloads)
+        finally:
+            await publisher.stop()
+            await listener.stop()
+            await watcher.close()
+
+    asyncio.run(scenario())
+
+
+def test_listener_reconnect_is_reported_and_delivery_resumes(database_url):
+    async def scenario():
+        channel = channel_name()
+        listener, received = await listening_bus(database_url, channel)
+        publisher = PostgresEventBus(database_url, channel)
+        admin = await asyncpg.connect(database_url)
+        try:
+            pid = listener._listen_connection.get_server_pid()
+            await admin.execute("SELECT pg_terminate_backend($1)", pid)
+
+            await wait_for(lambda: {"type": "listener_reconnected"} in received)
+            assert listener._listen_connection.get_server_pid() != pid
+
+            event = deposit_update_event(WALLET, {"tx_hash": "0x" + "1" * 64})
+            await publisher.publish([event])
+            await wait_for(lambda: event in received)
+            assert received == [{"type": "listener_reconnected"}, event]
+        finally:
+            await publisher.stop()
+            await listener.stop()
+            await admin.close()
+
+    asyncio.run(scenario())
@@ -0,0 +1,281 @@
+import asyncio
+import uuid
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+from decimal import Decimal
+from types import SimpleNamespace
+
+import orjson
+import websockets
+
+from app.config import settings
+from app.services.header_chain import ChainHeader
+from app.services.mempool import TRANSFER_SELECTOR, MempoolWatcher, PendingIndex, PendingTransfer
+from app.services.network_monitor import NetworkMonitor
+from app.services.token_transfers import TokenTransferScanner
+from app.services.wallet_registry import WalletRegistry
+
+NETWORK_ID = uuid.uuid4()
+WALLET = "0x" + "a" * 40
+OTHER = "0x" + "b" * 40
+SENDER = "0x" + "c" * 40
+TOKEN = "0x" + "d" * 40
+
+
+def tx_hash(index: int) -> str:
+    return "0x" + format(index, "064x")
+
+
+def native_transfer(index: int, to: str, value: int = 10**18) -> dict:
+    return {"hash": tx_hash(index), "from": SENDER, "to": to, "value": hex(value), "input": "0x"}
+
+
+def token_transfer(index: int, recipient: str, amount: int) -> dict:
+    return {
+        "hash": tx_hash(index),
+        "from": SENDER,
+        "to": TOKEN,
+        "value": "0x0",
+        "input": TRANSFER_SELECTOR + "0" * 24 + recipient[2:] + format(amount, "064x"),
+    }
+
+
+def watched_registry() -> WalletRegistry:
+    registry = WalletRegistry(NETWORK_ID)
+    wallet = SimpleNamespace(
+        id=uuid.uuid4(),
+        address=WALLET,
+        blockchain_network_id=NETWORK_ID,
+        is_active=True,
+        updated_at=datetime.now(timezone.utc),
+    )
+    registry._apply([(wallet, True)])
+    return registry
+
+
+def token_scanner() -> TokenTransferScanner:
+    scanner = TokenTransferScanner()
+    scanner.set_tokens([SimpleNamespace(address=TOKEN, symbol="USDT", decimals=6)])
+    return scanner
+
+
+@asynccontextmanager
+async def stand_in_node(results: list):
+    """A node WebSocket endpoint that answers eth_subscribe, then streams ``results`` as notifications.
+
+    An ``asyncio.Event`` among the results pauses the stream until it is set.
+    """
+
+    async def handler(connection):
+        await connection.recv()
+        await connection.send(orjson.dumps({"jsonrpc": "2.0", "id": 1, "result": "0x1"}).decode())
+        for result in results:
+            if isinstance(result, asyncio.Event):
+                await result.wait()
+                continue
+            await connection.send(orjson.dumps({
+                "jsonrpc": "2.0",
+                "method": "eth_subscription",
+                "params": {"subscription": "0x1", "result": result},
+            }).decode())
+        await connection.wait_closed()
+
+    async with websockets.serve(handler, "127.0.0.1", 0) as server:
+        port = server.sockets[0].getsockname()[1]
+        yield f"ws://127.0.0.1:{port}"
+
+
+async def watch(watcher: MempoolWatcher, rpc=None, until=lambda: False, timeout: float = 5.0):
+    """Run the watcher until ``until`` holds, then stop it."""
+    task = asyncio.create_task(watcher.run(rpc))
+    try:
+        deadline = asyncio.get_running_loop().time() + timeout
+        while not until():
+            assert asyncio.get_running_loop().time() < deadline, "timed out waiting for the watcher"
+            assert not task.done(), task
+            await asyncio.sleep(0.01)
+    finally:
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+
+def test_pending_transfers_to_watched_wallets_are_published():
+    async def scenario():
+        published = {}
+
+        async def publish(tx_hash, transfer):
+            published[tx_hash] = transfer
+
+        stream = [
+            native_transfer(1, WALLET, 2 * 10**18),
+            native_transfer(2, OTHER),
+            native_transfer(3, WALLET, 0),
+            token_transfer(4, WALLET.upper().replace("0X", "0x"), 5 * 10**6),
+            token_transfer(5, OTHER, 10**6),
+            {**native_transfer(6, WALLET), "to": None},
+            native_transfer(1, WALLET, 2 * 10**18),
+            native_transfer(7, WALLET.upper().replace("0X", "0x")),
+        ]
+        async with stand_in_node(stream) as url:
+            watcher = MempoolWatcher(url, watched_registry(), token_scanner(), publish)
+            await watch(watcher, until=lambda: len(published) == 3)
+            await asyncio.sleep(0.05)
+
+        assert set(published) == {tx_hash(1), tx_hash(4), tx_hash(7)}
+        assert published[tx_hash(1)].amount == Decimal(2)
+        assert published[tx_hash(1)].token_address is None
+        assert published[tx_hash(1)].from_address == SENDER
+        assert published[tx_hash(4)].amount == Decimal(5)
+        assert published[tx_hash(4)].token_address == TOKEN
+        assert published[tx_hash(4)].wallet.address == WALLET
+        assert len(watcher.index) == 3
+
+    asyncio.run(scenario())
+
+
+class SlowLookupRPC:
+    """Resolves eth_getTransactionByHash batches, holding the first one until released."""
+
+    def __init__(self, transactions: dict):
+        self.transactions = transactions
+        self.batches = []
+        self.started = asyncio.Event()
+        self.release = asyncio.Event()
+
+    async def batch(self, calls):
+        self.batches.append([params[0] for _, params in calls])
+        if len(self.batches) == 1:
+            self.started.set()
+            await self.release.wait()
+        return [self.transactions.get(params[0]) for _, params in calls]
+
+
+def test_hash_only_lookups_are_batched_off_the_receive_loop(monkeypatch):
+    monkeypatch.setattr(settings, "mempool_lookup_batch", 50)
+
+    async def scenario():
+        published = []
+
+        async def publish(tx_hash, transfer):
+            published.append(tx_hash)
+
+        transactions = {tx_hash(index): native_transfer(index, WALLET if index % 2 else OTHER) for index in range(1, 21)}
+        rpc = SlowLookupRPC(transactions)
+        hashes = list(transactions)
+        async with stand_in_node([hashes[0], rpc.started, *hashes[1:]]) as url:
+            watcher = MempoolWatcher(url, watched_registry(), token_scanner(), publish)
+            task = asyncio.create_task(watcher.run(rpc))
+            try:
+                # The first lookup is stuck, yet the stream keeps being read and queued
+                await asyncio.sleep(0.2)
+                assert rpc.batches == [[tx_hash(1)]]
+                assert published == []
+
+                rpc.release.set()
+                await asyncio.sleep(0.2)
+            finally:
+                task.cancel()
+                await asyncio.gather(task, return_exceptions=True)
+
+        assert rpc.batches == [[tx_hash(1)], [tx_hash(index) for index in range(2, 21)]]
+        assert published == [tx_hash(index) for index in range(1, 21, 2)]
+
+    asyncio.run(scenario())
+
+
+def test_hash_lookups_beyond_the_queue_are_dropped(monkeypatch):
+    monkeypatch.setattr(settings, "mempool_lookup_queue", 5)
+
+    async def scenario():
+        rpc = SlowLookupRPC({})
+
+        async def publish(tx_hash, transfer):
+            pass
+
+        # The first lookup holds the resolver, so 5 of the next 20 hashes fit in the queue
+        stream = [tx_hash(0), rpc.started, *(tx_hash(index) for index in range(1, 21))]
+        async with stand_in_node(stream) as url:
+            watcher = MempoolWatcher(url, watched_registry(), token_scanner(), publish)
+            await watch(watcher, rpc, until=lambda: watcher.dropped_lookups == 15)
+            await asyncio.sleep(0.05)
+
+        assert watcher.dropped_lookups == 15
+        assert rpc.batches == [[tx_hash(0)]]
+
+    asyncio.run(scenario())
+
+
+def test_pending_index_expires_entries_after_ttl():
+    index = PendingIndex(ttl=10, max_size=3)
+    wallet = SimpleNamespace(address=WALLET)
+    for number, seen_at in enumerate((100.0, 105.0, 108.0), start=1):
+        assert index.add(tx_hash(number), PendingTransfer(wallet, SENDER, Decimal(1), None, seen_at))
+    assert not index.add(tx_hash(1), PendingTransfer(wallet, SENDER, Decimal(1), None, 109.0))
+
+    assert index.evict_expired(now=109.0) == 0
+    assert index.evict_expired(now=110.0) == 1
+    assert tx_hash(1) not in index
+    assert index.evict_expired(now=118.0) == 2
+    assert len(index) == 0
+    assert index.expired == 3
+
+    # Beyond max_size the oldest entries go first
+    for number in range(4, 9):
+        index.add(tx_hash(number), PendingTransfer(wallet, SENDER, Decimal(1), None, 200.0))
+    assert len(index) == 3
+    assert tx_hash(5) not in index and tx_hash(6) in index
+    assert index.expired == 5
+
+
+def test_mined_pending_transfer_is_promoted_to_deposit(monkeypatch):
+    monkeypatch.setattr(settings, "mempool_monitoring", True)
+
+    async def scenario():
+        pending = native_transfer(1, WALLET, 3 * 10**18)
+        network = SimpleNamespace(id=NETWORK_ID, name="Test", ws_url="ws://127.0.0.1:1")
+        monitor = NetworkMonitor(network, event_bus=None)
+        registry = watched_registry()
+        monitor.wallet_registry = registry
+        monitor.mempool.wallet_registry = registry
+
+        published = []
+
+        async def publish_pending(tx_hash, transfer):
+            published.append(tx_hash)
+
+        monitor.mempool.publish = publish_pending
+        await monitor.mempool.handle_transaction(pending)
+        assert published == [tx_hash(1)] and tx_hash(1) in monitor.mempool.index
+
+        stored = []
+
+        async def get_receipts(block_hash, hashes):
+            return {tx: {"status": "0x1"} for tx in hashes}
+
+        async def store_deposits(rows, wallets_by_key):
+            stored.extend(rows)
+            return []
+
+        monitor.rpc = SimpleNamespace(get_receipts=get_receipts)
+        monitor._store_deposits = store_deposits
+
+        block_hash = "0x" + "e" * 64
+        block = {
+            "number": hex(100),
+            "hash": block_hash,
+            # The mined transaction, as the block returns it
+            "transactions": [{**pending, "to": WALLET.upper().replace("0X", "0x")}, native_transfer(2, OTHER)],
+        }
+        await monitor._scan_block(ChainHeader(100, block_hash, "0x" + "f" * 64), block)
+
+        assert len(stored) == 1
+        row = stored[0]
+        assert row["tx_hash"] == tx_hash(1)
+        assert row["amount"] == Decimal(3)
+        assert row["from_address"] == SENDER
+        assert row["block_number"] == 100 and row["block_hash"] == block_hash
+        assert row["wallet_id"] == registry.get(WALLET).id
+        assert tx_hash(1) not in monitor.mempool.index
+        assert monitor.mempool.index.promoted == 1
+
+    asyncio.run(scenario())
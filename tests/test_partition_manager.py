@@ -0,0 +1,98 @@
+import asyncio
+import uuid
+from datetime import datetime, timezone
+from decimal import Decimal
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from app.models.user import BlockchainNetwork, Deposit, DepositStatus, DepositTxKey, User, Wallet
+from app.services.deposit_processor import DepositProcessor
+from app.services.partition_manager import PartitionManager
+from conftest import async_url
+
+ARCHIVED_TX = "0x" + "3" * 64
+PENDING_TX = "0x" + "4" * 64
+
+
+def utc(year: int, month: int, day: int = 1) -> datetime:
+    return datetime(year, month, day, tzinfo=timezone.utc)
+
+
+async def seed_wallet(db: AsyncSession):
+    user = User(email=f"{uuid.uuid4()}@example.com", first_name="Test", last_name="User")
+    network = BlockchainNetwork(
+        name="Test Network", chain_id=1, rpc_url="http://localhost", ws_url="ws://localhost", confirmations_required=12
+    )
+    db.add_all([user, network])
+    await db.flush()
+    wallet = Wallet(user_id=user.id, address="0x" + uuid.uuid4().hex + "0" * 8, blockchain_network_id=network.id)
+    db.add(wallet)
+    await db.flush()
+    return wallet
+
+
+async def seed_deposit(db: AsyncSession, wallet: Wallet, tx_hash: str, status: DepositStatus, created_at: datetime):
+    deposit_id = uuid.uuid4()
+    db.add(DepositTxKey(
+        blockchain_network_id=wallet.blockchain_network_id,
+        tx_hash=tx_hash,
+        log_index=-1,
+        deposit_id=deposit_id,
+        created_at=created_at,
+    ))
+    db.add(Deposit(
+        id=deposit_id,
+        wallet_id=wallet.id,
+        tx_hash=tx_hash,
+        amount=Decimal("1.5"),
+        confirmations=12 if status == DepositStatus.COMPLETED else 1,
+        status=status,
+        blockchain_network_id=wallet.blockchain_network_id,
+        block_number=100,
+        created_at=created_at,
+    ))
+
+
+def test_retired_partition_is_archived_and_keeps_its_keys(migrated_database_url):
+    async def scenario():
+        engine = create_async_engine(async_url(migrated_database_url))
+        try:
+            async with AsyncSession(engine, expire_on_commit=False) as db:
+                manager = PartitionManager(db)
+                await manager.ensure_partitions(months_ahead=4, now=utc(2025, 1, 15))
+
+                wallet = await seed_wallet(db)
+                await seed_deposit(db, wallet, ARCHIVED_TX, DepositStatus.COMPLETED, utc(2025, 1, 10))
+                await seed_deposit(db, wallet, PENDING_TX, DepositStatus.CONFIRMING, utc(2025, 2, 10))
+                await db.commit()
+
+                retired = await manager.retire_partitions(retain_months=2, now=utc(2025, 6, 15))
+                # February still holds a deposit awaiting confirmations
+                assert retired == ["deposits_y2025m01", "deposits_y2025m03"]
+                assert utc(2025, 2) in await manager.list_partitions()
+
+                archived = await db.scalar(text("SELECT tx_hash FROM archive.deposits_y2025m01"))
+                assert archived == ARCHIVED_TX
+                keys = await db.scalar(text("SELECT count(*) FROM deposit_tx_keys WHERE tx_hash = :tx"), {"tx": ARCHIVED_TX})
+                assert keys == 1
+
+                processor = DepositProcessor(db)
+                assert await processor.get_deposit_by_tx_hash(ARCHIVED_TX) is None
+                assert (await processor.get_deposit_by_tx_hash(PENDING_TX)).status == DepositStatus.CONFIRMING
+
+                # A rescan of the archived block does not credit the deposit again
+                credited = await processor.create_deposits_bulk([{
+                    "wallet_id": wallet.id,
+                    "tx_hash": ARCHIVED_TX,
+                    "amount": Decimal("1.5"),
+                    "confirmations": 0,
+                    "status": DepositStatus.PENDING,
+                    "blockchain_network_id": wallet.blockchain_network_id,
+                    "block_number": 100,
+                }])
+                assert credited == []
+        finally:
+            await engine.dispose()
+
+    asyncio.run(scenario())
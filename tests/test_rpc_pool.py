@@ -0,0 +1,130 @@
+import asyncio
+import random
+import time
+from contextlib import asynccontextmanager
+
+import pytest
+import uvicorn
+
+from app.config import settings
+from app.services.rpc_pool import MIN_HEDGE_SAMPLES, ProviderPool, TokenBucket
+from benchmarks.rpc_pool_benchmark import fake_rpc_app
+
+# (base latency, error probability) of the fake providers
+DOWN = (0.005, 1.0)
+SLOW = (0.5, 0.0)
+FAST = (0.01, 0.0)
+
+
+@asynccontextmanager
+async def fake_providers(*specs):
+    """Serve one fake JSON-RPC provider per (latency, error probability) spec and yield a pool over them."""
+    servers = []
+    for base, error_probability in specs:
+        app = fake_rpc_app(base, 0.0, 0.0, error_probability, {"brownout": False})
+        server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=0, log_level="error"))
+        servers.append((server, asyncio.create_task(server.serve())))
+    while not all(server.started for server, _ in servers):
+        await asyncio.sleep(0.01)
+
+    urls = [f"http://127.0.0.1:{server.servers[0].sockets[0].getsockname()[1]}/" for server, _ in servers]
+    pool = ProviderPool(urls)
+    try:
+        yield pool
+    finally:
+        await pool.close()
+        for server, task in servers:
+            server.should_exit = True
+        await asyncio.gather(*(task for _, task in servers))
+
+
+@pytest.fixture
+def providers_in_order(monkeypatch):
+    """Make the pool pick healthy providers in their configured order instead of at random."""
+    monkeypatch.setattr(random, "choices", lambda population, weights: [population[0]])
+
+
+def test_failing_provider_is_skipped(monkeypatch, providers_in_order):
+    monkeypatch.setattr(settings, "rpc_hedge_percentile", 0)
+
+    async def scenario():
+        async with fake_providers(DOWN, FAST) as pool:
+            down, fast = pool.providers
+            for _ in range(5):
+                assert await pool.block_number() == 16
+
+            # Three failures in a row put the provider in cooldown; it is no longer tried
+            assert down.failures == 3
+            assert not down.healthy
+            tried = down.requests
+            for _ in range(10):
+                await pool.block_number()
+            assert down.requests == tried
+            assert fast.failures == 0
+
+    asyncio.run(scenario())
+
+
+def test_failing_provider_is_skipped_and_hedge_wins(providers_in_order):
+    async def scenario():
+        async with fake_providers(DOWN, SLOW, FAST) as pool:
+            down, slow, fast = pool.providers
+            # A latency history puts the slow provider's hedge budget at the minimum delay
+            slow.samples.extend([0.01] * MIN_HEDGE_SAMPLES)
+
+            started = time.monotonic()
+            assert await pool.block_number() == 16
+            elapsed = time.monotonic() - started
+
+            assert down.failures == 1
+            assert fast.hedges == 1
+            assert fast.requests == 1
+            assert elapsed < SLOW[0]
+
+    asyncio.run(scenario())
+
+
+def test_hedge_needs_a_token_from_the_backup(providers_in_order):
+    async def scenario():
+        async with fake_providers(SLOW, FAST) as pool:
+            slow, fast = pool.providers
+            slow.samples.extend([0.01] * MIN_HEDGE_SAMPLES)
+            fast.bucket = TokenBucket(rate=0.01, capacity=1)
+            fast.bucket.tokens = 0
+
+            started = time.monotonic()
+            assert await pool.block_number() == 16
+            assert time.monotonic() - started >= SLOW[0]
+            assert fast.hedges == 0
+            assert slow.requests == 1
+
+    asyncio.run(scenario())
+
+
+def test_token_bucket_limits_provider_rate():
+    async def scenario():
+        async with fake_providers(FAST) as pool:
+            provider = pool.providers[0]
+            provider.bucket = TokenBucket(rate=20, capacity=2)
+
+            started = time.monotonic()
+            await asyncio.gather(*(pool.block_number() for _ in range(8)))
+            # Two requests ride the burst, the other six wait for tokens at 20/s
+            assert time.monotonic() - started >= 0.25
+            assert provider.requests == 8
+
+    asyncio.run(scenario())
+
+
+def test_token_bucket_refills_up_to_capacity():
+    bucket = TokenBucket(rate=50, capacity=2)
+    assert bucket.try_acquire() and bucket.try_acquire()
+    assert not bucket.try_acquire()
+    assert not bucket.available()
+
+    time.sleep(0.1)
+    assert bucket.available()
+    assert bucket.tokens == 2
+
+    unlimited = TokenBucket(rate=0, capacity=1)
+    assert all(unlimited.try_acquire() for _ in range(100))
@@ -0,0 +1,156 @@
+import asyncio
+import uuid
+
+import asyncpg
+
+from app.services.shard_coordinator import UNIT_LOCK_NAMESPACE, ShardCoordinator, WorkUnit
+
+
+def work_units(shard_count: int = 4, networks: int = 2):
+    return [
+        WorkUnit(uuid.uuid4(), shard_index, shard_count)
+        for _ in range(networks)
+        for shard_index in range(shard_count)
+    ]
+
+
+async def held_unit_locks(connection: asyncpg.Connection, pid: int) -> int:
+    return await connection.fetchval(
+        "SELECT count(*) FROM pg_locks WHERE locktype = 'advisory' AND granted "
+        "AND classid::bigint = $1 AND pid = $2",
+        UNIT_LOCK_NAMESPACE,
+        pid,
+    )
+
+
+def test_shares_add_up_to_the_unit_count():
+    coordinator = ShardCoordinator("postgresql://unused")
+    slots = [0, 2, 5]
+    shares = []
+    for slot in slots:
+        coordinator.member_slot = slot
+        shares.append(coordinator.share(10, slots))
+    assert shares == [4, 3, 3]
+
+    coordinator.member_slot = 7
+    # Not yet listed among the live members: ranked last
+    assert coordinator.share(10, slots) == 3
+    assert coordinator.share(0, slots) == 0
+
+
+def test_live_workers_split_the_units(database_url):
+    async def scenario():
+        units = work_units()
+        first, second, third = (ShardCoordinator(database_url) for _ in range(3))
+        try:
+            for coordinator in (first, second, third):
+                await coordinator.start()
+            assert len({first.member_slot, second.member_slot, third.member_slot}) == 3
+
+            slots = await first.member_slots()
+            assert slots == sorted([first.member_slot, second.member_slot, third.member_slot])
+            assert sorted(coordinator.share(len(units), slots) for coordinator in (first, second, third)) == [2, 3, 3]
+
+            async def release(unit):
+                raise AssertionError("nothing to release")
+
+            for coordinator in (first, second, third):
+                await coordinator.rebalance(units, release)
+            owned = [set(coordinator.owned) for coordinator in (first, second, third)]
+            assert sorted(len(units_owned) for units_owned in owned) == [2, 3, 3]
+            assert set().union(*owned) == set(units)
+        finally:
+            for coordinator in (first, second, third):
+                await coordinator.stop()
+
+    asyncio.run(scenario())
+
+
+def test_units_rebalance_when_a_worker_joins_and_dies(database_url):
+    async def scenario():
+        units = work_units()
+        first, second = ShardCoordinator(database_url), ShardCoordinator(database_url)
+        admin = await asyncpg.connect(database_url)
+        released = []
+
+        async def release(unit):
+            released.append(unit)
+
+        try:
+            await first.start()
+            assert len(await first.rebalance(units, release)) == 8
+
+            # A worker joins: it finds nothing free until the first gives up its surplus
+            await second.start()
+            assert await second.rebalance(units, release) == []
+            await first.rebalance(units, release)
+            assert len(released) == 4 and not set(released) & set(first.owned)
+            acquired = await second.rebalance(units, release)
+            assert set(acquired) == set(released)
+            assert len(first.owned) == len(second.owned) == 4
+
+            # The second worker dies: its connection, and with it every lock, goes away
+            await admin.execute("SELECT pg_terminate_backend($1)", second._connection.get_server_pid())
+            await asyncio.sleep(0.1)
+            assert await first.member_slots() == [first.member_slot]
+            await first.rebalance(units, release)
+            assert set(first.owned) == set(units)
+        finally:
+            await first.stop()
+            if second._connection is not None:
+                second._connection.terminate()
+            await admin.close()
+
+    asyncio.run(scenario())
+
+
+def test_units_dropped_from_the_set_are_released(database_url):
+    async def scenario():
+        units = work_units()
+        coordinator = ShardCoordinator(database_url)
+        released = []
+
+        async def release(unit):
+            released.append(unit)
+
+        try:
+            await coordinator.start()
+            await coordinator.rebalance(units, release)
+            await coordinator.rebalance(units[:4], release)
+            assert set(released) == set(units[4:])
+            assert set(coordinator.owned) == set(units[:4])
+        finally:
+            await coordinator.stop()
+
+    asyncio.run(scenario())
+
+
+def test_stop_releases_every_lock(database_url):
+    async def scenario():
+        units = work_units()
+        coordinator, successor = ShardCoordinator(database_url), ShardCoordinator(database_url)
+        admin = await asyncpg.connect(database_url)
+
+        async def release(unit):
+            pass
+
+        try:
+            await coordinator.start()
+            await coordinator.rebalance(units, release)
+            pid = coordinator._connection.get_server_pid()
+            assert await held_unit_locks(admin, pid) == 8
+
+            await coordinator.stop()
+            assert coordinator.owned == {} and coordinator.member_slot is None
+            assert await held_unit_locks(admin, pid) == 0
+
+            # The member slot and every unit are free for the next worker
+            await successor.start()
+            assert await successor.member_slots() == [successor.member_slot]
+            assert len(await successor.rebalance(units, release)) == 8
+        finally:
+            await coordinator.stop()
+            await successor.stop()
+            await admin.close()
+
+    asyncio.run(scenario())
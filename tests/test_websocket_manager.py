@@ -0,0 +1,125 @@
+import asyncio
+
+import orjson
+import pytest
+
+from app.config import settings
+from app.services.event_bus import confirmation_update_event
+from app.services.websocket_manager import WebSocketManager
+
+WALLET = "0x" + "a" * 40
+TX_HASH = "0x" + "1" * 64
+
+
+class FakeWebSocket:
+    def __init__(self):
+        self.sent = []
+
+    async def send_text(self, message: str):
+        self.sent.append(orjson.loads(message))
+
+    async def close(self, code: int = 1000, reason: str = ""):
+        pass
+
+
+@pytest.fixture(autouse=True)
+def coalesce_interval(monkeypatch):
+    monkeypatch.setattr(settings, "websocket_coalesce_interval", 0.05)
+
+
+async def connected_manager():
+    manager = WebSocketManager()
+    websocket = FakeWebSocket()
+    await manager.connect(websocket, WALLET)
+    return manager, websocket
+
+
+async def settle(manager: WebSocketManager):
+    """Wait for the coalescing tick and the connection writers to drain."""
+    if manager._flush_task is not None:
+        await manager._flush_task
+    await asyncio.sleep(0.01)
+
+
+def test_coalesced_confirmation_update_is_flushed():
+    async def scenario():
+        manager, websocket = await connected_manager()
+        await manager.handle_event(confirmation_update_event(WALLET, TX_HASH, 1, "confirming", 3))
+        await settle(manager)
+
+        assert manager._flush_task.exception() is None
+        assert [message["confirmations"] for message in websocket.sent] == [1]
+        assert websocket.sent[0]["log_index"] == 3
+        assert manager.pending_confirmations == {}
+
+    asyncio.run(scenario())
+
+
+def test_non_final_updates_are_coalesced_into_one_per_tick():
+    async def scenario():
+        manager, websocket = await connected_manager()
+        for confirmations in (1, 2, 3):
+            await manager.handle_event(confirmation_update_event(WALLET, TX_HASH, confirmations, "confirming"))
+
+        await asyncio.sleep(0.01)
+        assert websocket.sent == []
+
+        await settle(manager)
+        assert [message["confirmations"] for message in websocket.sent] == [3]
+        assert manager.coalesced_updates == 2
+
+    asyncio.run(scenario())
+
+
+def test_final_status_replaces_pending_count():
+    async def scenario():
+        manager, websocket = await connected_manager()
+        await manager.handle_event(confirmation_update_event(WALLET, TX_HASH, 11, "confirming"))
+        await manager.handle_event(confirmation_update_event(WALLET, TX_HASH, 12, "completed"))
+
+        # Delivered right away, without waiting for the tick
+        await asyncio.sleep(0.01)
+        assert [message["status"] for message in websocket.sent] == ["completed"]
+
+        await settle(manager)
+        assert [message["status"] for message in websocket.sent] == ["completed"]
+
+    asyncio.run(scenario())
+
+
+@pytest.mark.parametrize("status", ["completed", "orphaned"])
+def test_final_statuses_are_never_coalesced(status):
+    async def scenario():
+        manager, websocket = await connected_manager()
+        other_tx = "0x" + "2" * 64
+        await manager.handle_event(confirmation_update_event(WALLET, other_tx, 1, "confirming"))
+        await manager.handle_event(confirmation_update_event(WALLET, TX_HASH, 12, status))
+        await manager.handle_event(confirmation_update_event(WALLET, TX_HASH, 12, status))
+
+        await asyncio.sleep(0.01)
+        assert [message["status"] for message in websocket.sent] == [status, status]
+        assert manager.coalesced_updates == 0
+
+        # Counts of other transactions still go out on the tick
+        await settle(manager)
+        assert [message["tx_hash"] for message in websocket.sent] == [TX_HASH, TX_HASH, other_tx]
+
+    asyncio.run(scenario())
+
+
+def test_orphaned_deposit_update_drops_waiting_count():
+    async def scenario():
+        manager, websocket = await connected_manager()
+        await manager.handle_event(confirmation_update_event(WALLET, TX_HASH, 2, "confirming"))
+        await manager.broadcast_deposit_update(WALLET, {"tx_hash": TX_HASH, "log_index": -1, "status": "orphaned"})
+        await manager.handle_event({
+            "type": "deposit_update",
+            "wallet_address": WALLET,
+            "data": {"tx_hash": TX_HASH, "log_index": -1, "status": "orphaned"},
+        })
+
+        await settle(manager)
+        assert [message["type"] for message in websocket.sent] == ["deposit_update", "deposit_update"]
+        assert all(message["data"]["status"] == "orphaned" for message in websocket.sent)
+
+    asyncio.run(scenario())